@@ -54,6 +54,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'traffic.middleware.RequestMetricsMiddleware',  # 요청 계측 (/metrics, ?profile=1)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS 미들웨어 추가
@@ -101,6 +102,44 @@ DATABASES = {
     }
 }
 
+# 로컬 개발/벤치마크용: DJANGO_DB_ENGINE=sqlite면 MySQL 대신 SQLite 파일 사용
+# 예) DJANGO_DB_ENGINE=sqlite DJANGO_SQLITE_PATH=/tmp/traffic.sqlite3 python manage.py migrate
+if os.getenv('DJANGO_DB_ENGINE') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DJANGO_SQLITE_PATH', str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                'timeout': 30,  # 동시 요청 벤치마크 중 쓰기 잠금 대기(초)
+            },
+        }
+    }
+
+
+# Cache
+# 기본은 프로세스 로컬 메모리 캐시, 여러 워커가 캐시를 공유하려면 Redis 등으로 교체
+# (로컬 캐시면 다른 프로세스의 쓰기를 알 수 없어 조회 캐시는 끝난 구간도 짧게만 보관한다, traffic.W001)
+# 예) DJANGO_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache DJANGO_CACHE_LOCATION=redis://127.0.0.1:6379/1
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'traffic-default'),
+    }
+}
+
+# latest_volume 스냅샷 캐시: 공유 캐시 보관 시간(초)
+# 요청마다 스냅샷 테이블 버전(MAX(updated_at), 행 수)과 비교하므로 이 시간 동안 낡은 응답이 나가지는 않는다
+TRAFFIC_SNAPSHOT_CACHE_TIMEOUT = 300
+
+# 실시간 스트림(SSE): 브로커 백엔드, 구독자별 큐 크기, 끊기 전 허용 유실 건수, heartbeat 간격(초),
+# 다른 프로세스(관리 명령)의 변경을 확인하는 DB 폴링 간격(초)
+TRAFFIC_BROKER_BACKEND = 'traffic.utils.realtime.DatabasePollingBroker'
+TRAFFIC_STREAM_QUEUE_SIZE = 100
+TRAFFIC_STREAM_MAX_DROPPED = 1000
+TRAFFIC_STREAM_HEARTBEAT = 15
+TRAFFIC_STREAM_POLL_INTERVAL = 2
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -175,11 +214,18 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'traffic.utils.metrics.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100
 }
 
 # 로깅 설정
+# traffic 로거는 BackgroundHandler(queue)로 큐에 넣기만 하고, console/file 기록은 백그라운드 스레드가 한다.
+# 백그라운드 스레드가 쓸 대상 핸들러는 첫 기록 때 traffic.output logger에서 가져온다 (handler 이름 순서와 무관).
+# sampling: logger별 INFO 이하 기록 비율 (예: {'traffic.views': 0.1}), ratelimit: 같은 메시지 초당 건수 제한
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -188,6 +234,20 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'traffic.utils.log.JsonFormatter',
+        },
+    },
+    'filters': {
+        'sampling': {
+            '()': 'traffic.utils.log.SamplingFilter',
+            'rates': {},
+        },
+        'ratelimit': {
+            '()': 'traffic.utils.log.RateLimitFilter',
+            'rate': 20,
+            'burst': 100,
+        },
     },
     'handlers': {
         'console': {
@@ -197,14 +257,51 @@ LOGGING = {
         'file': {
             'class': 'logging.FileHandler',
             'filename': 'debug.log',
-            'formatter': 'verbose',
+            'formatter': 'json',
+            'encoding': 'utf-8',
+        },
+        'queue': {
+            '()': 'traffic.utils.log.BackgroundHandler',
+            'target_logger': 'traffic.output',
+            'queue_size': 10000,
+            'filters': ['sampling', 'ratelimit'],
         },
     },
     'loggers': {
         'traffic': {
+            'handlers': ['queue'],
+            'level': os.environ.get('TRAFFIC_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        # BackgroundHandler의 기록 대상 (이 logger로 직접 로깅하지 않는다)
+        'traffic.output': {
             'handlers': ['console', 'file'],
-            'level': 'DEBUG',
-            'propagate': True,
+            'propagate': False,
         },
     },
 }
+
+# 교차로 좌표 격자 색인: 격자 크기(도, 약 1.1km), 다른 프로세스 변경 확인 간격(초)
+TRAFFIC_SPATIAL_CELL_SIZE = 0.01
+TRAFFIC_SPATIAL_INDEX_CHECK_INTERVAL = 30
+
+# 증분 배치(watermark) 겹침 구간(초): 실행 중 늦게 커밋된 교통량을 다음 실행에서 다시 처리
+TRAFFIC_WATERMARK_LAG = 300
+
+# 교통량 기준선(update_traffic_baselines) 메모리 저장소: 다른 프로세스 갱신 확인 간격(초)
+TRAFFIC_BASELINE_CHECK_INTERVAL = 30
+
+# 속도/혼잡 모델: 설정이 없는 교차로의 기본 모델, 추가 모델 등록 {이름: 'dotted.path.to.function'}
+TRAFFIC_CONGESTION_DEFAULT = {'model': 'threshold', 'params': {}}
+TRAFFIC_CONGESTION_MODELS = {}
+
+# 시간 범위 조회 캐시: 세대/값을 둘 캐시 alias, 프로세스 LRU 크기, 열린/닫힌 윈도우 보관 시간(초)
+# 닫힌 윈도우 보관 시간은 alias가 프로세스 간 공유 캐시일 때만 적용된다 (LocMemCache면 열린 윈도우와 같음)
+TRAFFIC_QUERY_CACHE_ALIAS = 'default'
+TRAFFIC_QUERY_CACHE_LOCAL_SIZE = 512
+TRAFFIC_QUERY_CACHE_OPEN_TIMEOUT = 15
+TRAFFIC_QUERY_CACHE_CLOSED_TIMEOUT = 86400
+
+# 요청 계측: /metrics 노출 여부, DEBUG가 아닐 때 ?profile=1 허용 여부
+TRAFFIC_METRICS_ENABLED = True
+TRAFFIC_PROFILING_ENABLED = False
@@ -17,7 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from traffic.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),  # Prometheus 수집용
     path('api/', include('traffic.urls')),  # traffic 앱의 urls.py 포함
 ]
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Intersection, TrafficVolume
+from .models import CongestionModelConfig, Intersection, IntersectionHealth, TrafficVolume
 
 @admin.register(Intersection)
 class IntersectionAdmin(admin.ModelAdmin):
@@ -14,3 +14,15 @@ class TrafficVolumeAdmin(admin.ModelAdmin):
     search_fields = ('intersection__name',)
     date_hierarchy = 'datetime'
     ordering = ('-datetime',)
+
+@admin.register(CongestionModelConfig)
+class CongestionModelConfigAdmin(admin.ModelAdmin):
+    list_display = ('intersection', 'model', 'params', 'updated_at')
+    list_filter = ('model',)
+    search_fields = ('intersection__name',)
+
+@admin.register(IntersectionHealth)
+class IntersectionHealthAdmin(admin.ModelAdmin):
+    list_display = ('intersection', 'score', 'incidents', 'outages', 'impacted_hours', 'volume_loss_ratio', 'updated_at')
+    search_fields = ('intersection__name',)
+    ordering = ('score',)
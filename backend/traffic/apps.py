@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TrafficConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'traffic'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401 (시스템 체크/시그널 receiver 등록)
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from traffic.utils.query_cache import shared_cache_is_process_local
+
+
+@register(Tags.caches)
+def check_query_cache_backend(app_configs, **kwargs):
+    """조회 캐시 세대 값이 프로세스 로컬 캐시에 있으면 경고 (다른 프로세스의 무효화가 보이지 않음)"""
+    if not shared_cache_is_process_local():
+        return []
+    alias = getattr(settings, 'TRAFFIC_QUERY_CACHE_ALIAS', 'default')
+    return [Warning(
+        f"TRAFFIC_QUERY_CACHE_ALIAS('{alias}')가 프로세스 로컬 캐시(LocMemCache)입니다.",
+        hint=(
+            '관리 명령 등 다른 프로세스의 쓰기가 이 프로세스의 조회 캐시를 무효화하지 못하므로 '
+            '끝난 구간도 TRAFFIC_QUERY_CACHE_OPEN_TIMEOUT초만 캐시합니다. '
+            '여러 프로세스로 운영할 때는 DJANGO_CACHE_BACKEND를 Redis/Memcached로 설정하세요.'
+        ),
+        id='traffic.W001',
+    )]
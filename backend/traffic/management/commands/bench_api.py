@@ -0,0 +1,297 @@
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Max, Min
+from django.test import Client
+from django.utils import timezone
+
+from traffic.models import Incident, Intersection, TotalTrafficVolume, TrafficVolume
+from traffic.utils.metrics import RequestMetrics
+from traffic.utils.query_cache import cache_stats
+
+try:
+    import resource  # Windows에는 없음
+except ImportError:
+    resource = None
+
+SAMPLE_INTERSECTIONS = 500
+BATCH_SIZE = 20
+
+
+def _query(path, **params):
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def _range(ctx, rng, days):
+    """데이터 범위 안에서 days일짜리 무작위 구간 (슬롯 경계, 현지 시각)"""
+    span = max(0, int((ctx['last'] - ctx['first']) / timedelta(minutes=15)) - days * 96)
+    end = ctx['last'] - timedelta(minutes=15 * rng.randint(0, span))
+    return {'start_time': (end - timedelta(days=days)).isoformat(), 'end_time': end.isoformat()}
+
+
+def _bbox(ctx, rng, size=0.01):
+    """교차로 하나를 중심으로 한 bbox (parse_bbox 순서: min_lon,min_lat,max_lon,max_lat)"""
+    lat, lon = rng.choice(ctx['points'])
+    return f"{lon - size},{lat - size},{lon + size},{lat + size}"
+
+
+def _result_count(response):
+    """JSON 응답의 결과 건수 (목록 길이, 페이지면 results 길이, 컬럼형이면 축 길이), 셀 수 없으면 None"""
+    if getattr(response, 'streaming', False) or response.status_code >= 400:
+        return None
+    try:
+        data = json.loads(response.content)
+    except ValueError:
+        return None
+    if isinstance(data, dict):
+        for key in ('results', 'intersections', 'frames', 'timestamps'):
+            if isinstance(data.get(key), list):
+                return len(data[key])
+        return len(data)
+    return len(data) if isinstance(data, list) else None
+
+
+# 이름 → (rng, ctx)로 요청 경로를 만드는 함수, 교차로/구간은 요청마다 무작위로 바꿔 캐시 적중만 재지 않게 한다
+ENDPOINTS = {
+    'map_data': lambda rng, ctx: '/api/intersections/map_data/',
+    'map_data_bbox': lambda rng, ctx: _query('/api/intersections/map_data/', bbox=_bbox(ctx, rng)),
+    'latest_volume': lambda rng, ctx: '/api/intersections/latest_volume/',
+    'total_volumes': lambda rng, ctx: _query(
+        f"/api/intersections/{rng.choice(ctx['ids'])}/total_volumes/", **_range(ctx, rng, 1),
+    ),
+    'total_volumes_1h': lambda rng, ctx: _query(
+        f"/api/intersections/{rng.choice(ctx['ids'])}/total_volumes/", granularity='1h', **_range(ctx, rng, 7),
+    ),
+    'traffic_data': lambda rng, ctx: _query(
+        f"/api/traffic-data/intersection/{rng.choice(ctx['ids'])}/", **_range(ctx, rng, 1),
+    ),
+    'traffic_batch': lambda rng, ctx: _query(
+        '/api/traffic-data/batch/', granularity='1h',
+        intersections=','.join(map(str, rng.sample(ctx['ids'], min(BATCH_SIZE, len(ctx['ids']))))),
+        **_range(ctx, rng, 3),
+    ),
+    'city_snapshot': lambda rng, ctx: _query(
+        '/api/traffic-data/intersections/', time=_range(ctx, rng, 0)['end_time'],
+    ),
+    'incidents': lambda rng, ctx: '/api/incidents/',
+    'incidents_filtered': lambda rng, ctx: _query('/api/incidents/', bbox=_bbox(ctx, rng, 0.02)),
+    'incident_stats': lambda rng, ctx: _query(
+        '/api/incidents/stats/', group_by=rng.choice(['district', 'type', 'hour_of_week']),
+    ),
+}
+
+
+def percentile(sorted_values, p):
+    return round(float(np.percentile(sorted_values, p)), 2) if sorted_values else None
+
+
+class Command(BaseCommand):
+    help = ('API 벤치마크: 엔드포인트별로 동시 클라이언트 요청을 보내 p50/p95/p99 지연시간, 처리량, '
+            '요청당 쿼리 수, 요청당 메모리 할당 최대치를 측정하고 JSON으로 저장 (generate_synthetic_data로 데이터 준비)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', type=str, default=','.join(ENDPOINTS), help='측정할 엔드포인트 (쉼표 구분)')
+        parser.add_argument('--requests', type=int, default=200, help='엔드포인트별 요청 수')
+        parser.add_argument('--concurrency', type=int, default=8, help='동시 클라이언트(스레드) 수')
+        parser.add_argument('--warmup', type=int, default=3, help='측정 전 순차 워밍업 요청 수')
+        parser.add_argument('--memory-samples', type=int, default=5, help='tracemalloc으로 메모리를 잴 순차 요청 수 (0이면 생략)')
+        parser.add_argument('--seed', type=int, default=0, help='요청 경로 난수 시드')
+        parser.add_argument('--output', type=str, help='결과 JSON 경로 (기본: bench_api_<시각>.json)')
+        parser.add_argument('--compare', type=str, help='비교할 이전 결과 JSON 경로')
+        parser.add_argument('--log-level', default='WARNING', help='측정 중 traffic 로거 레벨 (요청마다 남는 INFO 로그 억제)')
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in ENDPOINTS]
+        if unknown:
+            raise CommandError(f"알 수 없는 엔드포인트: {', '.join(unknown)} (가능: {', '.join(ENDPOINTS)})")
+        ctx = self._context()
+        if ctx is None:
+            raise CommandError("TotalTrafficVolume이 없습니다. 먼저 generate_synthetic_data를 실행하세요.")
+
+        rng = random.Random(options['seed'])
+        report = {
+            'started_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'options': {key: options[key] for key in ('requests', 'concurrency', 'warmup', 'memory_samples', 'seed')},
+            'dataset': ctx['dataset'],
+            'endpoints': {},
+        }
+        self.stdout.write(
+            f"🧪 {connection.vendor}: 교차로 {ctx['dataset']['intersections']:,}개, "
+            f"슬롯 {ctx['dataset']['total_slots']:,}개, 사고 {ctx['dataset']['incidents']:,}건, "
+            f"동시 {options['concurrency']} × {options['requests']}요청"
+        )
+
+        client = Client()
+        logger = logging.getLogger('traffic')
+        saved_level = logger.level
+        logger.setLevel(options['log_level'].upper())
+        try:
+            for name in names:
+                make_path = ENDPOINTS[name]
+                for _ in range(options['warmup']):
+                    client.get(make_path(rng, ctx))
+                paths = [make_path(rng, ctx) for _ in range(options['requests'])]
+                result = self._run(paths, options['concurrency'])
+                if options['memory_samples']:
+                    memory_paths = [make_path(rng, ctx) for _ in range(options['memory_samples'])]
+                    result['peak_alloc_kb'] = self._memory(client, memory_paths)
+                report['endpoints'][name] = result
+                self.stdout.write(self._format(name, result))
+        finally:
+            logger.setLevel(saved_level)
+
+        report['cache'] = cache_stats()
+        if resource is not None:
+            report['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+            self.stdout.write(f"💾 프로세스 최대 RSS {report['max_rss_mb']}MB")
+
+        output = options['output'] or f"bench_api_{timezone.localtime():%Y%m%d_%H%M%S}.json"
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"✅ 결과 저장: {output}"))
+
+        if options['compare']:
+            self._compare(options['compare'], report)
+
+        # 모든 응답이 비었으면 파라미터/데이터가 잘못된 것이므로 빠른 숫자를 결과로 믿지 않게 실패 처리
+        empty = [name for name, result in report['endpoints'].items() if result['results_mean'] == 0]
+        if empty:
+            raise CommandError(f"모든 응답이 비어 있는 엔드포인트: {', '.join(empty)} (결과는 {output}에 저장됨)")
+
+    def _context(self):
+        bounds = TotalTrafficVolume.objects.aggregate(first=Min('datetime'), last=Max('datetime'))
+        if bounds['last'] is None:
+            return None
+        ids = list(
+            TotalTrafficVolume.objects.filter(datetime=bounds['last']).order_by('intersection_id')
+            .values_list('intersection_id', flat=True)[:SAMPLE_INTERSECTIONS]
+        )
+        points = list(Intersection.objects.filter(id__in=ids).values_list('latitude', 'longitude'))
+        return {
+            'first': timezone.localtime(bounds['first']),
+            'last': timezone.localtime(bounds['last']),
+            'ids': ids,
+            'points': points,
+            'dataset': {
+                'intersections': Intersection.objects.count(),
+                'traffic_volumes': TrafficVolume.objects.count(),
+                'total_slots': TotalTrafficVolume.objects.count(),
+                'incidents': Incident.objects.count(),
+                'first_slot': bounds['first'].isoformat(),
+                'last_slot': bounds['last'].isoformat(),
+            },
+        }
+
+    def _run(self, paths, concurrency):
+        """paths를 concurrency개 스레드가 나눠서 요청, 요청별 (상태, ms, 쿼리 수, DB ms, 바이트, 결과 건수) 수집"""
+        pending = iter(paths)
+        lock = threading.Lock()
+        samples = []
+
+        def worker():
+            client = Client()
+            try:
+                while True:
+                    with lock:
+                        path = next(pending, None)
+                    if path is None:
+                        return
+                    metrics = RequestMetrics()
+                    with ExitStack() as stack:
+                        for conn in connections.all():
+                            stack.enter_context(conn.execute_wrapper(metrics))
+                        started = time.perf_counter()
+                        response = client.get(path)
+                        elapsed = (time.perf_counter() - started) * 1000
+                    size = 0 if getattr(response, 'streaming', False) else len(response.content)
+                    count = _result_count(response)
+                    with lock:
+                        samples.append((response.status_code, elapsed, metrics.queries, metrics.db_seconds * 1000, size, count))
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        timings = sorted(sample[1] for sample in samples)
+        queries = [sample[2] for sample in samples]
+        counts = [sample[5] for sample in samples if sample[5] is not None]
+        statuses = {}
+        for sample in samples:
+            statuses[str(sample[0])] = statuses.get(str(sample[0]), 0) + 1
+        return {
+            'requests': len(samples),
+            'errors': sum(1 for sample in samples if sample[0] >= 400),
+            'statuses': statuses,
+            'rps': round(len(samples) / wall, 1) if wall else None,
+            'p50_ms': percentile(timings, 50),
+            'p95_ms': percentile(timings, 95),
+            'p99_ms': percentile(timings, 99),
+            'mean_ms': round(statistics.fmean(timings), 2) if timings else None,
+            'max_ms': round(timings[-1], 2) if timings else None,
+            'queries_mean': round(statistics.fmean(queries), 2) if queries else None,
+            'queries_max': max(queries) if queries else None,
+            'db_ms_mean': round(statistics.fmean(sample[3] for sample in samples), 2) if samples else None,
+            'bytes_mean': round(statistics.fmean(sample[4] for sample in samples)) if samples else None,
+            'results_mean': round(statistics.fmean(counts), 1) if counts else None,
+            'empty': sum(1 for count in counts if count == 0),
+        }
+
+    def _memory(self, client, paths):
+        """순차 요청마다 tracemalloc 할당 최대치(KB)를 재서 가장 큰 값 반환"""
+        peaks = []
+        tracemalloc.start()
+        try:
+            for path in paths:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                client.get(path)
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            tracemalloc.stop()
+        return round(max(peaks) / 1024, 1)
+
+    def _format(self, name, result):
+        line = (f"{name:<20} p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+                f"rps={result['rps']} queries={result['queries_mean']} ({result['queries_max']} max)")
+        if 'peak_alloc_kb' in result:
+            line += f" alloc={result['peak_alloc_kb']}KB"
+        if result['results_mean'] is not None:
+            line += f" results={result['results_mean']}"
+        if result['errors']:
+            line += f" ⚠️ 오류 {result['errors']}건 {result['statuses']}"
+        if result['empty']:
+            line += f" ⚠️ 빈 응답 {result['empty']}건"
+        return line
+
+    def _compare(self, path, report):
+        with open(path, encoding='utf-8') as f:
+            previous = json.load(f)
+        self.stdout.write(f"📊 {path} ({previous.get('started_at')}) 대비")
+        for name, result in report['endpoints'].items():
+            before = previous.get('endpoints', {}).get(name)
+            if not before:
+                continue
+            deltas = []
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'queries_mean'):
+                if before.get(key) and result.get(key) is not None:
+                    deltas.append(f"{key} {before[key]} → {result[key]} ({(result[key] / before[key] - 1) * 100:+.0f}%)")
+            self.stdout.write(f"   {name:<20} " + ', '.join(deltas))
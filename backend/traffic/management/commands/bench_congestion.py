@@ -0,0 +1,86 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from traffic.models import CongestionModelConfig, TotalTrafficVolume
+from traffic.utils.bench import bulk_insert, iter_total_volumes, seed_intersections
+from traffic.utils.congestion import SpeedEstimator, recompute_average_speeds
+
+
+def legacy_speed(total_volume):
+    """기존 구현: 슬롯마다 파이썬 분기"""
+    base_speed = 50.0
+    if total_volume > 1000:
+        avg_speed = base_speed * 0.5
+    elif total_volume > 500:
+        avg_speed = base_speed * 0.7
+    else:
+        avg_speed = base_speed
+    return round(avg_speed, 2)
+
+
+class Command(BaseCommand):
+    help = '속도 모델 벤치마크: 슬롯별 파이썬 루프 대비 벡터 연산 처리 시간, DB 속도 재계산 시간'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slots', type=int, default=1000000, help='메모리 벤치마크 슬롯 수')
+        parser.add_argument('--intersections', type=int, default=500, help='교차로 수')
+        parser.add_argument('--configured', type=float, default=0.5, help='개별 모델 설정을 둘 교차로 비율')
+        parser.add_argument('--db-days', type=int, default=0, help='DB 재계산 벤치마크용 교차로별 슬롯 일수 (0이면 생략)')
+        parser.add_argument('--keep', action='store_true', help='생성한 합성 데이터를 롤백하지 않고 남김')
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        slots = options['slots']
+        volumes = rng.integers(50, 1500, slots)
+        ids = rng.integers(1, options['intersections'] + 1, slots)
+
+        started = time.perf_counter()
+        legacy = [legacy_speed(v) for v in volumes.tolist()]
+        legacy_s = time.perf_counter() - started
+        self.stdout.write(f"legacy 루프: {slots:,}슬롯 {legacy_s:.2f}s")
+
+        with transaction.atomic():
+            estimator = SpeedEstimator(intersection_ids=[])
+            started = time.perf_counter()
+            speeds = estimator(ids, volumes)
+            elapsed = time.perf_counter() - started
+            same = np.array_equal(speeds, np.asarray(legacy))
+            self.stdout.write(
+                f"threshold 벡터: {slots:,}슬롯 {elapsed * 1000:.1f}ms (x{legacy_s / elapsed:,.0f}, 결과 일치: {same})"
+            )
+
+            intersection_ids = seed_intersections(options['intersections'])
+            configured = intersection_ids[:int(len(intersection_ids) * options['configured'])]
+            CongestionModelConfig.objects.bulk_create([
+                CongestionModelConfig(
+                    intersection_id=pk,
+                    model='bpr' if n % 2 else 'calibrated',
+                    params={'capacity': 800 + n % 7 * 100} if n % 2 else
+                           {'points': [[0, 55], [400, 48], [900, 30], [1500, 12 + n % 5]]},
+                )
+                for n, pk in enumerate(configured)
+            ])
+            mapped_ids = np.asarray(intersection_ids)[ids - 1]
+            estimator = SpeedEstimator()
+            started = time.perf_counter()
+            estimator(mapped_ids, volumes)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"혼합 모델 벡터 ({len(configured)}개 교차로 개별 설정): {slots:,}슬롯 {elapsed * 1000:.1f}ms"
+            )
+
+            if options['db_days']:
+                inserted = bulk_insert(TotalTrafficVolume, iter_total_volumes(intersection_ids, options['db_days']))
+                started = time.perf_counter()
+                stats = recompute_average_speeds(intersection_ids)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"DB 속도 재계산: {inserted:,}슬롯 중 {stats['updated']:,}건 갱신, {elapsed:.2f}s "
+                    f"({stats['scanned'] / elapsed:,.0f} 슬롯/s)"
+                )
+
+            if not options['keep']:
+                transaction.set_rollback(True)
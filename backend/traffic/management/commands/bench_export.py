@@ -0,0 +1,63 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.utils import timezone
+
+from traffic.models import TotalTrafficVolume
+from traffic.utils.bench import bulk_insert, iter_total_volumes, seed_intersections
+
+
+def fetch(client, url):
+    """응답 전체를 읽을 때까지의 시간(time-to-last-byte)과 바이트 수"""
+    started = time.perf_counter()
+    response = client.get(url)
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    return response.status_code, size, (time.perf_counter() - started) * 1000
+
+
+class Command(BaseCommand):
+    help = '내보내기 API 벤치마크: 교차로별 JSON API 반복 호출 대비 CSV/Arrow/Parquet 전송량과 완료 시간 비교'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intersections', type=int, default=20, help='생성할 교차로 수')
+        parser.add_argument('--days', type=int, default=90, help='교차로별 생성할 15분 슬롯 일수')
+        parser.add_argument('--keep', action='store_true', help='생성한 합성 데이터를 롤백하지 않고 남김')
+
+    def handle(self, *args, **options):
+        # 기존 JSON 경로의 응답 로그가 측정을 왜곡하지 않도록 traffic 로거를 잠시 끈다
+        logging.getLogger('traffic').setLevel(logging.WARNING)
+        client = Client()
+
+        with transaction.atomic():
+            ids = seed_intersections(options['intersections'])
+            inserted = bulk_insert(TotalTrafficVolume, iter_total_volumes(ids, options['days']))
+            self.stdout.write(f"🧪 교차로 {len(ids)}개, TotalTrafficVolume {inserted}건 생성")
+
+            end = timezone.now()
+            start = end - timezone.timedelta(days=options['days'] + 1)
+            window = f"start_time={start.isoformat().replace('+00:00', 'Z')}&end_time={end.isoformat().replace('+00:00', 'Z')}"
+
+            total_size = 0
+            started = time.perf_counter()
+            for intersection_id in ids:
+                _, size, _ = fetch(client, f'/api/traffic-data/intersection/{intersection_id}/?{window}')
+                total_size += size
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"{'json (per intersection)':<26} bytes={total_size:>12,} ttlb={elapsed:>9.1f}ms")
+
+            id_list = ','.join(map(str, ids))
+            for fmt in ['csv', 'arrow', 'parquet']:
+                status, size, elapsed = fetch(client, f'/api/traffic-data/export/?intersections={id_list}&{window}&output={fmt}')
+                if status != 200:
+                    self.stdout.write(self.style.WARNING(f"{fmt:<26} 건너뜀 (status={status})"))
+                    continue
+                self.stdout.write(f"{'export ' + fmt:<26} bytes={size:>12,} ttlb={elapsed:>9.1f}ms")
+
+            if not options['keep']:
+                transaction.set_rollback(True)
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from traffic.models import TrafficVolume
+from traffic.utils.bench import bulk_insert, iter_seasonal_traffic_volumes, seed_intersections
+from traffic.utils.forecast import DAY_SLOTS, DEFAULT_HORIZON, METHODS, backtest, latest_observation, load_history
+
+
+class Command(BaseCommand):
+    help = ('예측 백테스트: 이력의 과거 시점들에서 방법별로 예측해 실제값과 비교한 정확도(MAE/RMSE/WAPE)와 '
+            '처리량(시계열/s) 보고 (기본: DB의 관측 데이터, --synthetic이면 합성 데이터)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON, help='예측 슬롯 수')
+        parser.add_argument('--history-days', type=int, default=28, help='불러올 이력 일수 (백테스트 시점 포함)')
+        parser.add_argument('--origins', type=int, default=7, help='백테스트 시점 수 (하루 간격으로 거슬러 올라감)')
+        parser.add_argument('--methods', type=str, default=','.join(METHODS), help='비교할 방법 (쉼표 구분)')
+        parser.add_argument('--intersections', type=int, default=500, help='사용할 교차로 수 (--synthetic이면 생성할 수)')
+        parser.add_argument('--synthetic', action='store_true', help='합성 교차로/교통량을 만들어 측정 후 롤백')
+
+    def handle(self, *args, **options):
+        methods = [m.strip() for m in options['methods'].split(',') if m.strip()]
+        unknown = [m for m in methods if m not in METHODS]
+        if unknown:
+            raise CommandError(f"알 수 없는 방법: {', '.join(unknown)} (가능: {', '.join(METHODS)})")
+
+        with transaction.atomic():
+            if options['synthetic']:
+                started = time.perf_counter()
+                intersection_ids = seed_intersections(options['intersections'], prefix='BENCH FORECAST')
+                inserted = bulk_insert(
+                    TrafficVolume, iter_seasonal_traffic_volumes(intersection_ids, options['history_days']),
+                )
+                self.stdout.write(f"🧪 합성 데이터 {inserted:,}건 생성 ({time.perf_counter() - started:.1f}s)")
+            else:
+                intersection_ids = list(
+                    TrafficVolume.objects.filter(is_simulated=False).values_list('intersection_id', flat=True)
+                    .distinct().order_by('intersection_id')[:options['intersections']]
+                )
+
+            origin = latest_observation(intersection_ids)
+            if origin is None:
+                self.stdout.write("ℹ️ 백테스트할 관측 데이터가 없습니다 (--synthetic으로 합성 데이터 사용 가능).")
+                return
+            started = time.perf_counter()
+            keys, history = load_history(intersection_ids, origin, options['history_days'])
+            self.stdout.write(
+                f"📥 시계열 {len(keys):,}개 × {history.shape[1]:,}슬롯 로드 ({time.perf_counter() - started:.2f}s), "
+                f"horizon={options['horizon']}, 시점 {options['origins']}개"
+            )
+            results = backtest(history, options['horizon'], methods, origins=options['origins'], step=DAY_SLOTS)
+            for method, result in results.items():
+                self.stdout.write(
+                    f"{method:<16} MAE={result['mae']} RMSE={result['rmse']} WAPE={result['wape']} "
+                    f"({result['points']:,}점, {result['series_per_second'] or 0:,} 시계열/s)"
+                )
+
+            if options['synthetic']:
+                transaction.set_rollback(True)
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from rest_framework.test import APIRequestFactory
+
+from traffic.models import Intersection, TotalTrafficVolume
+from traffic.utils.bench import bulk_insert, format_result, iter_total_volumes, measure, seed_intersections
+from traffic.utils.snapshot import get_snapshot_payload, invalidate_snapshot_cache, refresh_latest_snapshots
+from traffic.views import IntersectionViewSet
+
+
+def legacy_latest_volume():
+    """기존 구현: 교차로마다 상관 서브쿼리 3개"""
+    latest_qs = TotalTrafficVolume.objects.filter(intersection=OuterRef('pk')).order_by('-datetime')
+    intersections = Intersection.objects.annotate(
+        latest_volume=Subquery(latest_qs.values('total_volume')[:1]),
+        latest_speed=Subquery(latest_qs.values('average_speed')[:1]),
+        latest_time=Subquery(latest_qs.values('datetime')[:1]),
+    ).filter(latest_volume__isnull=False)
+    return [(i.id, i.latest_volume, i.latest_speed, i.latest_time) for i in intersections]
+
+
+class Command(BaseCommand):
+    help = 'latest_volume API 벤치마크: 상관 서브쿼리 구현 대비 스냅샷 캐시/304 응답 지연시간 비교'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intersections', type=int, default=5000, help='생성할 교차로 수')
+        parser.add_argument('--days', type=int, default=7, help='교차로별 생성할 15분 슬롯 일수')
+        parser.add_argument('--repeat', type=int, default=20, help='측정 반복 횟수')
+        parser.add_argument('--keep', action='store_true', help='생성한 합성 데이터를 롤백하지 않고 남김')
+
+    def handle(self, *args, **options):
+        view = IntersectionViewSet.as_view({'get': 'latest_volume'})
+        factory = APIRequestFactory()
+        repeat = options['repeat']
+
+        with transaction.atomic():
+            ids = seed_intersections(options['intersections'])
+            inserted = bulk_insert(TotalTrafficVolume, iter_total_volumes(ids, options['days']))
+            refresh_latest_snapshots(ids)
+            self.stdout.write(f"🧪 교차로 {len(ids)}개, TotalTrafficVolume {inserted}건 생성")
+
+            self.stdout.write(format_result('legacy (subquery)', measure(legacy_latest_volume, max(1, repeat // 4))))
+
+            def cold():
+                invalidate_snapshot_cache()
+                return get_snapshot_payload()
+            self.stdout.write(format_result('snapshot (cold)', measure(cold, max(1, repeat // 4))))
+            self.stdout.write(format_result('snapshot (cached)', measure(get_snapshot_payload, repeat)))
+            self.stdout.write(format_result('endpoint 200', measure(lambda: view(factory.get('/')), repeat)))
+
+            etag = get_snapshot_payload()['etag']
+            self.stdout.write(format_result(
+                'endpoint 304', measure(lambda: view(factory.get('/', HTTP_IF_NONE_MATCH=etag)), repeat)
+            ))
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+        invalidate_snapshot_cache()
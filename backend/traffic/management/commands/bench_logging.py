@@ -0,0 +1,117 @@
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from traffic.utils.log import BackgroundHandler, JsonFormatter, log_stats, summarize
+
+LEGACY_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class SlowStream:
+    """flush마다 지연을 넣어 느린 디스크/네트워크 파일시스템을 흉내내는 스트림 래퍼"""
+
+    def __init__(self, stream, delay):
+        self.stream = stream
+        self.delay = delay
+
+    def write(self, data):
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+        time.sleep(self.delay)
+
+    def close(self):
+        self.stream.close()
+
+
+class Command(BaseCommand):
+    help = ('로깅 벤치마크: 동기 FileHandler + 페이로드 기록(기존 방식), 동기 요약 기록, '
+            '백그라운드 큐 요약 기록의 요청 지연시간 비교')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/intersections/map_data/', help='측정할 API 경로')
+        parser.add_argument('--requests', type=int, default=200, help='방식별 요청 수')
+        parser.add_argument('--calls', type=int, default=5000, help='logger.info 단독 측정 호출 수')
+        parser.add_argument('--io-latency', type=float, default=0.0,
+                            help='로그 기록(flush)마다 넣을 지연(ms), 느린 디스크 흉내')
+
+    def handle(self, *args, **options):
+        logger = logging.getLogger('traffic')
+        saved = logger.handlers[:], logger.level, logger.propagate
+        workdir = tempfile.mkdtemp(prefix='bench_logging_')
+        self.io_latency = options['io_latency'] / 1000
+        client = Client()
+        response = client.get(options['path'])  # 워밍업 (색인/캐시 적재)
+        self.stdout.write(f"🧪 {options['path']} → {response.status_code}, 응답 {len(response.content):,}B")
+
+        modes = [
+            ('legacy (sync + payload)', self._sync_handler(workdir, 'legacy.log', logging.Formatter(LEGACY_FORMAT)), True),
+            ('sync + summary', self._sync_handler(workdir, 'sync.log', JsonFormatter()), False),
+            ('queue + summary', None, False),
+        ]
+        try:
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            for label, handler, dump_payload in modes:
+                if handler is None:
+                    target_logger = logging.getLogger('bench_logging.output')
+                    target_logger.propagate = False
+                    target_logger.handlers = [self._sync_handler(workdir, 'queue.log', JsonFormatter())]
+                    handler = BackgroundHandler(target_logger.name)
+                logger.handlers = [handler]
+                timings = self._requests(client, logger, options['path'], options['requests'], dump_payload)
+                per_call = self._calls(logger, options['calls'], dump_payload)
+                dropped = log_stats()['dropped']
+                handler.close()
+                self.stdout.write(self._format(label, timings, per_call))
+                if dropped:
+                    self.stdout.write(f"   (큐 초과로 버린 레코드 누적 {dropped}건)")
+        finally:
+            logger.handlers, level, logger.propagate = saved
+            logger.setLevel(level)
+
+        for name in sorted(os.listdir(workdir)):
+            path = os.path.join(workdir, name)
+            self.stdout.write(f"   {name}: {os.path.getsize(path):,}B")
+            os.remove(path)
+        os.rmdir(workdir)
+
+    def _sync_handler(self, workdir, name, formatter):
+        handler = logging.FileHandler(os.path.join(workdir, name), encoding='utf-8')
+        handler.setFormatter(formatter)
+        if self.io_latency:
+            handler.stream = SlowStream(handler.stream, self.io_latency)
+        return handler
+
+    def _requests(self, client, logger, path, count, dump_payload):
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = client.get(path)
+            if dump_payload:
+                # 기존 뷰처럼 응답 전체를 로그로 남김
+                logger.info(f"응답 데이터: {response.content.decode()}")
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def _calls(self, logger, count, dump_payload):
+        payload = [{'datetime': '2024-01-01T00:00:00+09:00', 'total_volume': i, 'average_speed': 50.0} for i in range(96)]
+        started = time.perf_counter()
+        for i in range(count):
+            if dump_payload:
+                logger.info(f"조회된 데이터: {payload}")
+            else:
+                logger.info("교차로 교통 데이터 조회", extra={'intersection_id': i, 'payload': summarize(payload)})
+        return (time.perf_counter() - started) / count * 1e6
+
+    def _format(self, label, timings, per_call):
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+        return (f"{label:<26} p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms "
+                f"mean={statistics.fmean(timings):.2f}ms  logger.info={per_call:.1f}µs/회")
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from rest_framework.test import APIRequestFactory
+
+from traffic.models import Intersection, TrafficVolume
+from traffic.utils.bench import bulk_insert, format_result, iter_traffic_volumes, measure, seed_intersections
+from traffic.views import IntersectionViewSet
+
+
+def legacy_map_data():
+    """기존 구현: 교차로마다 방향별 집계 쿼리 1회 (N+1)"""
+    data = []
+    for intersection in Intersection.objects.all():
+        traffic_volumes = TrafficVolume.objects.filter(
+            intersection=intersection
+        ).values('direction').annotate(total_volume=Sum('volume'))
+        data.append({
+            'id': intersection.id,
+            'name': intersection.name,
+            'latitude': float(intersection.latitude),
+            'longitude': float(intersection.longitude),
+            'traffic_volumes': list(traffic_volumes),
+        })
+    return data
+
+
+class Command(BaseCommand):
+    help = 'map_data API 벤치마크: 합성 데이터로 기존 N+1 구현과 단일 집계 구현의 쿼리 수/지연시간 비교'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intersections', type=int, default=5000, help='생성할 교차로 수')
+        parser.add_argument('--rows', type=int, default=1_000_000, help='생성할 TrafficVolume 행 수')
+        parser.add_argument('--repeat', type=int, default=5, help='측정 반복 횟수')
+        parser.add_argument('--skip-legacy', action='store_true', help='기존 N+1 구현 측정 생략')
+        parser.add_argument('--keep', action='store_true', help='생성한 합성 데이터를 롤백하지 않고 남김')
+
+    def handle(self, *args, **options):
+        view = IntersectionViewSet.as_view({'get': 'map_data'})
+        factory = APIRequestFactory()
+
+        def call(query=''):
+            response = view(factory.get(f'/api/intersections/map_data/{query}'))
+            response.render()
+            return response
+
+        with transaction.atomic():
+            self.stdout.write(f"🧪 합성 데이터 생성: 교차로 {options['intersections']}개, "
+                              f"TrafficVolume {options['rows']}건")
+            ids = seed_intersections(options['intersections'])
+            inserted = bulk_insert(TrafficVolume, iter_traffic_volumes(ids, options['rows']))
+            self.stdout.write(f"   → {len(ids)}개 교차로, {inserted}건 저장")
+
+            if not options['skip_legacy']:
+                self.stdout.write(format_result('legacy (N+1)', measure(legacy_map_data, options['repeat'])))
+            self.stdout.write(format_result('map_data', measure(call, options['repeat'])))
+            self.stdout.write(format_result(
+                'map_data ?bbox',
+                measure(lambda: call('?bbox=-77.06,-12.06,-77.03,-12.03'), options['repeat'])
+            ))
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+                self.stdout.write("🧹 합성 데이터 롤백")
@@ -0,0 +1,83 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from traffic.utils.intersection_matcher import IntersectionIndex
+
+ROAD_WORDS = [
+    'BOLIVAR', 'BRASIL', 'GRAU', 'ABANCAY', 'TACNA', 'ARICA', 'VENEZUELA', 'COLONIAL', 'SUCRE', 'CORDOVA',
+    'JAVIER', 'PRADO', 'AREQUIPA', 'BENAVIDES', 'ANGAMOS', 'PETIT', 'THOUARS', 'SALAVERRY', 'CUBA', 'HUSARES',
+    'JUNIN', 'GARZON', 'ALFONSO', 'UGARTE', 'NICOLAS', 'PIEROLA', 'EMANCIPACION', 'CAJAMARCA', 'TRUJILLO', 'HUANUCO',
+]
+PREFIXES = ['AV.', 'JR.', 'CA.']
+
+
+def legacy_match(intersections, location_name):
+    """기존 구현: incident마다 모든 교차로 이름을 정규화하며 부분 문자열 비교"""
+    def normalize_road_name(name):
+        return re.sub(r'^(av\.?|jr\.?|ca\.?|alameda)\s+', '', name.strip(), flags=re.IGNORECASE).lower()
+
+    road_parts = [normalize_road_name(part) for part in location_name.split('-')]
+    for pk, name in intersections:
+        norm_inter_name = normalize_road_name(name.lower())
+        if sum(1 for road in road_parts if road in norm_inter_name) >= 2:
+            return pk
+    return None
+
+
+def typo(text, rng):
+    i = rng.randrange(1, len(text) - 1)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+class Command(BaseCommand):
+    help = '교차로 매칭 벤치마크: 기존 중첩 루프 매칭 대비 역색인 매칭 처리량 (DB 사용 안 함)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intersections', type=int, default=10000, help='교차로 수')
+        parser.add_argument('--incidents', type=int, default=100000, help='매칭할 incident 위치 수')
+        parser.add_argument('--legacy-sample', type=int, default=200, help='기존 구현으로 측정할 incident 수 (전체는 너무 느림)')
+        parser.add_argument('--typo-rate', type=float, default=0.1, help='오타가 포함된 위치 비율')
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+
+        def road():
+            words = rng.sample(ROAD_WORDS, rng.choice([1, 2]))
+            return f"{rng.choice(PREFIXES)} {' '.join(words)} {rng.randint(1, 40)}"
+
+        intersections = [(pk, f'{road()} - {road()}') for pk in range(1, options['intersections'] + 1)]
+        locations = []
+        for _ in range(options['incidents']):
+            _, name = rng.choice(intersections)
+            if rng.random() < options['typo_rate']:
+                a, b = name.split(' - ')
+                words = a.split()
+                words[1] = typo(words[1], rng)
+                name = f"{' '.join(words)} - {b}"
+            locations.append(name)
+
+        started = time.perf_counter()
+        index = IntersectionIndex(intersections)
+        build_s = time.perf_counter() - started
+        self.stdout.write(f"색인 생성: {len(index)}개 교차로, 토큰 {len(index.vocabulary)}개, {build_s * 1000:.1f}ms")
+
+        started = time.perf_counter()
+        matched = sum(1 for location in locations if index.match(location) is not None)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"역색인 매칭: {len(locations)}건 중 {matched}건 매칭, {elapsed:.2f}s "
+            f"({len(locations) / elapsed:,.0f} 건/s)"
+        )
+
+        sample = locations[:options['legacy_sample']]
+        started = time.perf_counter()
+        legacy_matched = sum(1 for location in sample if legacy_match(intersections, location) is not None)
+        elapsed = time.perf_counter() - started
+        rate = len(sample) / elapsed
+        self.stdout.write(
+            f"기존 매칭 (표본 {len(sample)}건): {legacy_matched}건 매칭, {elapsed:.2f}s "
+            f"({rate:,.0f} 건/s, 전체 추정 {len(locations) / rate:,.0f}s)"
+        )
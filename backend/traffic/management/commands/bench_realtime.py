@@ -0,0 +1,103 @@
+import asyncio
+import json
+import resource
+import statistics
+import time
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+
+from traffic.utils.broker import get_broker
+
+
+class Command(BaseCommand):
+    help = 'SSE 스트림 부하 테스트: 한 프로세스의 ASGI 앱에 N개 구독자를 붙이고 이벤트 전달률/지연시간 측정'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=1000, help='동시 구독자 수')
+        parser.add_argument('--events', type=int, default=50, help='발행할 이벤트 수')
+        parser.add_argument('--interval', type=float, default=0.05, help='이벤트 발행 간격(초)')
+        parser.add_argument('--slow-clients', type=int, default=0, help='응답을 느리게 읽는 구독자 수 (backpressure 확인용)')
+        parser.add_argument('--slow-delay', type=float, default=0.5, help='느린 구독자의 청크당 지연(초)')
+
+    def handle(self, *args, **options):
+        result = asyncio.run(self.run(options))
+        latencies = result['latencies']
+        expected = options['events'] * (options['subscribers'] - options['slow_clients'])
+        self.stdout.write(f"구독자 {options['subscribers']}명 (느린 구독자 {options['slow_clients']}명), 이벤트 {options['events']}건")
+        self.stdout.write(f"정상 구독자 전달: {result['fast_delivered']}/{expected} "
+                          f"({result['fast_delivered'] / max(expected, 1):.1%})")
+        self.stdout.write(f"느린 구독자 전달: {result['slow_delivered']}건")
+        if latencies:
+            latencies.sort()
+            self.stdout.write(
+                f"전달 지연: p50={statistics.median(latencies):.1f}ms "
+                f"p95={latencies[int(len(latencies) * 0.95) - 1]:.1f}ms "
+                f"p99={latencies[int(len(latencies) * 0.99) - 1]:.1f}ms max={latencies[-1]:.1f}ms"
+            )
+        self.stdout.write(f"구독 연결 수립: {result['connect_s']:.2f}s, "
+                          f"최대 RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    async def run(self, options):
+        app = ASGIHandler()
+        broker = get_broker()
+        stop = asyncio.Event()
+        result = {'latencies': [], 'fast_delivered': 0, 'slow_delivered': 0}
+
+        async def client(slow):
+            sent_request = False
+
+            async def receive():
+                nonlocal sent_request
+                if not sent_request:
+                    sent_request = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await stop.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] != 'http.response.body':
+                    return
+                now = time.perf_counter()
+                for line in message.get('body', b'').decode().splitlines():
+                    if not line.startswith('data: '):
+                        continue
+                    event = json.loads(line[6:])
+                    if 'sent_at' not in event:
+                        continue
+                    if slow:
+                        result['slow_delivered'] += 1
+                    else:
+                        result['fast_delivered'] += 1
+                        result['latencies'].append((now - event['sent_at']) * 1000)
+                if slow:
+                    await asyncio.sleep(options['slow_delay'])
+
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': '/api/stream/', 'raw_path': b'/api/stream/',
+                'query_string': b'channels=slots', 'root_path': '', 'headers': [(b'host', b'testserver')],
+                'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+            }
+            await app(scope, receive, send)
+
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(client(slow=i < options['slow_clients']))
+            for i in range(options['subscribers'])
+        ]
+        while broker.subscriber_count() < options['subscribers']:
+            await asyncio.sleep(0.05)
+        result['connect_s'] = time.perf_counter() - started
+
+        def publisher():
+            for i in range(options['events']):
+                broker.publish('slots', [{'intersection_id': i, 'sent_at': time.perf_counter()}])
+                time.sleep(options['interval'])
+
+        # 발행은 다른 스레드에서 (관리 명령/동기 뷰에서 publish하는 상황과 동일)
+        await asyncio.get_running_loop().run_in_executor(None, publisher)
+        await asyncio.sleep(1)
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return result
@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from traffic.utils.bench import LIMA_CENTER
+from traffic.utils.spatial import GridIndex, haversine_m
+
+
+class Command(BaseCommand):
+    help = '공간 색인 벤치마크: 전체 스캔 대비 격자 색인의 반경/bbox 조회 시간 (DB 사용 안 함)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=100000, help='교차로 수')
+        parser.add_argument('--queries', type=int, default=10000, help='조회 횟수')
+        parser.add_argument('--radius', type=float, default=500, help='반경 조회 반경(m)')
+        parser.add_argument('--spread', type=float, default=0.3, help='좌표 분포 범위(도)')
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        count, spread = options['points'], options['spread']
+        lat0, lon0 = LIMA_CENTER
+        ids = np.arange(1, count + 1)
+        lats = lat0 + rng.uniform(-spread, spread, count)
+        lons = lon0 + rng.uniform(-spread, spread, count)
+        probes = np.column_stack([
+            lat0 + rng.uniform(-spread, spread, options['queries']),
+            lon0 + rng.uniform(-spread, spread, options['queries']),
+        ])
+
+        started = time.perf_counter()
+        index = GridIndex(ids, lats, lons)
+        self.stdout.write(f"색인 생성: {count}개 점, 셀 {len(index.cells)}개, {(time.perf_counter() - started) * 1000:.1f}ms")
+
+        radius = options['radius']
+        started = time.perf_counter()
+        found = sum(len(index.nearby(lat, lon, radius)[0]) for lat, lon in probes)
+        self._report('격자 반경 조회', len(probes), found, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        found = sum(int((haversine_m(lat, lon, lats, lons) <= radius).sum()) for lat, lon in probes)
+        self._report('전체 스캔 반경 조회', len(probes), found, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        found = sum(1 for lat, lon in probes if index.nearest(lat, lon) is not None)
+        self._report('격자 최근접 조회', len(probes), found, time.perf_counter() - started)
+
+        half = 0.01
+        started = time.perf_counter()
+        found = sum(len(index.within((lon - half, lat - half, lon + half, lat + half))) for lat, lon in probes)
+        self._report('격자 bbox 조회', len(probes), found, time.perf_counter() - started)
+
+    def _report(self, label, queries, found, elapsed):
+        self.stdout.write(
+            f"{label}: {queries}회, 결과 {found}건, {elapsed:.2f}s "
+            f"({elapsed / queries * 1e6:,.1f}µs/회)"
+        )
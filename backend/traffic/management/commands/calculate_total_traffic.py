@@ -1,50 +1,62 @@
-from django.core.management.base import BaseCommand
-from traffic.models import TrafficVolume, TotalTrafficVolume, Intersection
-from datetime import datetime
-from collections import defaultdict
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from traffic.models import ProcessingCheckpoint
+from traffic.utils.aggregation import lagged_watermark, recompute_total_volumes, touched_windows
+from traffic.utils.query_params import parse_datetime_param
+
+CHECKPOINT_NAME = 'calculate_total_traffic'
+
 
 class Command(BaseCommand):
-    help = 'TrafficVolume에 존재하는 교차로만 대상으로 15분 단위 총량 및 속도 계산 후 TotalTrafficVolume에 저장'
+    help = 'TrafficVolume을 15분 단위로 DB에서 집계해 TotalTrafficVolume에 upsert (기본: watermark 이후 변경분만)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='전체 이력을 다시 계산')
+        parser.add_argument('--since', type=str, help='재계산 시작 시각 (ISO 8601, 포함)')
+        parser.add_argument('--until', type=str, help='재계산 종료 시각 (ISO 8601, 해당 슬롯 포함)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='bulk upsert 배치 크기')
 
     def handle(self, *args, **options):
-        TotalTrafficVolume.objects.all().delete()
-        self.stdout.write("🧹 기존 TotalTrafficVolume 데이터 삭제 완료")
-
-        # 데이터가 있는 교차로 ID만 추출
-        intersection_ids = TrafficVolume.objects.values_list('intersection_id', flat=True).distinct()
-        intersections = Intersection.objects.filter(id__in=intersection_ids)
-
-        for intersection in intersections:
-            self.stdout.write(f"\n🛣️ 교차로: {intersection.name}")
-
-            all_volumes = TrafficVolume.objects.filter(intersection=intersection).order_by('datetime')
-            slot_dict = defaultdict(list)
-
-            for v in all_volumes:
-                # 15분 단위로 시간 정규화
-                slot_start = v.datetime.replace(minute=(v.datetime.minute // 15) * 15, second=0, microsecond=0)
-                slot_dict[slot_start].append(v.volume)
-
-            bulk_objects = []
-
-            for slot_start, volume_list in slot_dict.items():
-                total_volume = sum(volume_list)
-
-                # 평균 속도 계산: volume이 많을수록 감속
-                base_speed = 50.0
-                if total_volume > 1000:
-                    avg_speed = base_speed * 0.5
-                elif total_volume > 500:
-                    avg_speed = base_speed * 0.7
-                else:
-                    avg_speed = base_speed
-
-                bulk_objects.append(TotalTrafficVolume(
-                    intersection=intersection,
-                    datetime=slot_start,
-                    total_volume=total_volume,
-                    average_speed=round(avg_speed, 2)
-                ))
-
-            TotalTrafficVolume.objects.bulk_create(bulk_objects)
-            self.stdout.write(f"✅ 저장 완료: {len(bulk_objects)}건") 
\ No newline at end of file
+        try:
+            since = parse_datetime_param(options['since'], 'since')
+            until = parse_datetime_param(options['until'], 'until')
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started_at = timezone.now()
+        checkpoint, _ = ProcessingCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+
+        if options['full']:
+            mode = 'full'
+            windows = [(None, None, None)]
+        elif since or until:
+            mode = 'window'
+            windows = [(None, since, until)]
+        elif checkpoint.watermark is None:
+            mode = 'full'
+            windows = [(None, None, None)]
+            self.stdout.write("ℹ️ watermark가 없어 전체 재계산으로 진행")
+        else:
+            mode = 'incremental'
+            windows = touched_windows(checkpoint.watermark, until=started_at)
+            self.stdout.write(f"🔎 {checkpoint.watermark} 이후 변경된 교차로: {len(windows)}개")
+
+        if not windows:
+            self.stdout.write(self.style.SUCCESS("✅ 변경된 데이터가 없습니다."))
+        else:
+            elapsed = time.perf_counter()
+            stats = recompute_total_volumes(windows, batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - elapsed
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ [{mode}] 교차로 {len(stats['intersection_ids'])}개, "
+                f"슬롯 {stats['upserted']}건 upsert, {stats['deleted']}건 삭제 "
+                f"({stats['slot_min']} ~ {stats['slot_max']}, {elapsed:.2f}s)"
+            ))
+
+        # 기간 지정 재계산은 일부 구간만 다루므로 watermark를 옮기지 않는다
+        if mode != 'window':
+            checkpoint.watermark = lagged_watermark(started_at)
+            checkpoint.save(update_fields=['watermark', 'updated_at'])
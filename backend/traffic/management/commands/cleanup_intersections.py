@@ -1,25 +1,47 @@
 from django.core.management.base import BaseCommand
-from traffic.models import Intersection
-import re
+
+from traffic.utils.intersection_names import normalize_intersection_names, two_road_name
+
 
 class Command(BaseCommand):
     help = '교차로 name을 정규화하고, 도로가 2개가 아닌 교차로는 삭제'
 
+    # 이름 규칙: 원래 이름 → 새 이름 (None이면 삭제)
+    rule = staticmethod(two_road_name)
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='DB를 바꾸지 않고 변경 예정 내역만 출력')
+        parser.add_argument('--merge-duplicates', action='store_true',
+                            help='정규화 후 이름이 같은 교차로를 하나로 병합 (교통량/사건 FK 이동)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk_update/삭제 배치 크기')
+        parser.add_argument('--verbose-changes', action='store_true', help='바뀌는 이름을 모두 출력')
+
     def handle(self, *args, **options):
-        qs = Intersection.objects.all()
-        cleaned = 0
-        deleted = 0
-        for i in qs:
-            # 부가정보 제거
-            n = re.sub(r'(Distrito:.*|Codigo de Red:.*|Red:.*|Año.*|Instalado:.*)', '', i.name)
-            n = n.strip(' -')
-            # 도로명 분리
-            roads = [r.strip() for r in re.split(r'[-/]',' '.join(n.split())) if r.strip()]
-            if len(roads) == 2:
-                i.name = f'{roads[0]} - {roads[1]}'
-                i.save()
-                cleaned += 1
-            else:
-                i.delete()
-                deleted += 1
-        self.stdout.write(self.style.SUCCESS(f'정규화 완료: {cleaned}개, 삭제: {deleted}개')) 
\ No newline at end of file
+        result = normalize_intersection_names(
+            self.rule,
+            dry_run=options['dry_run'],
+            merge_duplicates=options['merge_duplicates'],
+            batch_size=options['batch_size'],
+        )
+        renames, deletes, merges = result['renames'], result['deletes'], result['merges']
+
+        if options['dry_run'] or options['verbose_changes']:
+            for pk, old, new in renames:
+                self.stdout.write(f'수정: [{pk}] {old} → {new}')
+            for pk, old in deletes:
+                self.stdout.write(f'삭제: [{pk}] {old}')
+            for survivor, losers, name in merges:
+                self.stdout.write(f'병합: {losers} → [{survivor}] {name}')
+
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}정규화 완료: {len(renames)}개, 삭제: {len(deletes)}개, 병합: {sum(len(m[1]) for m in merges)}개'
+        ))
+
+        stats = result['merge_stats']
+        if stats:
+            moved = ', '.join(f'{name} {count}' for name, count in stats['moved'].items() if count)
+            dropped = ', '.join(f'{name} {count}' for name, count in stats['dropped'].items() if count)
+            self.stdout.write(f"📦 이동: {moved or '없음'} / 사건 {stats['incidents']}")
+            if dropped:
+                self.stdout.write(self.style.WARNING(f'⚠️ 중복 슬롯으로 버려진 행: {dropped}'))
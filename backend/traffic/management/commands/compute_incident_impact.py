@@ -0,0 +1,45 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from traffic.models import ProcessingCheckpoint
+from traffic.utils.aggregation import lagged_watermark
+from traffic.utils.incident_impact import HEALTH_PERIOD, IMPACT_CHECKPOINT, compute_incident_impacts, refresh_health
+
+
+class Command(BaseCommand):
+    help = ('사고 영향 구간의 교통량/속도를 기준선과 비교해 IncidentImpact에 저장하고 교차로 건강 점수 갱신 '
+            '(기본: 바뀐 사고와 watermark 이후 교통량이 바뀐 구간만)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='모든 사고의 영향을 다시 계산')
+        parser.add_argument('--period-days', type=int, default=HEALTH_PERIOD.days, help='건강 점수에 반영할 최근 기간(일)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='bulk upsert 배치 크기')
+
+    def handle(self, *args, **options):
+        started_at = timezone.now()
+        checkpoint, _ = ProcessingCheckpoint.objects.get_or_create(name=IMPACT_CHECKPOINT)
+        full = options['full'] or checkpoint.watermark is None
+        if checkpoint.watermark is None and not options['full']:
+            self.stdout.write("ℹ️ watermark가 없어 전체 재계산으로 진행")
+
+        elapsed = time.perf_counter()
+        stats = compute_incident_impacts(
+            started_at, watermark=checkpoint.watermark, full=full, batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ [{'full' if full else 'incremental'}] 사고 영향 {stats['upserted']}건 계산, "
+            f"{stats['deleted']}건 삭제 ({time.perf_counter() - elapsed:.2f}s)"
+        ))
+
+        elapsed = time.perf_counter()
+        health = refresh_health(started_at, timedelta(days=options['period_days']), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 교차로 건강 점수 {health['intersections']}개 갱신, {health['deleted']}개 제외 "
+            f"(최근 {options['period_days']}일, {time.perf_counter() - elapsed:.2f}s)"
+        ))
+
+        checkpoint.watermark = lagged_watermark(started_at)
+        checkpoint.save(update_fields=['watermark', 'updated_at'])
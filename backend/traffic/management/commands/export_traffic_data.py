@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from traffic.utils.export import EXPORT_FORMATS, EXPORT_SOURCES, iter_export
+from traffic.utils.query_params import parse_datetime_param, parse_id_list
+
+
+class Command(BaseCommand):
+    help = 'TotalTrafficVolume/TrafficVolume 범위를 gzip CSV, Arrow IPC, Parquet 파일로 내보내기'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, required=True, help='저장할 파일 경로')
+        parser.add_argument('--format', type=str, default='csv', choices=list(EXPORT_FORMATS), help='출력 형식')
+        parser.add_argument('--source', type=str, default='total', choices=list(EXPORT_SOURCES), help='대상 테이블')
+        parser.add_argument('--intersections', type=str, help='교차로 id 목록 (예: 1,2,3)')
+        parser.add_argument('--start-time', type=str, help='시작 시각 (ISO 8601)')
+        parser.add_argument('--end-time', type=str, help='종료 시각 (ISO 8601)')
+        parser.add_argument('--directions', type=str, help='방향 목록 (source=volume 전용, 예: NS,SN)')
+        parser.add_argument('--batch-size', type=int, default=50000, help='컬럼 배치 행 수')
+
+    def handle(self, *args, **options):
+        try:
+            chunks = iter_export(
+                options['format'],
+                options['source'],
+                intersection_ids=parse_id_list(options['intersections'], 'intersections'),
+                start_time=parse_datetime_param(options['start_time'], 'start_time'),
+                end_time=parse_datetime_param(options['end_time'], 'end_time'),
+                directions=[d for d in (options['directions'] or '').upper().split(',') if d],
+                batch_size=options['batch_size'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        size = 0
+        with open(options['output'], 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {options['output']} 저장 완료 ({size / 1024:,.1f} KB, {elapsed:.2f}s)"
+        ))
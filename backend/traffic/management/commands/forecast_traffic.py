@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from traffic.utils.forecast import (
+    DEFAULT_HISTORY_DAYS, DEFAULT_HORIZON, DEFAULT_METHOD, MAX_HORIZON, METHODS, write_forecasts,
+)
+from traffic.utils.query_params import parse_id_list
+
+
+class Command(BaseCommand):
+    help = ('교차로×방향별로 마지막 관측 슬롯 다음 N개 15분 슬롯 교통량을 예측해 '
+            'is_simulated=True TrafficVolume으로 저장 (기존 예측은 교체)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON, help=f'예측할 슬롯 수 (최대 {MAX_HORIZON})')
+        parser.add_argument('--method', choices=list(METHODS), default=DEFAULT_METHOD, help='예측 방법')
+        parser.add_argument('--history-days', type=int, default=DEFAULT_HISTORY_DAYS, help='예측에 쓰는 최근 이력 일수')
+        parser.add_argument('--intersections', type=str, help='예측할 교차로 id 목록 (쉼표 구분, 기본: 최근 관측이 있는 전체)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='bulk insert 배치 크기')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['horizon'] <= MAX_HORIZON:
+            raise CommandError(f"--horizon은 1~{MAX_HORIZON} 범위여야 합니다.")
+        try:
+            intersection_ids = parse_id_list(options['intersections'], 'intersections') or None
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        stats = write_forecasts(
+            horizon=options['horizon'],
+            method=options['method'],
+            days=options['history_days'],
+            intersection_ids=intersection_ids,
+            batch_size=options['batch_size'],
+        )
+        elapsed = time.perf_counter() - started
+        if stats['origin'] is None:
+            self.stdout.write("ℹ️ 예측에 쓸 관측 데이터가 없습니다.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ [{options['method']}] {stats['origin']} 이후 {options['horizon']}슬롯: "
+            f"시계열 {stats['series']:,}개, 예측 {stats['rows']:,}건 저장, 이전 예측 {stats['deleted']:,}건 삭제 "
+            f"({elapsed:.2f}s, {stats['series'] / max(elapsed, 1e-9):,.0f} 시계열/s)"
+        ))
@@ -0,0 +1,93 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from traffic.models import Incident, Intersection, TrafficVolume
+from traffic.utils.aggregation import recompute_total_volumes
+from traffic.utils.bench import bulk_insert, iter_seasonal_traffic_volumes, iter_synthetic_incidents, seed_intersections
+from traffic.utils.spatial import invalidate_spatial_index
+
+DEFAULT_PREFIX = 'SYNTH'
+
+
+class Command(BaseCommand):
+    help = ('벤치마크/개발용 합성 데이터 생성: 리마 중심 격자 교차로, 방향별 일/주 계절성이 있는 '
+            '15분 TrafficVolume, 사고 (bulk insert, 기본으로 TotalTrafficVolume 집계까지 실행)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intersections', type=int, default=200, help='생성할 교차로 수')
+        parser.add_argument('--days', type=int, default=14, help='교차로별 교통량 일수 (오늘 0시까지)')
+        parser.add_argument('--incidents', type=int, default=1000, help='생성할 사고 수')
+        parser.add_argument('--prefix', default=DEFAULT_PREFIX, help='합성 교차로 이름 접두사')
+        parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+        parser.add_argument('--batch-size', type=int, default=10000, help='bulk insert 배치 크기')
+        parser.add_argument('--skip-aggregate', action='store_true', help='TotalTrafficVolume 집계를 생략')
+        parser.add_argument('--clear', action='store_true', help='같은 접두사의 기존 합성 데이터를 먼저 삭제')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if not prefix.strip():
+            raise CommandError("--prefix가 비어 있으면 기존 교차로와 구분할 수 없습니다.")
+        existing = Intersection.objects.filter(name__startswith=f'{prefix} ')
+        if options['clear']:
+            deleted = self._clear(existing)
+            self.stdout.write(f"🧹 기존 합성 데이터 삭제: 교차로 {deleted['intersections']:,}개, 사고 {deleted['incidents']:,}건")
+        elif existing.exists():
+            raise CommandError(f"'{prefix}' 접두사의 교차로가 이미 있습니다 (--clear로 지우거나 --prefix를 바꾸세요).")
+
+        start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=options['days'])
+        started = time.perf_counter()
+        with transaction.atomic():
+            intersection_ids = seed_intersections(options['intersections'], prefix=f'{prefix} ', batch_size=options['batch_size'])
+        invalidate_spatial_index()
+        self._report('교차로', len(intersection_ids), started)
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            volumes = bulk_insert(
+                TrafficVolume,
+                iter_seasonal_traffic_volumes(intersection_ids, options['days'], start=start, seed=options['seed']),
+                batch_size=options['batch_size'],
+            )
+        self._report('TrafficVolume', volumes, started)
+
+        started = time.perf_counter()
+        first_ticket = (Incident.objects.aggregate(last=Max('ticket_number'))['last'] or 0) + 1
+        with transaction.atomic():
+            incidents = bulk_insert(
+                Incident,
+                iter_synthetic_incidents(
+                    intersection_ids, options['incidents'], options['days'], start=start,
+                    seed=options['seed'], first_ticket=first_ticket,
+                ),
+                batch_size=options['batch_size'],
+            )
+        self._report('Incident', incidents, started)
+
+        if not options['skip_aggregate'] and volumes:
+            started = time.perf_counter()
+            windows = [(intersection_id, start, timezone.localtime()) for intersection_id in intersection_ids]
+            stats = recompute_total_volumes(windows, batch_size=options['batch_size'])
+            self._report('TotalTrafficVolume 슬롯', stats['upserted'], started)
+
+    def _clear(self, intersections):
+        ids = list(intersections.values_list('id', flat=True))
+        incidents = Incident.objects.filter(intersection_id__in=ids)
+        deleted = {'intersections': len(ids), 'incidents': incidents.count()}
+        with transaction.atomic():
+            incidents.delete()
+            # 교통량 행이 많으므로 교차로를 나눠서 지운다 (연결된 교통량/집계는 CASCADE)
+            for i in range(0, len(ids), 50):
+                Intersection.objects.filter(id__in=ids[i:i + 50]).delete()
+        invalidate_spatial_index()
+        return deleted
+
+    def _report(self, label, count, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {label} {count:,}건 생성 ({elapsed:.2f}s, {count / max(elapsed, 1e-9):,.0f} rows/s)"
+        ))
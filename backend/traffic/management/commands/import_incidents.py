@@ -1,99 +1,155 @@
 # traffic/management/commands/import_incidents.py
 
+import glob
+import os
+import time
+
 import pandas as pd
-import re
-from django.core.management.base import BaseCommand
-from traffic.models import Incident, Intersection
-from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from traffic.models import Incident
+from traffic.utils.bulk import bulk_upsert, chunked
+from traffic.utils.incident_stats import INCIDENT_SCOPE
+from traffic.utils.intersection_matcher import get_intersection_index
+from traffic.utils.query_cache import invalidate_windows
+from traffic.utils.realtime import publish_incident_events
+
+DEFAULT_PATH = 'data/incidents/reporte_incidencias 23.04.2025.xls'
+REPORT_EXTENSIONS = ('.xls', '.xlsx')
+
+# 엑셀 열 이름(스페인어) → Incident 필드
+COLUMN_MAP = {
+    'Nro': 'incident_number',
+    'Ticket': 'ticket_number',
+    'Incidencia': 'incident_type',
+    'Tipo': 'incident_detail_type',
+    'Cruce': 'location_name',
+    'Distrito': 'district',
+    'Administrado por': 'managed_by',
+    'Asignado a': 'assigned_to',
+    'Detalle': 'description',
+    'Operador': 'operator',
+    'Estado': 'status',
+    'Fecha de registro': 'registered_at',
+    'Fecha ultimo Estado': 'last_status_update',
+}
+# 'Día', 'Mes', 'Año' 열은 registered_at과 중복이라 읽지 않는다
+TEXT_FIELDS = [
+    'incident_type', 'incident_detail_type', 'location_name', 'district', 'managed_by',
+    'assigned_to', 'description', 'operator', 'status',
+]
+INT_FIELDS = ['incident_number', 'ticket_number']
+DATETIME_FIELDS = ['registered_at', 'last_status_update']
+UPDATE_FIELDS = [f for f in COLUMN_MAP.values() if f != 'ticket_number'] + ['intersection']
+
+
+def resolve_report_paths(patterns):
+    """파일 경로, 디렉토리, glob 패턴을 실제 리포트 파일 목록으로 변환 (이름순)"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths += [
+                os.path.join(pattern, name) for name in os.listdir(pattern)
+                if name.lower().endswith(REPORT_EXTENSIONS)
+            ]
+        else:
+            paths += glob.glob(pattern) or ([pattern] if os.path.exists(pattern) else [])
+    return sorted(set(paths))
 
 
 class Command(BaseCommand):
     help = 'Import incident data from Excel and link with intersections'
 
-    def handle(self, *args, **options):
-        df = pd.read_excel('data/incidents/reporte_incidencias 23.04.2025.xls')
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=[DEFAULT_PATH], help='리포트 파일, 디렉토리 또는 glob 패턴')
+        parser.add_argument('--batch-size', type=int, default=2000, help='bulk upsert 배치 크기')
 
-        # 열 이름 영어로 변환
+    def read_report(self, path):
+        """리포트 1개를 Incident 필드 이름의 DataFrame으로 변환 (벡터 연산)"""
+        df = pd.read_excel(path)
         df.columns = df.columns.str.strip()
+        df = df.rename(columns=COLUMN_MAP)
+        missing = set(COLUMN_MAP.values()) - set(df.columns)
+        if missing:
+            raise CommandError(f'{path}: 필요한 열이 없습니다: {sorted(missing)}')
+        df = df[list(COLUMN_MAP.values())]
+
+        df[TEXT_FIELDS] = df[TEXT_FIELDS].fillna('').astype(str)
+        for field in INT_FIELDS:
+            df[field] = pd.to_numeric(df[field], errors='coerce')
+        tz = timezone.get_default_timezone_name()
+        for field in DATETIME_FIELDS:
+            df[field] = pd.to_datetime(df[field], errors='coerce').dt.tz_localize(tz, ambiguous='NaT', nonexistent='NaT')
+        return df.dropna(subset=INT_FIELDS + DATETIME_FIELDS)
 
-        df = df.rename(columns={
-            'Nro': 'incident_number',
-            'Ticket': 'ticket_number',
-            'Incidencia': 'incident_type',
-            'Tipo': 'incident_detail_type',
-            'Cruce': 'location_name',
-            'Distrito': 'district',
-            'Administrado por': 'managed_by',
-            'Asignado a': 'assigned_to',
-            'Detalle': 'description',
-            'Operador': 'operator',
-            'Estado': 'status',
-            'Fecha de registro': 'registered_at',
-            'Fecha ultimo Estado': 'last_status_update',
-            'Día': 'day',
-            'Mes': 'month',
-            'Año': 'year',
-        })
-
-        print("✅ 변환된 열 목록:", df.columns.tolist())
-
-        # 기존 데이터 삭제
-        Incident.objects.all().delete()
-
-        # Intersection 전체 캐싱
-        intersections = list(Intersection.objects.all())
-        unmatched_locations = []
-
-        def normalize_road_name(name: str) -> str:
-            """도로명 접두사 제거 (AV., JR., CA. 등)"""
-            return re.sub(r'^(av\.?|jr\.?|ca\.?|alameda)\s+', '', name.strip(), flags=re.IGNORECASE).lower()
-
-        def match_intersection(location_name: str):
-            try:
-                road_parts = [normalize_road_name(part) for part in location_name.split("-")]
-            except Exception:
-                return None
-
-            for inter in intersections:
-                name = inter.name.lower()
-                norm_inter_name = normalize_road_name(name)
-
-                match_count = sum(1 for road in road_parts if road in norm_inter_name)
-                if match_count >= 2:
-                    return inter
-            return None
-
-        # 데이터 삽입
-        for _, row in df.iterrows():
-            intersection = match_intersection(row['location_name'])
-
-            if intersection is None:
-                unmatched_locations.append(row['location_name'])
-
-            Incident.objects.create(
-                incident_number=row['incident_number'],
-                ticket_number=row['ticket_number'],
-                incident_type=row['incident_type'],
-                incident_detail_type=row['incident_detail_type'],
-                location_name=row['location_name'],
-                district=row['district'],
-                managed_by=row['managed_by'],
-                assigned_to=row['assigned_to'],
-                description=row['description'],
-                operator=row['operator'],
-                status=row['status'],
-                registered_at=row['registered_at'],
-                last_status_update=row['last_status_update'],
-                day=row['day'],
-                month=row['month'],
-                year=row['year'],
-                intersection=intersection,
+    def handle(self, *args, **options):
+        paths = resolve_report_paths(options['paths'])
+        if not paths:
+            raise CommandError(f"리포트 파일을 찾을 수 없습니다: {options['paths']}")
+
+        started = time.perf_counter()
+        frames = []
+        for i, path in enumerate(paths, 1):
+            df = self.read_report(path)
+            frames.append(df)
+            self.stdout.write(f'[{i}/{len(paths)}] {os.path.basename(path)}: {len(df)}건')
+        df = pd.concat(frames, ignore_index=True)
+        # 같은 티켓이 여러 리포트에 있으면 나중 파일(최신 상태) 기준
+        df = df.drop_duplicates(subset='ticket_number', keep='last')
+        df[INT_FIELDS] = df[INT_FIELDS].astype('int64')
+        read_s = time.perf_counter() - started
+
+        # 교차로 매칭은 고유 위치별로 한 번만
+        index = get_intersection_index()
+        locations = df['location_name'].unique()
+        location_to_id = {location: index.match(location) for location in locations}
+        df['intersection_id'] = df['location_name'].map(location_to_id)
+        unmatched_locations = sorted(location for location, pk in location_to_id.items() if pk is None)
+
+        # IN 목록이 DB 파라미터 한도를 넘지 않도록 배치 크기로 나눠 조회
+        batch_size = options['batch_size']
+        existing = {}
+        for tickets in chunked(df['ticket_number'].tolist(), batch_size):
+            existing.update(
+                Incident.objects.filter(ticket_number__in=tickets).values_list('ticket_number', 'registered_at')
             )
-
-        self.stdout.write(self.style.SUCCESS('✅ Incident data import 완료'))
+        fields = list(COLUMN_MAP.values()) + ['intersection_id']
+        objs = (
+            Incident(**{field: (None if pd.isna(value) else value) for field, value in zip(fields, row)})
+            for row in df[fields].itertuples(index=False, name=None)
+        )
+
+        write_started = time.perf_counter()
+        with transaction.atomic():
+            count = bulk_upsert(
+                Incident, objs,
+                unique_fields=['ticket_number'],
+                update_fields=UPDATE_FIELDS,
+                batch_size=batch_size,
+            )
+            new_tickets = [int(t) for t in df['ticket_number'] if t not in existing]
+            transaction.on_commit(lambda: publish_incident_events(
+                pk for tickets in chunked(new_tickets, batch_size)
+                for pk in Incident.objects.filter(ticket_number__in=tickets).values_list('id', flat=True)
+            ))
+            # 집계 캐시: 새 등록 시각과 (갱신된 사고의) 기존 등록 시각이 걸친 월만 무효화
+            registered = [ts.to_pydatetime() for ts in (df['registered_at'].min(), df['registered_at'].max())]
+            registered += existing.values()
+            transaction.on_commit(lambda: invalidate_windows([INCIDENT_SCOPE], min(registered), max(registered)))
+        write_s = time.perf_counter() - write_started
+        total_s = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Incident data import 완료: 파일 {len(paths)}개, {count}건 (신규 {len(new_tickets)}건, 갱신 {count - len(new_tickets)}건)'
+        ))
+        self.stdout.write(
+            f'   읽기 {read_s:.2f}s, 저장 {write_s:.2f}s, 전체 {total_s:.2f}s ({count / max(total_s, 1e-9):,.0f} 건/s)'
+        )
 
         if unmatched_locations:
-            self.stdout.write(self.style.WARNING(f'⚠️ 매칭 실패: {len(unmatched_locations)}건의 교차로를 찾을 수 없음'))
+            self.stdout.write(self.style.WARNING(f'⚠️ 매칭 실패: {len(unmatched_locations)}개 위치의 교차로를 찾을 수 없음'))
             for loc in unmatched_locations:
                 self.stdout.write(f'   - {loc}')
         else:
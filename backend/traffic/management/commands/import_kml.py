@@ -1,25 +1,49 @@
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from lxml import etree
+
 from traffic.models import Intersection
-from traffic.utils.kml_parser import parse_kml_to_intersections  # ← 이게 핵심!
+from traffic.utils.kml_parser import iter_kml_files
+
 
 class Command(BaseCommand):
-    help = 'Import intersections from KML file'
+    help = 'Import intersections from KML files (streaming parse, bulk insert)'
 
     def add_arguments(self, parser):
-        parser.add_argument('kml_path', type=str, help='Path to the KML file')
+        parser.add_argument('kml_paths', nargs='+', type=str, help='Path(s) to the KML file(s)')
+        parser.add_argument('--workers', type=int, default=1, help='여러 파일을 동시에 파싱할 프로세스 수')
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk insert 배치 크기')
+        parser.add_argument('--dry-run', action='store_true', help='DB에 쓰지 않고 파싱/신규 건수만 출력')
 
     def handle(self, *args, **options):
-        kml_path = options['kml_path']
-        intersections = parse_kml_to_intersections(kml_path)
-
+        started = time.perf_counter()
+        # get_or_create와 같은 기준: (name, latitude, longitude)가 모두 같으면 기존 교차로
+        existing = set(Intersection.objects.values_list('name', 'latitude', 'longitude'))
+        parsed_count = 0
         created_count = 0
-        for item in intersections:
-            _, created = Intersection.objects.get_or_create(
-                name=item['name'],
-                latitude=item['latitude'],
-                longitude=item['longitude']
-            )
-            if created:
-                created_count += 1
-
-        self.stdout.write(self.style.SUCCESS(f"{created_count} intersections inserted."))
+
+        try:
+            with transaction.atomic():
+                for path, batch in iter_kml_files(options['kml_paths'], options['workers'], options['batch_size']):
+                    parsed_count += len(batch)
+                    new_rows = []
+                    for item in batch:
+                        key = (item['name'], item['latitude'], item['longitude'])
+                        if key not in existing:
+                            existing.add(key)
+                            new_rows.append(Intersection(**item))
+
+                    if new_rows and not options['dry_run']:
+                        Intersection.objects.bulk_create(new_rows, batch_size=options['batch_size'])
+                    created_count += len(new_rows)
+                    self.stdout.write(f"📄 {path}: {len(batch)}개 파싱, 신규 {len(new_rows)}개")
+        except (OSError, etree.XMLSyntaxError) as e:
+            raise CommandError(f"KML 파일을 읽을 수 없습니다: {e}")
+
+        elapsed = time.perf_counter() - started
+        prefix = "[dry-run] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{created_count} intersections inserted. (파싱 {parsed_count}개, {elapsed:.2f}s)"
+        ))
@@ -1,11 +1,21 @@
-from django.core.management.base import BaseCommand
-from traffic.models import Intersection, TrafficVolume
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from traffic.models import TrafficVolume
+from traffic.utils.bulk import bulk_upsert
+from traffic.utils.intersection_matcher import SHEET_TO_INTERSECTION, get_intersection_index
+from traffic.utils.partitions import ensure_writable
+from traffic.utils.query_cache import ALL_INTERSECTIONS, invalidate_windows
 import pandas as pd
-import difflib
-import re
 import os
-from datetime import datetime
-import unicodedata
+import re
+import time
+
+# 엑셀 방향 표기(스페인어) → DB 방향 코드
+DIRECTION_ALIASES = {'OE': 'WE', 'EO': 'EW'}
+VALID_DIRECTIONS = [code for code, _ in TrafficVolume.DIRECTION_CHOICES]
+# pandas는 중복 헤더에 '.1', '.2'를 붙인다 ('Divided4' 블록의 ÷4 값 등 원본 컬럼의 사본)
+DUPLICATE_COLUMN = re.compile(r'\)\.\d+$')
 
 class Command(BaseCommand):
     help = '엑셀에서 교통량 데이터를 추출해 intersection 유사도 매칭 및 방향 변환 테스트'
@@ -13,86 +23,126 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--file', type=str, required=True, help='엑셀 파일 경로')
         parser.add_argument('--dry-run', action='store_true', help='DB 저장 없이 매칭 결과만 출력')
+        parser.add_argument('--batch-size', type=int, default=5000, help='bulk upsert 배치 크기')
+
+    def build_volume_frame(self, df):
+        """시트 DataFrame을 (datetime, direction, volume) long 포맷으로 변환 (벡터 연산)"""
+        traffic_cols = [
+            col for col in df.columns
+            if '(' in str(col) and ')' in str(col)
+            and 'divided' not in str(col).lower() and 'total' not in str(col).lower()
+            and not DUPLICATE_COLUMN.search(str(col))
+        ]
+        if not traffic_cols or 'DAY' not in df.columns or 'Time' not in df.columns:
+            return pd.DataFrame(columns=['datetime', 'direction', 'volume'])
+
+        days = pd.to_datetime(df['DAY'], errors='coerce').dt.normalize()
+        if pd.api.types.is_datetime64_any_dtype(df['Time']):
+            times = df['Time'] - df['Time'].dt.normalize()
+        else:
+            times = pd.to_timedelta(df['Time'].astype(str), errors='coerce')
+        wide = df[traffic_cols].copy()
+        wide['datetime'] = days + times
+        wide = wide.dropna(subset=['datetime'])
+
+        long = wide.melt(id_vars='datetime', var_name='column', value_name='volume')
+        long['volume'] = pd.to_numeric(long['volume'], errors='coerce')
+        long['direction'] = (
+            long['column'].astype(str).str.extract(r'\(([A-Za-z]+)\)', expand=False)
+            .str.upper().replace(DIRECTION_ALIASES)
+        )
+        long = long.dropna(subset=['volume', 'direction'])
+        long = long[long['direction'].isin(VALID_DIRECTIONS)]
+        # 같은 (시간, 방향)이 여러 컬럼에 있으면 첫 값 사용 (upsert 한 배치 내 충돌 방지),
+        # 값이 서로 다르면 어느 쪽이 맞는지 알 수 없으므로 저장하지 않고 중단
+        conflicts = long.groupby(['datetime', 'direction'])['volume'].nunique()
+        conflicts = conflicts[conflicts > 1]
+        if not conflicts.empty:
+            dt, direction = conflicts.index[0]
+            raise CommandError(
+                f'같은 시각/방향에 서로 다른 교통량 컬럼이 있습니다: {dt} {direction} '
+                f'(충돌 {len(conflicts)}건, 컬럼: {sorted(long["column"].unique())})'
+            )
+        long = long.drop_duplicates(subset=['datetime', 'direction'], keep='first')
 
-    def normalize_road(self, name):
-        if not name:
-            return ''
-        # 대소문자, 악센트, 공백, 특수문자 제거
-        name = str(name)
-        name = unicodedata.normalize('NFKD', name)
-        name = ''.join([c for c in name if not unicodedata.combining(c)])
-        name = name.upper()
-        # 접두사 제거
-        for prefix in ['AV.', 'AV', 'JR.', 'JR', 'CA.', 'CA', 'CL.', 'CL']:
-            if name.startswith(prefix + ' '):
-                name = name[len(prefix)+1:]
-            elif name.startswith(prefix):
-                name = name[len(prefix):]
-        # 불필요한 뒷부분(예: Distrito 등) 제거
-        name = name.split('DISTRITO')[0].strip()
-        name = name.split('CODIGO')[0].strip()
-        name = name.split('RED')[0].strip()
-        name = name.split('AÑO')[0].strip()
-        name = name.replace('-', ' - ')
-        name = re.sub(r'\s+', ' ', name)
-        return name.strip()
+        long['datetime'] = long['datetime'].dt.tz_localize(
+            timezone.get_default_timezone_name(), ambiguous='NaT', nonexistent='NaT'
+        )
+        long = long.dropna(subset=['datetime'])
+        long['volume'] = long['volume'].astype('int64')
+        return long[['datetime', 'direction', 'volume']]
 
     def handle(self, *args, **options):
         file_path = options['file']
         dry_run = options.get('dry_run', False)
+        batch_size = options['batch_size']
         if not os.path.exists(file_path):
             self.stdout.write(self.style.ERROR(f'파일을 찾을 수 없습니다: {file_path}'))
             return
 
-        # 시트명과 교차로 이름 매핑
-        sheet_to_intersection = {
-            'Córdova': 'AV. BOLIVAR - AV. GRAL. CORDOVA',
-            'Sucre': 'AV. BOLIVAR - AV. ANTONIO JOSE DE SUCRE',
-            'Paseo de los Andes': 'AV. BOLIVAR - AV. PASEO DE LOS ANDES',
-            'Del Río': 'AV. BOLIVAR - AV. DEL RIO',
-            'Brasil': 'AV. BRASIL - AV. BOLIVAR',
-            'Garzón': 'AV. GRAL. GARZON - JR. HUSARES DE JUNIN',
-        }
-        intersections = list(Intersection.objects.all())
-        intersection_dict = {i.name: i for i in intersections}
-
+        # 시트명 → 교차로 이름 → 교차로 id (이름 표기가 조금 달라도 공용 매칭 색인으로 찾는다)
+        index = get_intersection_index()
+        total_rows = 0
+        total_started = time.perf_counter()
         df_dict = pd.read_excel(file_path, sheet_name=None)
         for sheet_name, df in df_dict.items():
             self.stdout.write(f'\n=== 시트: {sheet_name} ===')
-            if sheet_name not in sheet_to_intersection:
+            if sheet_name not in SHEET_TO_INTERSECTION:
                 self.stdout.write(self.style.WARNING(f'시트명 매핑 없음: {sheet_name}'))
                 continue
-            intersection_name = sheet_to_intersection[sheet_name]
-            intersection_obj = intersection_dict.get(intersection_name)
-            if not intersection_obj:
+            intersection_name = SHEET_TO_INTERSECTION[sheet_name]
+            intersection_id = index.match(intersection_name)
+            if not intersection_id:
                 self.stdout.write(self.style.WARNING(f'Intersection 테이블에 없음: {intersection_name}'))
                 continue
-            traffic_cols = [col for col in df.columns if '(' in str(col) and ')' in str(col)]
-            count = 0
-            for idx, row in df.iterrows():
-                day = row['DAY']
-                time = row['Time']
+
+            started = time.perf_counter()
+            try:
+                volumes = self.build_volume_frame(df)
+            except CommandError as e:
+                raise CommandError(f'시트 {sheet_name}: {e}') from e
+            if dry_run:
+                self.stdout.write(f'  → (dry-run) {len(volumes)}개 TrafficVolume 변환됨')
+                continue
+            if len(volumes):
                 try:
-                    dt = datetime.combine(pd.to_datetime(day).date(), pd.to_datetime(time).time())
-                except Exception:
-                    continue
-                for col in traffic_cols:
-                    if 'divided' in str(col).lower() or 'total' in str(col).lower():
-                        continue
-                    val = row[col]
-                    if pd.isna(val):
-                        continue
-                    direction = re.search(r'\(([A-Za-z]+)\)', str(col))
-                    if direction:
-                        d = direction.group(1).upper()
-                        if d in ['OE', 'EO']:
-                            d = 'WE' if d == 'OE' else 'EW'
-                        TrafficVolume.objects.create(
-                            intersection=intersection_obj,
-                            datetime=dt,
-                            direction=d,
-                            volume=int(val),
-                            is_simulated=False
-                        )
-                        count += 1
-            self.stdout.write(self.style.SUCCESS(f'  → {count}개 TrafficVolume 저장됨')) 
\ No newline at end of file
+                    ensure_writable(volumes['datetime'].min().to_pydatetime(), volumes['datetime'].max().to_pydatetime())
+                except ValueError as e:
+                    raise CommandError(f'시트 {sheet_name}: {e}') from e
+
+            objs = (
+                TrafficVolume(
+                    intersection_id=intersection_id,
+                    datetime=dt,
+                    direction=direction,
+                    volume=int(volume),
+                    is_simulated=False,
+                )
+                for dt, direction, volume in zip(
+                    volumes['datetime'], volumes['direction'], volumes['volume']
+                )
+            )
+            # 시트 단위 트랜잭션: 실패 시 해당 시트만 롤백
+            with transaction.atomic():
+                count = bulk_upsert(
+                    TrafficVolume, objs,
+                    unique_fields=['intersection', 'datetime', 'direction'],
+                    update_fields=['volume', 'is_simulated', 'updated_at'],
+                    batch_size=batch_size,
+                )
+            # 커밋된 시트의 교차로/월에 걸친 조회 캐시 무효화 (방향별 원본을 읽는 조회 포함)
+            if count:
+                invalidate_windows(
+                    [intersection_id, ALL_INTERSECTIONS],
+                    volumes['datetime'].min().to_pydatetime(), volumes['datetime'].max().to_pydatetime(),
+                )
+            elapsed = time.perf_counter() - started
+            total_rows += count
+            self.stdout.write(self.style.SUCCESS(
+                f'  → {count}개 TrafficVolume 저장됨 ({elapsed:.2f}s, {count / max(elapsed, 1e-9):,.0f} rows/s)'
+            ))
+
+        total_elapsed = time.perf_counter() - total_started
+        self.stdout.write(self.style.SUCCESS(
+            f'\n총 {total_rows}건 저장 ({total_elapsed:.2f}s, {total_rows / max(total_elapsed, 1e-9):,.0f} rows/s)'
+        ))
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from traffic.management.commands.calculate_total_traffic import CHECKPOINT_NAME as AGGREGATION_CHECKPOINT
+from traffic.models import ProcessingCheckpoint, TotalTrafficVolume, TrafficVolume
+from traffic.utils.partitions import (
+    create_partition, detach_partition, month_bounds, month_start, next_month, partition_model, partitions,
+)
+from traffic.utils.retention import ROLLUP_CHECKPOINT, expire_partitions
+
+# --source 이름 → 파티션 대상 모델 (export_traffic_data의 source와 같은 이름)
+SOURCES = {'volume': TrafficVolume, 'total': TotalTrafficVolume}
+
+
+class Command(BaseCommand):
+    help = 'TrafficVolume/TotalTrafficVolume 월 파티션 관리: 미래 파티션 생성, 닫힌 달 분리, 오래된 파티션 아카이브/삭제, 목록'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['create', 'detach', 'drop', 'list'])
+        parser.add_argument('--source', action='append', choices=sorted(SOURCES),
+                            help='대상 테이블 (반복 지정 가능, 기본: drop은 volume, 나머지는 둘 다)')
+        parser.add_argument('--ahead', type=int, default=3, help='create: 이번 달부터 미리 만들 달 수')
+        parser.add_argument('--keep-months', type=int, default=3, help='detach: 기본 테이블에 남길 최근 달 수 (이번 달 포함)')
+        parser.add_argument('--before', type=str, help='drop: 이 달(YYYY-MM) 이전에 끝나는 파티션 삭제')
+        parser.add_argument('--archive-dir', type=str, help='drop: 삭제 전 파티션을 gzip CSV로 저장할 디렉토리')
+        parser.add_argument('--batch-size', type=int, default=10000, help='detach: 한 트랜잭션에서 옮길 행 수')
+        parser.add_argument('--dry-run', action='store_true', help='detach/drop 대상만 출력')
+
+    def handle(self, *args, **options):
+        action = options['action']
+        sources = options['source'] or (['volume'] if action == 'drop' else sorted(SOURCES))
+        models = [SOURCES[source] for source in sources]
+        getattr(self, f'handle_{action}')(models, options)
+
+    def handle_create(self, models, options):
+        month = month_start(timezone.now()).date()
+        for _ in range(options['ahead'] + 1):
+            for model in models:
+                partition, created = create_partition(model, month)
+                if created:
+                    self.stdout.write(f"🆕 {partition.db_table} 생성")
+            month = next_month(month)
+        self.stdout.write(self.style.SUCCESS(f"✅ {month:%Y-%m} 이전 파티션 준비 완료"))
+
+    def handle_detach(self, models, options):
+        # 롤업/합계 집계가 끝난 달만 분리 (분리된 달은 집계 작업이 다시 읽지 않는다)
+        watermarks = dict(ProcessingCheckpoint.objects.filter(
+            name__in=[ROLLUP_CHECKPOINT, AGGREGATION_CHECKPOINT],
+        ).values_list('name', 'watermark'))
+        if None in (watermarks.get(ROLLUP_CHECKPOINT), watermarks.get(AGGREGATION_CHECKPOINT)):
+            raise CommandError('calculate_total_traffic과 manage_traffic_retention을 먼저 실행해야 합니다.')
+        cutoff = month_start(timezone.now()).date()
+        for _ in range(options['keep_months'] - 1):
+            cutoff = (cutoff - timedelta(days=1)).replace(day=1)
+        cutoff = min(cutoff, month_start(min(watermarks.values())).date())
+
+        for model in models:
+            first = model.objects.filter(datetime__lt=month_bounds(cutoff)[0]).order_by('datetime').values_list(
+                'datetime', flat=True,
+            ).first()
+            if first is None:
+                continue
+            month = month_start(first).date()
+            while month < cutoff:
+                if options['dry_run']:
+                    start, end = month_bounds(month)
+                    count = model.objects.filter(datetime__gte=start, datetime__lt=end).count()
+                    self.stdout.write(f"📦 {model._meta.db_table} {month:%Y-%m}: 분리 대상 {count}건 (dry-run)")
+                else:
+                    moved = detach_partition(model, month, batch_size=options['batch_size'])
+                    self.stdout.write(f"📦 {model._meta.db_table} {month:%Y-%m}: {moved}건 이동")
+                month = next_month(month)
+        self.stdout.write(self.style.SUCCESS(f"✅ {cutoff:%Y-%m} 이전 달 분리 완료"))
+
+    def handle_drop(self, models, options):
+        if not options['before']:
+            raise CommandError('drop에는 --before YYYY-MM이 필요합니다.')
+        try:
+            before = datetime.strptime(options['before'], '%Y-%m').date()
+        except ValueError:
+            raise CommandError('--before는 YYYY-MM 형식이어야 합니다.')
+        before = month_bounds(before)[0]
+        for model in models:
+            for partition, archived, count in expire_partitions(
+                model, before, archive_dir=options['archive_dir'], dry_run=options['dry_run'],
+            ):
+                if options['dry_run']:
+                    self.stdout.write(f"🗓️ {partition.db_table}: 삭제 대상 {count}건 (dry-run)")
+                else:
+                    self.stdout.write(f"🗑️ {partition.db_table}: 아카이브 {archived}건, 테이블 삭제 ({count}건)")
+        self.stdout.write(self.style.SUCCESS(f"✅ {before:%Y-%m} 이전 파티션 정리 완료"))
+
+    def handle_list(self, models, options):
+        for model in models:
+            for partition in partitions(model):
+                count = partition_model(model, partition.month).objects.count()
+                state = f"분리됨 ({timezone.localtime(partition.detached_at):%Y-%m-%d %H:%M})" if partition.detached_at else '생성됨'
+                self.stdout.write(f"{partition.db_table}: {state}, {count}건")
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from traffic.models import HourlyTrafficVolume, ProcessingCheckpoint, TrafficVolume
+from traffic.utils.aggregation import lagged_watermark, touched_windows
+from traffic.utils.retention import (
+    RETENTION_CHECKPOINT, ROLLUP_CHECKPOINT, expire_partitions, expire_raw_volumes, expire_rollups, refresh_rollups,
+    start_of_day,
+)
+
+
+class Command(BaseCommand):
+    help = 'TrafficVolume 보존 정책 실행: 시간/일 롤업 갱신 → 만료된 원본(기본 테이블 행, 월 파티션) 아카이브/삭제 → 오래된 시간 롤업 삭제'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--raw-days', type=int, default=90, help='원본 15분 데이터 보존 일수')
+        parser.add_argument('--hourly-days', type=int, default=730, help='시간 단위 롤업 보존 일수 (일 단위 롤업은 영구 보존)')
+        parser.add_argument('--archive-dir', type=str, help='삭제 전 원본을 월별 gzip CSV로 저장할 디렉토리')
+        parser.add_argument('--batch-size', type=int, default=10000, help='upsert/삭제 배치 크기')
+        parser.add_argument('--dry-run', action='store_true', help='삭제 대상 건수만 출력')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options['batch_size']
+        raw_cutoff = start_of_day(now - timedelta(days=options['raw_days']))
+        hourly_cutoff = start_of_day(now - timedelta(days=options['hourly_days']))
+
+        rollup_checkpoint, _ = ProcessingCheckpoint.objects.get_or_create(name=ROLLUP_CHECKPOINT)
+        retention_checkpoint, _ = ProcessingCheckpoint.objects.get_or_create(name=RETENTION_CHECKPOINT)
+
+        # 1) 변경분 롤업 갱신 (이미 만료된 구간은 원본이 없으므로 제외)
+        if not options['dry_run']:
+            if rollup_checkpoint.watermark is None:
+                windows = [(None, None, None)]
+            else:
+                windows = touched_windows(rollup_checkpoint.watermark, until=now)
+            if windows:
+                counts = refresh_rollups(windows, expired_before=retention_checkpoint.watermark, batch_size=batch_size)
+                self.stdout.write(f"📊 롤업 갱신: " + ', '.join(f'{k} {v}건' for k, v in counts.items()))
+            rollup_checkpoint.watermark = lagged_watermark(now)
+            rollup_checkpoint.save(update_fields=['watermark', 'updated_at'])
+
+        # 2) 만료된 원본을 월 단위로 롤업 → 아카이브 → 삭제
+        results = expire_raw_volumes(
+            raw_cutoff,
+            archive_dir=options['archive_dir'],
+            batch_size=batch_size,
+            dry_run=options['dry_run'],
+        )
+        for month_start, rolled, archived, deleted in results:
+            if options['dry_run']:
+                self.stdout.write(f"🗓️ {month_start:%Y-%m}: 삭제 대상 {deleted}건 (dry-run)")
+            else:
+                self.stdout.write(f"🗓️ {month_start:%Y-%m}: 롤업 {rolled}건, 아카이브 {archived}건, 삭제 {deleted}건")
+
+        # 월 파티션으로 분리된 만료 구간은 아카이브 후 테이블째 삭제
+        for partition, archived, count in expire_partitions(
+            TrafficVolume, raw_cutoff, archive_dir=options['archive_dir'], dry_run=options['dry_run'],
+        ):
+            if options['dry_run']:
+                self.stdout.write(f"🗓️ {partition.db_table}: 삭제 대상 {count}건 (dry-run)")
+            else:
+                self.stdout.write(f"🗑️ {partition.db_table}: 아카이브 {archived}건, 테이블 삭제 ({count}건)")
+
+        if not options['dry_run']:
+            if retention_checkpoint.watermark is None or retention_checkpoint.watermark < raw_cutoff:
+                retention_checkpoint.watermark = raw_cutoff
+                retention_checkpoint.save(update_fields=['watermark', 'updated_at'])
+
+            # 3) 시간 단위 롤업 만료
+            deleted = expire_rollups(HourlyTrafficVolume, hourly_cutoff, batch_size=batch_size)
+            self.stdout.write(f"🧹 {hourly_cutoff:%Y-%m-%d} 이전 시간 롤업 {deleted}건 삭제")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ 보존 정책 적용 완료 (원본 보존 기준: {raw_cutoff:%Y-%m-%d})"))
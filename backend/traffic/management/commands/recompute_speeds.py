@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from traffic.utils.congestion import recompute_average_speeds
+from traffic.utils.query_params import parse_id_list
+
+
+class Command(BaseCommand):
+    help = '속도 모델 설정 변경 후 TotalTrafficVolume의 average_speed만 다시 계산 (집계는 그대로)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intersections', type=str, help='대상 교차로 id 목록 (쉼표 구분, 기본: 전체)')
+        parser.add_argument('--batch-size', type=int, default=10000, help='조회/upsert 배치 크기')
+
+    def handle(self, *args, **options):
+        try:
+            intersection_ids = parse_id_list(options['intersections'], 'intersections') or None
+            started = time.perf_counter()
+            stats = recompute_average_speeds(intersection_ids, batch_size=options['batch_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 슬롯 {stats['scanned']}건 확인, {stats['updated']}건 속도 갱신 ({time.perf_counter() - started:.2f}s)"
+        ))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from traffic.models import ProcessingCheckpoint
+from traffic.utils.aggregation import lagged_watermark, touched_windows
+from traffic.utils.baselines import BASELINE_CHECKPOINT, DEFAULT_WEEKS, full_windows, update_baselines
+
+
+class Command(BaseCommand):
+    help = ('교차로별 요일×15분 슬롯 교통량 기준선(중앙값/MAD) 갱신 '
+            '(기본: watermark 이후 원본 교통량이 바뀐 구간만 반영)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='최근 weeks주 TotalTrafficVolume으로 전체 재구성')
+        parser.add_argument('--weeks', type=int, default=DEFAULT_WEEKS, help='기준선에 쓰는 최근 주 수 (바꾸면 --full 필요)')
+        parser.add_argument('--batch-size', type=int, default=500, help='bulk upsert 배치 크기')
+
+    def handle(self, *args, **options):
+        started_at = timezone.now()
+        checkpoint, _ = ProcessingCheckpoint.objects.get_or_create(name=BASELINE_CHECKPOINT)
+        full = options['full'] or checkpoint.watermark is None
+        if checkpoint.watermark is None and not options['full']:
+            self.stdout.write("ℹ️ watermark가 없어 전체 재구성으로 진행")
+
+        if full:
+            windows = full_windows(options['weeks'])
+        else:
+            windows = touched_windows(checkpoint.watermark, until=started_at)
+        if not windows:
+            self.stdout.write("ℹ️ 반영할 교통량 변경이 없습니다.")
+        else:
+            elapsed = time.perf_counter()
+            stats = update_baselines(windows, weeks=options['weeks'], batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ [{'full' if full else 'incremental'}] 기준선 {stats['intersections']}개 교차로 갱신, "
+                f"슬롯 {stats['slots']:,}개 반영 ({time.perf_counter() - elapsed:.2f}s)"
+            ))
+
+        checkpoint.watermark = lagged_watermark(started_at)
+        checkpoint.save(update_fields=['watermark', 'updated_at'])
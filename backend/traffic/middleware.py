@@ -0,0 +1,124 @@
+import cProfile
+import io
+import pstats
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+from traffic.utils.metrics import RequestMetrics, current_request, registry
+
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+
+def _labels(request, response):
+    match = request.resolver_match
+    view = match.view_name if match is not None else 'unmatched'
+    return view, request.method, f'{response.status_code // 100}xx'
+
+
+def _response_bytes(response):
+    if getattr(response, 'streaming', False):
+        return 0
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """엔드포인트별 지연시간/쿼리 수/쿼리 시간/직렬화·렌더링 시간/응답 크기 수집, ?profile=1 프로파일링
+
+    수집 비용은 요청당 시각 측정 몇 번과 쿼리마다 execute_wrapper 호출 1회다.
+    프로파일링은 DEBUG이거나 TRAFFIC_PROFILING_ENABLED일 때만 허용한다.
+    비동기 뷰(SSE 등)는 쿼리가 다른 스레드에서 실행되므로 지연시간/응답 크기만 기록한다.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if 'profile' in request.GET and self._profiling_allowed():
+            return self._profile(request)
+
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        registry.record(_labels(request, response), time.perf_counter() - started, metrics, _response_bytes(response))
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        registry.record(_labels(request, response), time.perf_counter() - started, metrics, _response_bytes(response))
+        return response
+
+    def _profiling_allowed(self):
+        return settings.DEBUG or getattr(settings, 'TRAFFIC_PROFILING_ENABLED', False)
+
+    def _profile(self, request):
+        """뷰를 cProfile(또는 profile=pyinstrument)로 실행하고 결과 보고서를 응답으로 반환"""
+        mode = request.GET.get('profile')
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                if mode == 'pyinstrument':
+                    try:
+                        from pyinstrument import Profiler
+                    except ImportError:
+                        return HttpResponse('pyinstrument가 설치되어 있지 않습니다.', status=400, content_type='text/plain')
+                    profiler = Profiler()
+                    profiler.start()
+                    try:
+                        self.get_response(request)
+                    finally:
+                        # 뷰 예외가 나도 프로파일러가 켜진 채 남지 않게 한다
+                        profiler.stop()
+                    return HttpResponse(profiler.output_html(), content_type='text/html')
+
+                profiler = cProfile.Profile()
+                started = time.perf_counter()
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+                elapsed = time.perf_counter() - started
+        finally:
+            current_request.reset(token)
+
+        sort = request.GET.get('profile_sort', 'cumulative')
+        out = io.StringIO()
+        out.write(
+            f"{request.method} {request.get_full_path()} → {response.status_code}\n"
+            f"elapsed {elapsed * 1000:.1f}ms, queries {metrics.queries} ({metrics.db_seconds * 1000:.1f}ms), "
+            f"serialize {metrics.serialize_seconds * 1000:.1f}ms, render {metrics.render_seconds * 1000:.1f}ms, "
+            f"bytes {_response_bytes(response)}\n\n"
+        )
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats(sort if sort in PROFILE_SORT_KEYS else 'cumulative').print_stats(
+            int(request.GET.get('profile_limit', 60)) if request.GET.get('profile_limit', '').isdigit() else 60
+        )
+        return HttpResponse(out.getvalue(), content_type='text/plain; charset=utf-8')
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_volumes(apps, schema_editor):
+    """(intersection, datetime, direction) 중복 행은 가장 먼저 저장된 id만 남기고 삭제"""
+    TrafficVolume = apps.get_model('traffic', 'TrafficVolume')
+    duplicates = TrafficVolume.objects.values(
+        'intersection_id', 'datetime', 'direction'
+    ).annotate(n=Count('id'), keep_id=Min('id')).filter(n__gt=1).order_by()
+
+    for row in duplicates.iterator():
+        TrafficVolume.objects.filter(
+            intersection_id=row['intersection_id'],
+            datetime=row['datetime'],
+            direction=row['direction'],
+        ).exclude(id=row['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0004_incident_intersection'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_volumes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='trafficvolume',
+            constraint=models.UniqueConstraint(
+                fields=('intersection', 'datetime', 'direction'),
+                name='unique_traffic_volume_slot',
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_totals(apps, schema_editor):
+    """(intersection, datetime) 중복 행은 가장 최근 id만 남기고 삭제"""
+    TotalTrafficVolume = apps.get_model('traffic', 'TotalTrafficVolume')
+    duplicates = TotalTrafficVolume.objects.values(
+        'intersection_id', 'datetime'
+    ).annotate(n=Count('id'), keep_id=Max('id')).filter(n__gt=1).order_by()
+
+    for row in duplicates.iterator():
+        TotalTrafficVolume.objects.filter(
+            intersection_id=row['intersection_id'],
+            datetime=row['datetime'],
+        ).exclude(id=row['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0005_trafficvolume_unique_slot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessingCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(remove_duplicate_totals, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='totaltrafficvolume',
+            constraint=models.UniqueConstraint(
+                fields=('intersection', 'datetime'),
+                name='unique_total_traffic_slot',
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0006_totaltrafficvolume_unique_slot_processingcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTrafficVolume',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datetime', models.DateTimeField()),
+                ('direction', models.CharField(choices=[('NS', 'North to South'), ('SN', 'South to North'), ('EW', 'East to West'), ('WE', 'West to East')], max_length=2)),
+                ('volume', models.IntegerField()),
+                ('samples', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'traffic_volume_daily',
+                'ordering': ['-datetime'],
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlyTrafficVolume',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datetime', models.DateTimeField()),
+                ('direction', models.CharField(choices=[('NS', 'North to South'), ('SN', 'South to North'), ('EW', 'East to West'), ('WE', 'West to East')], max_length=2)),
+                ('volume', models.IntegerField()),
+                ('samples', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'traffic_volume_hourly',
+                'ordering': ['-datetime'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trafficvolume',
+            index=models.Index(fields=['datetime'], name='traffic_tra_datetim_f3e93a_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailytrafficvolume',
+            name='intersection',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='traffic.intersection'),
+        ),
+        migrations.AddField(
+            model_name='hourlytrafficvolume',
+            name='intersection',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='traffic.intersection'),
+        ),
+        migrations.AddIndex(
+            model_name='dailytrafficvolume',
+            index=models.Index(fields=['datetime'], name='traffic_vol_datetim_16f1bc_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailytrafficvolume',
+            constraint=models.UniqueConstraint(fields=('intersection', 'datetime', 'direction'), name='unique_daily_traffic_volume'),
+        ),
+        migrations.AddIndex(
+            model_name='hourlytrafficvolume',
+            index=models.Index(fields=['datetime'], name='traffic_vol_datetim_79944e_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='hourlytrafficvolume',
+            constraint=models.UniqueConstraint(fields=('intersection', 'datetime', 'direction'), name='unique_hourly_traffic_volume'),
+        ),
+    ]
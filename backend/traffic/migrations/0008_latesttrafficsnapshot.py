@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_snapshots(apps, schema_editor):
+    """기존 TotalTrafficVolume에서 교차로별 최신 슬롯으로 스냅샷 초기화"""
+    TotalTrafficVolume = apps.get_model('traffic', 'TotalTrafficVolume')
+    LatestTrafficSnapshot = apps.get_model('traffic', 'LatestTrafficSnapshot')
+    latest = TotalTrafficVolume.objects.filter(
+        intersection_id=OuterRef('intersection_id')
+    ).order_by('-datetime').values('datetime')[:1]
+    rows = TotalTrafficVolume.objects.filter(datetime=Subquery(latest)).values(
+        'intersection_id', 'datetime', 'total_volume', 'average_speed'
+    )
+    LatestTrafficSnapshot.objects.bulk_create(
+        [LatestTrafficSnapshot(**row) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0007_traffic_volume_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestTrafficSnapshot',
+            fields=[
+                ('intersection', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='latest_snapshot', serialize=False, to='traffic.intersection')),
+                ('datetime', models.DateTimeField()),
+                ('total_volume', models.IntegerField()),
+                ('average_speed', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'latest_traffic_snapshot',
+            },
+        ),
+        migrations.RunPython(populate_snapshots, migrations.RunPython.noop),
+    ]
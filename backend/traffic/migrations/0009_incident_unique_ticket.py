@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_tickets(apps, schema_editor):
+    """같은 ticket_number가 여러 건이면 가장 최근 id만 남기고 삭제"""
+    Incident = apps.get_model('traffic', 'Incident')
+    duplicates = Incident.objects.values('ticket_number').annotate(
+        n=Count('id'), keep_id=Max('id')
+    ).filter(n__gt=1).order_by()
+
+    for row in duplicates.iterator():
+        Incident.objects.filter(ticket_number=row['ticket_number']).exclude(id=row['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0008_latesttrafficsnapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_tickets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='incident',
+            constraint=models.UniqueConstraint(fields=('ticket_number',), name='unique_incident_ticket'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0009_incident_unique_ticket'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='intersection',
+            index=models.Index(fields=['latitude', 'longitude'], name='intersection_lat_lon_idx'),
+        ),
+    ]
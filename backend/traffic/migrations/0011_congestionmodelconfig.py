@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0010_intersection_lat_lon_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CongestionModelConfig',
+            fields=[
+                ('intersection', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='congestion_model', serialize=False, to='traffic.intersection')),
+                ('model', models.CharField(default='threshold', max_length=50)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'congestion_model_config',
+            },
+        ),
+    ]
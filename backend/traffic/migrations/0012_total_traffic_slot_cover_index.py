@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0011_congestionmodelconfig'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='totaltrafficvolume',
+            index=models.Index(fields=['datetime', 'intersection', 'total_volume', 'average_speed'], name='total_traffic_slot_cover_idx'),
+        ),
+    ]
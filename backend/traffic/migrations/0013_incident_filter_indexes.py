@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0012_total_traffic_slot_cover_index'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='incident',
+            name='day',
+        ),
+        migrations.RemoveField(
+            model_name='incident',
+            name='month',
+        ),
+        migrations.RemoveField(
+            model_name='incident',
+            name='year',
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['registered_at', 'id'], name='incident_registered_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['district', 'registered_at'], name='incident_district_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['status', 'registered_at'], name='incident_status_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['incident_type', 'registered_at'], name='incident_type_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['intersection', 'registered_at'], name='incident_intersection_time_idx'),
+        ),
+    ]
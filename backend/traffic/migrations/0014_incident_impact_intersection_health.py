@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0013_incident_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntersectionHealth',
+            fields=[
+                ('intersection', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='health', serialize=False, to='traffic.intersection')),
+                ('score', models.FloatField()),
+                ('incidents', models.IntegerField()),
+                ('outages', models.IntegerField()),
+                ('impacted_hours', models.FloatField()),
+                ('lost_volume', models.FloatField()),
+                ('volume_loss_ratio', models.FloatField(null=True)),
+                ('speed_loss_ratio', models.FloatField(null=True)),
+                ('period_start', models.DateTimeField()),
+                ('period_end', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'intersection_health',
+                'indexes': [models.Index(fields=['score'], name='intersection_health_score_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IncidentImpact',
+            fields=[
+                ('incident', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='impact', serialize=False, to='traffic.incident')),
+                ('window_start', models.DateTimeField()),
+                ('window_end', models.DateTimeField()),
+                ('is_outage', models.BooleanField(default=False)),
+                ('slots', models.IntegerField()),
+                ('observed_volume', models.IntegerField()),
+                ('baseline_volume', models.FloatField(null=True)),
+                ('observed_speed', models.FloatField(null=True)),
+                ('baseline_speed', models.FloatField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('intersection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='incident_impacts', to='traffic.intersection')),
+            ],
+            options={
+                'db_table': 'incident_impact',
+                'indexes': [models.Index(fields=['intersection', 'window_start'], name='incident_impact_window_idx')],
+            },
+        ),
+    ]
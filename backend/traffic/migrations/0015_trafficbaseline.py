@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0014_incident_impact_intersection_health'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrafficBaseline',
+            fields=[
+                ('intersection', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='baseline', serialize=False, to='traffic.intersection')),
+                ('weeks', models.IntegerField()),
+                ('ring', models.BinaryField()),
+                ('ring_weeks', models.BinaryField()),
+                ('median', models.BinaryField()),
+                ('mad', models.BinaryField()),
+                ('samples', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'traffic_baseline',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0015_trafficbaseline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrafficPartition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_table', models.CharField(max_length=64)),
+                ('month', models.DateField()),
+                ('db_table', models.CharField(max_length=64, unique=True)),
+                ('detached_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'traffic_partition',
+                'ordering': ['base_table', 'month'],
+                'constraints': [models.UniqueConstraint(fields=('base_table', 'month'), name='unique_traffic_partition_month')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('traffic', '0016_traffic_partition'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='latesttrafficsnapshot',
+            index=models.Index(fields=['updated_at'], name='latest_snapshot_updated_idx'),
+        ),
+    ]
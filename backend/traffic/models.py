@@ -14,6 +14,9 @@ class Intersection(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['latitude', 'longitude'], name='intersection_lat_lon_idx'),
+        ]
 
 class TrafficVolume(models.Model):
     DIRECTION_CHOICES = [
@@ -39,6 +42,58 @@ class TrafficVolume(models.Model):
         indexes = [
             models.Index(fields=['intersection', 'datetime']),
             models.Index(fields=['direction']),
+            models.Index(fields=['datetime']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['intersection', 'datetime', 'direction'],
+                name='unique_traffic_volume_slot',
+            ),
+        ]
+
+
+class TrafficVolumeRollup(models.Model):
+    """보존 기간이 지난 TrafficVolume 원본을 시간/일 단위로 다운샘플링한 집계"""
+    intersection = models.ForeignKey(Intersection, on_delete=models.CASCADE)
+    datetime = models.DateTimeField()
+    direction = models.CharField(max_length=2, choices=TrafficVolume.DIRECTION_CHOICES)
+    volume = models.IntegerField()
+    samples = models.IntegerField()
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.intersection.name} - {self.datetime} - {self.direction}: {self.volume}"
+
+
+class HourlyTrafficVolume(TrafficVolumeRollup):
+    class Meta:
+        db_table = 'traffic_volume_hourly'
+        ordering = ['-datetime']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['intersection', 'datetime', 'direction'],
+                name='unique_hourly_traffic_volume',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['datetime']),
+        ]
+
+
+class DailyTrafficVolume(TrafficVolumeRollup):
+    class Meta:
+        db_table = 'traffic_volume_daily'
+        ordering = ['-datetime']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['intersection', 'datetime', 'direction'],
+                name='unique_daily_traffic_volume',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['datetime']),
         ]
 
 class TotalTrafficVolume(models.Model):
@@ -51,12 +106,162 @@ class TotalTrafficVolume(models.Model):
         db_table = 'total_traffic_volume'
         indexes = [
             models.Index(fields=['intersection', 'datetime']),
+            # 도시 전체 슬롯 스냅샷: datetime으로 찾고 테이블 접근 없이 값까지 읽는 커버링 인덱스
+            models.Index(fields=['datetime', 'intersection', 'total_volume', 'average_speed'], name='total_traffic_slot_cover_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['intersection', 'datetime'],
+                name='unique_total_traffic_slot',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.intersection.name} - {self.datetime}: {self.total_volume}대, {self.average_speed}km/h"
+
+
+class LatestTrafficSnapshot(models.Model):
+    """교차로별 최신 TotalTrafficVolume 슬롯 (latest_volume API용, 집계 작업이 갱신)"""
+    intersection = models.OneToOneField(Intersection, on_delete=models.CASCADE, primary_key=True, related_name='latest_snapshot')
+    datetime = models.DateTimeField()
+    total_volume = models.IntegerField()
+    average_speed = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'latest_traffic_snapshot'
+        indexes = [
+            # 캐시된 latest_volume 응답의 버전 확인(MAX(updated_at))용
+            models.Index(fields=['updated_at'], name='latest_snapshot_updated_idx'),
         ]
 
     def __str__(self):
         return f"{self.intersection.name} - {self.datetime}: {self.total_volume}대, {self.average_speed}km/h"
 
 
+class CongestionModelConfig(models.Model):
+    """교차로별 속도/혼잡 모델 설정 (없는 교차로는 TRAFFIC_CONGESTION_DEFAULT 사용)
+
+    model은 traffic.utils.congestion에 등록된 모델 이름, params는 해당 모델의 키워드 인자
+    """
+    intersection = models.OneToOneField(Intersection, on_delete=models.CASCADE, primary_key=True, related_name='congestion_model')
+    model = models.CharField(max_length=50, default='threshold')
+    params = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'congestion_model_config'
+
+    def __str__(self):
+        return f"{self.intersection.name}: {self.model} {self.params}"
+
+
+class IncidentImpact(models.Model):
+    """사고 영향 구간의 관측 교통량/속도와 같은 요일·시각 기준선 (compute_incident_impact가 갱신)
+
+    기준선은 영향 구간을 1~N주 전으로 옮긴 구간의 슬롯당 평균이며, 관측/기준 슬롯이 없으면 None.
+    """
+    incident = models.OneToOneField('Incident', on_delete=models.CASCADE, primary_key=True, related_name='impact')
+    intersection = models.ForeignKey(Intersection, on_delete=models.CASCADE, related_name='incident_impacts')
+    window_start = models.DateTimeField()
+    window_end = models.DateTimeField()
+    is_outage = models.BooleanField(default=False)
+    slots = models.IntegerField()  # 영향 구간 안의 관측 슬롯 수
+    observed_volume = models.IntegerField()
+    baseline_volume = models.FloatField(null=True)
+    observed_speed = models.FloatField(null=True)
+    baseline_speed = models.FloatField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'incident_impact'
+        indexes = [
+            models.Index(fields=['intersection', 'window_start'], name='incident_impact_window_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.incident_id} @ {self.intersection_id}: {self.observed_volume} / {self.baseline_volume}"
+
+
+class IntersectionHealth(models.Model):
+    """교차로별 최근 기간 사고 영향을 합친 건강 점수 (0~100, 높을수록 양호)"""
+    intersection = models.OneToOneField(Intersection, on_delete=models.CASCADE, primary_key=True, related_name='health')
+    score = models.FloatField()
+    incidents = models.IntegerField()
+    outages = models.IntegerField()
+    impacted_hours = models.FloatField()
+    lost_volume = models.FloatField()
+    volume_loss_ratio = models.FloatField(null=True)
+    speed_loss_ratio = models.FloatField(null=True)
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'intersection_health'
+        indexes = [
+            models.Index(fields=['score'], name='intersection_health_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.intersection.name}: {self.score}"
+
+
+class TrafficBaseline(models.Model):
+    """교차로별 요일×15분 슬롯 교통량 기준선 (update_traffic_baselines가 갱신)
+
+    배열은 NumPy 배열을 그대로 바이트로 저장한다 (traffic.utils.baselines 참고).
+    ring: 최근 weeks주 관측값 uint16 (weeks, 7, 96), ring_weeks: 각 행의 주 번호 int32 (weeks,)
+    median/mad: ring으로 계산한 float32 (7, 96), samples: 관측 수 uint8 (7, 96)
+    """
+    intersection = models.OneToOneField(Intersection, on_delete=models.CASCADE, primary_key=True, related_name='baseline')
+    weeks = models.IntegerField()
+    ring = models.BinaryField()
+    ring_weeks = models.BinaryField()
+    median = models.BinaryField()
+    mad = models.BinaryField()
+    samples = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'traffic_baseline'
+
+    def __str__(self):
+        return f"{self.intersection_id}: {self.weeks}주 기준선"
+
+
+class ProcessingCheckpoint(models.Model):
+    """증분 배치 작업의 마지막 처리 시점(watermark) 저장"""
+    name = models.CharField(max_length=100, unique=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.watermark}"
+
+
+class TrafficPartition(models.Model):
+    """월 단위로 분리한 시계열 파티션 테이블 목록 (traffic.utils.partitions가 관리)
+
+    detached_at이 있으면 해당 달의 행은 기본 테이블이 아니라 db_table에 있다.
+    """
+    base_table = models.CharField(max_length=64)
+    month = models.DateField()  # 파티션이 담는 달의 1일 (현지 시간)
+    db_table = models.CharField(max_length=64, unique=True)
+    detached_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'traffic_partition'
+        ordering = ['base_table', 'month']
+        constraints = [
+            models.UniqueConstraint(fields=['base_table', 'month'], name='unique_traffic_partition_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.db_table} ({'분리됨' if self.detached_at else '생성됨'})"
+
+
 # traffic/models.py
 
 class Incident(models.Model):
@@ -73,10 +278,20 @@ class Incident(models.Model):
     status = models.CharField(max_length=100)
     registered_at = models.DateTimeField()
     last_status_update = models.DateTimeField()
-    day = models.IntegerField()
-    month = models.IntegerField()
-    year = models.IntegerField()
     intersection = models.ForeignKey("Intersection", on_delete=models.SET_NULL, null=True)
-    
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ticket_number'], name='unique_incident_ticket'),
+        ]
+        # 필터(구/상태/유형/교차로) + 등록 시각 범위 조회와 최신순 목록용
+        indexes = [
+            models.Index(fields=['registered_at', 'id'], name='incident_registered_idx'),
+            models.Index(fields=['district', 'registered_at'], name='incident_district_time_idx'),
+            models.Index(fields=['status', 'registered_at'], name='incident_status_time_idx'),
+            models.Index(fields=['incident_type', 'registered_at'], name='incident_type_time_idx'),
+            models.Index(fields=['intersection', 'registered_at'], name='incident_intersection_time_idx'),
+        ]
+
     def __str__(self):
         return f"{self.ticket_number} - {self.location_name}"
@@ -0,0 +1,85 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """(datetime, id) 키셋 커서 페이지네이션
+
+    OFFSET 없이 마지막 행의 (datetime, id) 다음부터 읽으므로 페이지가 깊어져도
+    인덱스 범위 스캔 비용이 일정하다. 최신 데이터부터 내려가는 방향만 지원한다.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = ('-datetime', '-id')
+    invalid_cursor_message = '잘못된 cursor 값입니다.'
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 100
+        value = request.query_params.get(self.page_size_query_param)
+        if value:
+            try:
+                page_size = int(value)
+            except ValueError:
+                pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, obj):
+        raw = f"{obj.datetime.isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            dt, pk = raw.rsplit('|', 1)
+            return datetime.fromisoformat(dt), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            dt, pk = cursor
+            queryset = queryset.filter(Q(datetime__lt=dt) | Q(datetime=dt, id__lt=pk))
+
+        # 다음 페이지 존재 여부 확인을 위해 1건 더 조회
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
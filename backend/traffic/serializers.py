@@ -1,32 +1,72 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Intersection, TotalTrafficVolume, TrafficVolume
-from .models import Incident
+from .models import Incident, IncidentImpact, IntersectionHealth
+from .utils.metrics import TimedListSerializer, TimedSerializerMixin
+from .utils.partitions import ensure_writable
 
-class IntersectionSerializer(serializers.ModelSerializer):
+class IntersectionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Intersection
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'name', 'latitude', 'longitude', 'created_at', 'updated_at']
 
-class TrafficVolumeSerializer(serializers.ModelSerializer):
+class TrafficVolumeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     intersection_name = serializers.CharField(source='intersection.name', read_only=True)
 
     class Meta:
         model = TrafficVolume
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'intersection', 'intersection_name', 'datetime', 'direction', 
                  'volume', 'is_simulated', 'created_at', 'updated_at'] 
+
+    def validate_datetime(self, value):
+        # 월 파티션으로 분리된 달은 읽기 전용
+        try:
+            ensure_writable(value, value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
         
-class TotalTrafficVolumeSerializer(serializers.ModelSerializer):
+class TotalTrafficVolumeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TotalTrafficVolume
+        list_serializer_class = TimedListSerializer
         fields = ['datetime', 'total_volume', 'average_speed']
 
-class IncidentSerializer(serializers.ModelSerializer):
+class TrafficBucketSerializer(TimedSerializerMixin, serializers.Serializer):
+    """granularity 버킷/다운샘플 결과 행 (samples: 버킷에 포함된 15분 슬롯 수)"""
+    datetime = serializers.DateTimeField()
+    total_volume = serializers.IntegerField(required=False)
+    average_speed = serializers.FloatField(required=False)
+    direction = serializers.CharField(required=False)
+    volume = serializers.IntegerField(required=False)
+    samples = serializers.IntegerField(required=False)
+
+    class Meta:
+        list_serializer_class = TimedListSerializer
+
+class IncidentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     intersection_name = serializers.CharField(source="intersection.name", read_only=True)
     latitude = serializers.FloatField(source="intersection.latitude", read_only=True)
     longitude = serializers.FloatField(source="intersection.longitude", read_only=True)
+    # day/month/year는 저장하지 않고 registered_at(현지 시각)에서 계산
+    day = serializers.SerializerMethodField()
+    month = serializers.SerializerMethodField()
+    year = serializers.SerializerMethodField()
+
+    def get_day(self, obj):
+        return timezone.localtime(obj.registered_at).day
+
+    def get_month(self, obj):
+        return timezone.localtime(obj.registered_at).month
+
+    def get_year(self, obj):
+        return timezone.localtime(obj.registered_at).year
 
     class Meta:
         model = Incident
+        list_serializer_class = TimedListSerializer
         fields = [
             "id",
             "incident_number",
@@ -49,4 +89,29 @@ class IncidentSerializer(serializers.ModelSerializer):
             "intersection_name",
             "latitude",
             "longitude",
-        ]
\ No newline at end of file
+        ]
+
+
+class IntersectionHealthSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    intersection_name = serializers.CharField(source="intersection.name", read_only=True)
+
+    class Meta:
+        model = IntersectionHealth
+        list_serializer_class = TimedListSerializer
+        fields = [
+            "intersection", "intersection_name", "score", "incidents", "outages", "impacted_hours",
+            "lost_volume", "volume_loss_ratio", "speed_loss_ratio", "period_start", "period_end", "updated_at",
+        ]
+
+
+class IncidentImpactSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    ticket_number = serializers.IntegerField(source="incident.ticket_number", read_only=True)
+    incident_detail_type = serializers.CharField(source="incident.incident_detail_type", read_only=True)
+
+    class Meta:
+        model = IncidentImpact
+        list_serializer_class = TimedListSerializer
+        fields = [
+            "incident", "ticket_number", "incident_detail_type", "window_start", "window_end", "is_outage",
+            "slots", "observed_volume", "baseline_volume", "observed_speed", "baseline_speed",
+        ]
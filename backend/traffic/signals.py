@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+# TotalTrafficVolume 슬롯이 추가/갱신/삭제된 뒤 발생
+# kwargs: intersection_ids(set), slot_min, slot_max (datetime 또는 None)
+traffic_slots_updated = Signal()
+
+
+@receiver(traffic_slots_updated)
+def refresh_snapshots_on_slots_updated(sender, intersection_ids, **kwargs):
+    from traffic.utils.snapshot import refresh_latest_snapshots
+    refresh_latest_snapshots(intersection_ids)
+
+
+@receiver(traffic_slots_updated)
+def invalidate_query_cache_on_slots_updated(sender, intersection_ids, slot_min=None, slot_max=None, **kwargs):
+    from traffic.utils.query_cache import ALL_INTERSECTIONS, invalidate_windows
+    invalidate_windows([*intersection_ids, ALL_INTERSECTIONS], slot_min, slot_max)
+
+
+# receiver는 등록 순서대로 호출되므로 스냅샷 갱신 뒤에 발행된다
+@receiver(traffic_slots_updated)
+def publish_slots_on_slots_updated(sender, intersection_ids, **kwargs):
+    from traffic.utils.realtime import publish_slot_events
+    publish_slot_events(intersection_ids)
+
+
+@receiver(post_save, sender='traffic.Incident')
+def publish_incident_on_create(sender, instance, created, **kwargs):
+    if created:
+        from traffic.utils.realtime import publish_incident_events
+        publish_incident_events([instance.pk])
+
+
+@receiver([post_save, post_delete], sender='traffic.Incident')
+def invalidate_incident_stats_on_change(sender, instance, **kwargs):
+    from traffic.utils.incident_stats import INCIDENT_SCOPE
+    from traffic.utils.query_cache import invalidate_windows
+    invalidate_windows([INCIDENT_SCOPE], instance.registered_at, instance.registered_at)
+
+
+@receiver([post_save, post_delete], sender='traffic.Intersection')
+def invalidate_spatial_index_on_change(sender, **kwargs):
+    from traffic.utils.spatial import invalidate_spatial_index
+    invalidate_spatial_index()
@@ -1,3 +1,1297 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from traffic.checks import check_query_cache_backend
+from traffic.middleware import RequestMetricsMiddleware
+from traffic.models import (
+    CongestionModelConfig, HourlyTrafficVolume, Incident, IncidentImpact, Intersection, IntersectionHealth, LatestTrafficSnapshot, ProcessingCheckpoint,
+    TotalTrafficVolume, TrafficBaseline, TrafficPartition, TrafficVolume,
+)
+from traffic.signals import traffic_slots_updated
+from traffic.utils.aggregation import SLOT, recompute_total_volumes
+from traffic.utils.baselines import (
+    baseline_fingerprint, build_baseline_store, find_anomalies, full_windows, update_baselines,
+)
+from traffic.utils.bench import (
+    LIMA_CENTER, bulk_insert, daily_profile, iter_seasonal_traffic_volumes, iter_traffic_volumes, seed_intersections,
+)
+from traffic.utils.broker import InProcessBroker, Subscription
+from traffic.utils.congestion import (
+    SpeedEstimator, bpr_speeds, calibrated_speeds, recompute_average_speeds, threshold_speeds,
+)
+from traffic.utils.downsample import downsample_rows, lttb_indices, minmax_indices
+from traffic.utils.forecast import (
+    DAY_SLOTS, METHODS, backtest, ewm, forecast_intersection, predict, seasonal_naive, write_forecasts,
+)
+from traffic.utils.incident_impact import WEEK, compute_incident_impacts, health_score, interval_sums, refresh_health
+from traffic.utils.intersection_matcher import IntersectionIndex
+from traffic.utils.intersection_names import normalize_intersection_names, two_road_name
+from traffic.utils.log import BackgroundHandler, JsonFormatter, RateLimitFilter, SamplingFilter
+from traffic.utils.metrics import registry
+from traffic.utils.partitions import detach_partition, drop_partition, month_bounds
+from traffic.utils.query_cache import cached_window, clear_local_cache, window_timeout
+from traffic.utils.realtime import DatabasePollingBroker
+from traffic.utils.retention import RETENTION_CHECKPOINT, expire_partitions
+from traffic.utils.snapshot import invalidate_snapshot_cache
+from traffic.utils.spatial import GridIndex, haversine_m, invalidate_spatial_index
+
+# 2025-01-06 (월) 00:00 현지 시각
+START = timezone.make_aware(datetime(2025, 1, 6))
+
+
+class CacheResetMixin:
+    """조회/스냅샷 캐시는 프로세스 전역이므로 테스트마다 비운다"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        clear_local_cache()
+        invalidate_snapshot_cache()
+
+
+def make_incident(ticket_number, intersection=None, registered_at=START, **fields):
+    values = {
+        'incident_number': ticket_number, 'incident_type': '사고', 'incident_detail_type': '추돌',
+        'location_name': f'위치 {ticket_number}', 'district': 'Miraflores', 'managed_by': '', 'assigned_to': '',
+        'description': '', 'operator': '', 'status': '처리중', 'last_status_update': registered_at,
+    }
+    values.update(fields)
+    return Incident.objects.create(
+        ticket_number=ticket_number, intersection=intersection, registered_at=registered_at, **values,
+    )
+
+
+class MapDataTests(TestCase):
+    url = '/api/intersections/map_data/'
+
+    def setUp(self):
+        # 2×2 격자, 교차로별 2슬롯 × 4방향
+        self.ids = seed_intersections(4, prefix='TEST')
+        bulk_insert(TrafficVolume, iter_traffic_volumes(self.ids, 32, start=START, seed=2))
+        TrafficVolume.objects.create(
+            intersection_id=self.ids[0], datetime=START + SLOT * 5, direction='NS', volume=10000, is_simulated=True,
+        )
+        self.client = APIClient()
+
+    def expected(self, **filters):
+        rows = TrafficVolume.objects.filter(is_simulated=False, **filters).values_list(
+            'intersection_id', 'direction', 'volume',
+        )
+        result = {}
+        for pk, direction, volume in rows:
+            result.setdefault(pk, {}).setdefault(direction, 0)
+            result[pk][direction] += volume
+        return result
+
+    def volumes(self, response):
+        return {
+            row['id']: {v['direction']: v['total_volume'] for v in row['traffic_volumes']}
+            for row in response.json() if row['traffic_volumes']
+        }
+
+    def test_grouped_query_count_is_constant(self):
+        # 교차로 1회 + 월 파티션 목록 1회 + 교차로/방향 GROUP BY 1회
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 4)
+
+        more = seed_intersections(20, prefix='MORE')
+        bulk_insert(TrafficVolume, iter_traffic_volumes(more, 20 * 8, start=START, seed=3))
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 24)
+
+    def test_simulated_rows_are_excluded(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.volumes(response), self.expected())
+        self.assertLess(self.volumes(response)[self.ids[0]]['NS'], 10000)
+
+    def test_bbox_and_time_window(self):
+        # 첫 교차로(격자 0,0)만 포함하는 bbox, 두 번째 슬롯만
+        response = self.client.get(self.url, {
+            'bbox': '-77.0450,-12.0486,-77.0446,-12.0482',
+            'start_time': (START + SLOT).isoformat(), 'end_time': (START + SLOT).isoformat(),
+        })
+        self.assertEqual([row['id'] for row in response.json()], [self.ids[0]])
+        self.assertEqual(self.volumes(response), self.expected(intersection_id=self.ids[0], datetime=START + SLOT))
+
+    def test_invalid_bbox(self):
+        self.assertEqual(self.client.get(self.url, {'bbox': '1,2,3'}).status_code, 400)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.intersection_id = seed_intersections(1, prefix='TEST')[0]
+        # 4방향이 같은 시각을 공유하므로 (datetime, id) 동률 처리까지 확인된다
+        bulk_insert(TrafficVolume, iter_traffic_volumes([self.intersection_id], 22, start=START))
+        self.client = APIClient()
+
+    def test_cursor_pages_cover_all_rows_in_order(self):
+        expected = list(
+            TrafficVolume.objects.order_by('-datetime', '-id').values_list('id', flat=True)
+        )
+        seen = []
+        url = f'/api/traffic-volumes/?intersection={self.intersection_id}&page_size=5'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 5)
+            seen += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get('/api/traffic-volumes/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class RecomputeTotalVolumesTests(CacheResetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.ids = seed_intersections(2, prefix='TEST')
+        # 교차로별 2슬롯 × 4방향
+        bulk_insert(TrafficVolume, iter_traffic_volumes(self.ids, 16, start=START, seed=1))
+
+    def totals(self):
+        return dict(
+            ((pk, dt), volume) for pk, dt, volume in
+            TotalTrafficVolume.objects.values_list('intersection_id', 'datetime', 'total_volume')
+        )
+
+    def expected(self):
+        result = {}
+        for pk, dt, volume in TrafficVolume.objects.filter(is_simulated=False).values_list(
+            'intersection_id', 'datetime', 'volume',
+        ):
+            result[(pk, dt)] = result.get((pk, dt), 0) + volume
+        return result
+
+    def test_upsert_matches_raw_sums(self):
+        stats = recompute_total_volumes([(None, None, None)])
+        self.assertEqual(stats['upserted'], 4)
+        self.assertEqual(self.totals(), self.expected())
+
+        row = TrafficVolume.objects.filter(intersection_id=self.ids[0]).first()
+        TrafficVolume.objects.filter(pk=row.pk).update(volume=row.volume + 1000)
+        recompute_total_volumes([(self.ids[0], START, START + SLOT)])
+        self.assertEqual(TotalTrafficVolume.objects.count(), 4)
+        self.assertEqual(self.totals(), self.expected())
+
+    def test_simulated_rows_are_ignored(self):
+        TrafficVolume.objects.create(
+            intersection_id=self.ids[0], datetime=START + SLOT * 5, direction='NS', volume=99, is_simulated=True,
+        )
+        recompute_total_volumes([(None, None, None)])
+        self.assertFalse(TotalTrafficVolume.objects.filter(datetime=START + SLOT * 5).exists())
+
+    def test_stale_slot_is_deleted(self):
+        recompute_total_volumes([(None, None, None)])
+        TrafficVolume.objects.filter(intersection_id=self.ids[1], datetime=START + SLOT).delete()
+        stats = recompute_total_volumes([(self.ids[1], START, START + SLOT)])
+        self.assertEqual(stats['deleted'], 1)
+        self.assertFalse(TotalTrafficVolume.objects.filter(intersection_id=self.ids[1], datetime=START + SLOT).exists())
+        self.assertEqual(TotalTrafficVolume.objects.count(), 3)
+
+    def test_expired_slots_are_kept(self):
+        recompute_total_volumes([(None, None, None)])
+        ProcessingCheckpoint.objects.create(name=RETENTION_CHECKPOINT, watermark=START + SLOT)
+        TrafficVolume.objects.filter(datetime__lt=START + SLOT).delete()
+        stats = recompute_total_volumes([(None, None, None)])
+        self.assertEqual(stats['deleted'], 0)
+        self.assertEqual(TotalTrafficVolume.objects.filter(datetime=START).count(), 2)
+
+
+class MonthlyPartitionTests(CacheResetMixin, TransactionTestCase):
+    """월 파티션은 DDL을 쓰므로 트랜잭션 밖에서 실행하고, 만든 테이블은 테스트마다 지운다"""
+    january = date(2025, 1, 1)
+
+    def setUp(self):
+        super().setUp()
+        self.ids = seed_intersections(2, prefix='TEST')
+        # 1/27(월)~2/3: 첫 주 버킷이 1월/2월 테이블에 나뉜다
+        start = timezone.make_aware(datetime(2025, 1, 27))
+        bulk_insert(TrafficVolume, iter_traffic_volumes(self.ids, 2 * 8 * 96 * 4, start=start))
+        recompute_total_volumes([(None, None, None)])
+        self.client = APIClient()
+
+    def tearDown(self):
+        for partition in TrafficPartition.objects.all():
+            drop_partition(partition)
+        super().tearDown()
+
+    def url(self, start, end, granularity='1w'):
+        return (
+            f'/api/traffic-data/intersection/{self.ids[0]}/'
+            f'?granularity={granularity}&start_time={start}T00:00:00&end_time={end}T23:59:59'
+        )
+
+    def detach_january(self):
+        totals = detach_partition(TotalTrafficVolume, self.january)
+        volumes = detach_partition(TrafficVolume, self.january)
+        cache.clear()
+        clear_local_cache()
+        return totals, volumes
+
+    def test_detached_month_reads_match_single_table(self):
+        expected = {g: self.client.get(self.url('2025-01-27', '2025-02-03', g)).json() for g in ('15m', '1d', '1w')}
+        totals, volumes = self.detach_january()
+
+        # 1/27~1/31: 5일 × 96슬롯 × 교차로 2개
+        self.assertEqual(totals, 5 * 96 * 2)
+        self.assertEqual(volumes, 5 * 96 * 2 * 4)
+        self.assertFalse(TotalTrafficVolume.objects.filter(datetime__lt=month_bounds(self.january)[1]).exists())
+        for granularity, rows in expected.items():
+            self.assertEqual(self.client.get(self.url('2025-01-27', '2025-02-03', granularity)).json(), rows)
+
+    def test_only_overlapping_partitions_are_read(self):
+        self.detach_january()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(len(self.client.get(self.url('2025-02-01', '2025-02-03', '1d')).json()), 3)
+        self.assertNotIn('total_traffic_volume_202501', ' '.join(q['sql'] for q in ctx.captured_queries))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(len(self.client.get(self.url('2025-01-28', '2025-02-01', '1d')).json()), 5)
+        self.assertIn('total_traffic_volume_202501', ' '.join(q['sql'] for q in ctx.captured_queries))
+
+    def test_detached_month_is_read_only_and_dropped_whole(self):
+        self.detach_january()
+        response = self.client.post('/api/traffic-volumes/', {
+            'intersection': self.ids[0], 'datetime': '2025-01-28T10:00:00+09:00', 'direction': 'NS', 'volume': 1,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('datetime', response.json())
+
+        results = expire_partitions(TrafficVolume, month_bounds(self.january)[1])
+        self.assertEqual([(p.db_table, count) for p, _, count in results], [('traffic_trafficvolume_202501', 5 * 96 * 2 * 4)])
+        self.assertNotIn('traffic_trafficvolume_202501', connection.introspection.table_names())
+        self.assertEqual(TrafficPartition.objects.get().db_table, 'total_traffic_volume_202501')
+
+
+@unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow 미설치')
+class BatchTrafficDataTests(CacheResetMixin, TestCase):
+    url = '/api/traffic-data/batch/'
+
+    def setUp(self):
+        super().setUp()
+        self.ids = seed_intersections(3, prefix='TEST')
+        bulk_insert(TrafficVolume, iter_traffic_volumes(self.ids, 3 * 4 * 8, start=START, seed=6))
+        recompute_total_volumes([(None, None, None)])
+        # 두 번째 교차로는 마지막 슬롯이 비어 있다
+        TotalTrafficVolume.objects.filter(intersection_id=self.ids[1], datetime=START + SLOT * 7).delete()
+        self.client = APIClient()
+        self.params = {
+            'intersections': f'{self.ids[1]},{self.ids[0]},{self.ids[1]}',
+            'start_time': START.isoformat(), 'end_time': (START + SLOT * 7).isoformat(),
+        }
+
+    def test_columnar_series_in_one_query(self):
+        # 파티션 목록 1회 + 교차로/슬롯 조회 1회, 같은 요청은 캐시에서
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, self.params).data, response.data)
+
+        data = response.data
+        self.assertEqual(data['timestamps'], [timezone.localtime(START + SLOT * i) for i in range(8)])
+        self.assertEqual([item['id'] for item in data['intersections']], [self.ids[0], self.ids[1]])
+        for item in data['intersections']:
+            expected = dict(TotalTrafficVolume.objects.filter(intersection_id=item['id']).values_list('datetime', 'total_volume'))
+            self.assertEqual(item['total_volume'], [expected.get(START + SLOT * i) for i in range(8)])
+        self.assertIsNone(data['intersections'][1]['average_speed'][7])
+
+    def test_hourly_buckets(self):
+        response = self.client.get(self.url, dict(self.params, granularity='1h'))
+        self.assertEqual(response.data['timestamps'], [timezone.localtime(START), timezone.localtime(START + timedelta(hours=1))])
+        rows = TotalTrafficVolume.objects.filter(intersection_id=self.ids[1], datetime__gte=START + timedelta(hours=1))
+        second = response.data['intersections'][1]
+        self.assertEqual(second['total_volume'][1], sum(rows.values_list('total_volume', flat=True)))
+        speeds = list(rows.values_list('average_speed', flat=True))
+        self.assertEqual(second['average_speed'][1], round(sum(speeds) / len(speeds), 2))
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get(self.url, {'intersections': '1'}).status_code, 400)
+        too_many = ','.join(str(pk) for pk in range(1, 202))
+        self.assertEqual(self.client.get(self.url, dict(self.params, intersections=too_many)).status_code, 400)
+        self.assertEqual(self.client.get(self.url, dict(self.params, granularity='5m')).status_code, 400)
+
+
+class CitySnapshotTests(CacheResetMixin, TestCase):
+    url = '/api/traffic-data/intersections/'
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def test_empty(self):
+        self.assertEqual(self.client.get(self.url).data, {'intersection_ids': [], 'frames': []})
+
+    def test_frames(self):
+        ids = seed_intersections(3, prefix='TEST')
+        bulk_insert(TrafficVolume, iter_traffic_volumes(ids, 3 * 4 * 8, start=START, seed=8))
+        recompute_total_volumes([(None, None, None)])
+        TotalTrafficVolume.objects.filter(intersection_id=ids[2], datetime=START + SLOT * 2).delete()
+        totals = {
+            (pk, slot): (volume, speed) for pk, slot, volume, speed in
+            TotalTrafficVolume.objects.values_list('intersection_id', 'datetime', 'total_volume', 'average_speed')
+        }
+
+        # 최신 슬롯 조회 1회 + 파티션 목록 1회 + 슬롯 조회 1회
+        with self.assertNumQueries(3):
+            latest = self.client.get(self.url).data
+        self.assertEqual(latest['intersection_ids'], ids)
+        self.assertEqual([frame['datetime'] for frame in latest['frames']], [timezone.localtime(START + SLOT * 7)])
+        self.assertEqual(latest['frames'][0]['total_volume'], [totals[pk, START + SLOT * 7][0] for pk in ids])
+
+        # 슬롯 중간 시각은 슬롯 시작으로 내리고, step 간격으로 frames개
+        params = {'time': (START + SLOT + timedelta(minutes=7)).isoformat(), 'frames': 4, 'step': 2}
+        data = self.client.get(self.url, params).data
+        slots = [START + SLOT * i for i in (1, 3, 5, 7)]
+        self.assertEqual([frame['datetime'] for frame in data['frames']], [timezone.localtime(slot) for slot in slots])
+        for frame, slot in zip(data['frames'], slots):
+            self.assertEqual(frame['average_speed'], [totals[pk, slot][1] for pk in ids])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, params).data, data)
+
+        data = self.client.get(self.url, {'time': (START + SLOT * 2).isoformat(), 'frames': 8}).data
+        self.assertEqual(data['frames'][0]['total_volume'][2], None)
+        self.assertEqual(data['frames'][6]['total_volume'], [None] * 3)
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(self.url, {'frames': 97}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'time': 'yesterday'}).status_code, 400)
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        seed_intersections(2, prefix='TEST')
+        self.client = APIClient()
+
+    def test_request_metrics_and_prometheus_output(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get('/api/intersections/map_data/').status_code, 200)
+        self.client.get('/api/intersections/nearby/', {'lat': 'x', 'lon': 0})
+
+        latency, queries, totals = registry.snapshot()
+        labels = ('intersection-map-data', 'GET', '2xx')
+        self.assertEqual(latency[labels][2], 2)
+        # 요청마다 교차로 조회 + 파티션 목록 + GROUP BY
+        self.assertEqual(queries[labels][1], 2 * 3)
+        self.assertGreater(totals[labels]['render_seconds'], 0)
+        self.assertEqual(queries['intersection-nearby', 'GET', '4xx'][2], 1)
+
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('traffic_http_db_queries_bucket{view="intersection-map-data",method="GET",status="2xx",le="5"} 2', body)
+        self.assertIn('traffic_http_request_duration_seconds_count{view="intersection-nearby",method="GET",status="4xx"} 1', body)
+        self.assertIn('# TYPE traffic_query_cache_misses_total counter', body)
+        with override_settings(TRAFFIC_METRICS_ENABLED=False):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    def test_profile_requires_opt_in(self):
+        response = self.client.get('/api/intersections/map_data/', {'profile': 1})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        with override_settings(TRAFFIC_PROFILING_ENABLED=True):
+            response = self.client.get('/api/intersections/map_data/', {'profile': 1, 'profile_sort': 'tottime'})
+        report = response.content.decode()
+        self.assertTrue(report.startswith('GET /api/intersections/map_data/?profile=1&profile_sort=tottime → 200'))
+        self.assertIn('queries 3 ', report)
+        self.assertIn('Ordered by: internal time', report)
+
+    @override_settings(TRAFFIC_PROFILING_ENABLED=True)
+    def test_profiler_stopped_when_view_raises(self):
+        def failing_view(request):
+            raise RuntimeError('뷰 오류')
+
+        request = RequestFactory().get('/api/intersections/', {'profile': 1})
+        with self.assertRaises(RuntimeError):
+            RequestMetricsMiddleware(failing_view)(request)
+        self.assertIsNone(sys.getprofile())
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+def make_record(name, msg, *args, level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 0, msg, args, None)
+
+
+class LoggingTests(TestCase):
+    def test_sampling_filter(self):
+        sampling = SamplingFilter(rates={'traffic.views': 0.0, 'traffic.views.stream': 1.0})
+        self.assertFalse(sampling.filter(make_record('traffic.views', '조회')))
+        self.assertFalse(sampling.filter(make_record('traffic.views.detail', '조회')))
+        self.assertTrue(sampling.filter(make_record('traffic.views.stream', '조회')))
+        self.assertTrue(sampling.filter(make_record('traffic.viewsets', '조회')))
+        self.assertTrue(sampling.filter(make_record('traffic.views', '오류', level=logging.WARNING)))
+        self.assertEqual(SamplingFilter(level=logging.ERROR).level, logging.ERROR)
+        with self.assertRaises(ValueError):
+            SamplingFilter(level='LOUD')
+
+    @mock.patch('traffic.utils.log.time.monotonic')
+    def test_rate_limit_per_template(self, monotonic):
+        monotonic.return_value = 100.0
+        limiter = RateLimitFilter(rate=1, burst=2)
+        results = [limiter.filter(make_record('traffic', '교차로 %s 조회', pk)) for pk in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertTrue(limiter.filter(make_record('traffic', '다른 메시지')))
+
+        monotonic.return_value = 101.0
+        record = make_record('traffic', '교차로 %s 조회', 9)
+        self.assertTrue(limiter.filter(record))
+        self.assertEqual(record.suppressed, 1)
+        self.assertTrue(limiter.filter(make_record('traffic', '교차로 %s 조회', 9, level=logging.CRITICAL)))
+
+    def test_rate_limit_buckets_are_bounded(self):
+        limiter = RateLimitFilter(rate=0, burst=1, max_keys=2)
+        for msg in ('a', 'b', 'a', 'c'):
+            limiter.filter(make_record('traffic', msg))
+        # 가장 오래 안 쓴 'b'가 밀려나고, 다시 오면 burst부터 시작
+        self.assertEqual([key[1] for key in limiter._buckets], ['a', 'c'])
+        self.assertTrue(limiter.filter(make_record('traffic', 'b')))
+        self.assertFalse(limiter.filter(make_record('traffic', 'c')))
+
+    def test_background_handler_resolves_targets_on_first_emit(self):
+        handler = BackgroundHandler('traffic.tests.output')
+        self.addCleanup(handler.close)
+        target = ListHandler()
+        target.setFormatter(JsonFormatter())
+        output = logging.getLogger('traffic.tests.output')
+        output.addHandler(target)
+        self.addCleanup(output.removeHandler, target)
+
+        logger = logging.getLogger('traffic.tests.background')
+        logger.propagate = False
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        logger.warning('교차로 %s 조회', 7, extra={'rows': 3})
+        try:
+            raise RuntimeError('실패')
+        except RuntimeError:
+            logger.exception('처리 오류')
+        handler.stop()  # 큐에 남은 레코드를 모두 기록
+
+        first, second = [json.loads(message) for message in target.messages]
+        self.assertEqual((first['message'], first['rows'], first['level']), ('교차로 7 조회', 3, 'WARNING'))
+        self.assertEqual(second['message'], '처리 오류')
+        self.assertIn('RuntimeError: 실패', second['exc'])
+
+    def test_background_handler_without_targets_reports_error(self):
+        handler = BackgroundHandler('traffic.tests.missing')
+        self.addCleanup(handler.close)
+        with mock.patch.object(handler, 'handleError') as handle_error:
+            handler.emit(make_record('traffic', '기록'))
+        handle_error.assert_called_once()
+        self.assertIsNone(handler.listener)
+
+
+class ExportTests(TestCase):
+    url = '/api/traffic-data/export/'
+
+    def setUp(self):
+        self.ids = seed_intersections(3, prefix='TEST')
+        # 교차로별 6슬롯 × 4방향
+        bulk_insert(TrafficVolume, iter_traffic_volumes(self.ids, 3 * 24, start=START, seed=4))
+        recompute_total_volumes([(None, None, None)])
+        self.client = APIClient()
+
+    def fetch(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def expected_volumes(self):
+        return [
+            (pk, dt, direction, volume)
+            for pk, dt, direction, volume in TrafficVolume.objects.filter(
+                intersection_id__in=self.ids[:2], direction__in=['NS', 'WE'], datetime__gte=START + SLOT * 2,
+            ).order_by('intersection_id', 'datetime', 'direction').values_list('intersection_id', 'datetime', 'direction', 'volume')
+        ]
+
+    def test_csv_gzip_with_filters(self):
+        response, body = self.fetch(
+            source='volume', output='csv', intersections=f'{self.ids[0]},{self.ids[1]}', directions='ns,we',
+            start_time=(START + SLOT * 2).isoformat(),
+        )
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        rows = list(csv.reader(io.StringIO(gzip.decompress(body).decode('utf-8'))))
+        self.assertEqual(rows[0], ['intersection_id', 'datetime', 'direction', 'volume', 'is_simulated'])
+        got = sorted((int(r[0]), datetime.fromisoformat(r[1]), r[2], int(r[3])) for r in rows[1:])
+        self.assertEqual(got, sorted(self.expected_volumes()))
+        self.assertEqual(len(got), 2 * 4 * 2)
+
+    def test_arrow_and_parquet_match_db(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        expected = list(TotalTrafficVolume.objects.order_by('intersection_id', 'datetime').values_list(
+            'intersection_id', 'datetime', 'total_volume', 'average_speed',
+        ))
+        response, body = self.fetch(source='total', output='arrow')
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.stream')
+        arrow = pa.ipc.open_stream(body).read_all()
+        response, body = self.fetch(source='total', output='parquet')
+        parquet = pq.read_table(io.BytesIO(body))
+
+        for table in (arrow, parquet):
+            self.assertEqual(table.column_names, ['intersection_id', 'datetime', 'total_volume', 'average_speed'])
+            self.assertEqual(table.num_rows, 3 * 6)
+            self.assertEqual(table.column('intersection_id').to_pylist(), [row[0] for row in expected])
+            self.assertEqual(table.column('total_volume').to_pylist(), [row[2] for row in expected])
+            self.assertEqual(table.column('datetime').to_pylist()[0], expected[0][1])
+
+    def test_invalid_output_and_source(self):
+        self.assertEqual(self.client.get(self.url, {'output': 'xlsx'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'source': 'rollup'}).status_code, 400)
+
+    def test_command_writes_batched_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'total.csv.gz')
+            call_command('export_traffic_data', output=path, source='total', batch_size=5, stdout=io.StringIO())
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                self.assertEqual(len(list(csv.reader(f))), 1 + 3 * 6)
+
+
+class BrokerTests(TestCase):
+    def attach(self, broker, **filters):
+        """실행 중인 루프 없이 구독자 추가 (전달은 drain에서 루프를 돌려 처리)"""
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscription = Subscription(loop, **filters)
+        broker._subscriptions.add(subscription)
+        return subscription
+
+    def drain(self, subscription):
+        subscription.loop.run_until_complete(asyncio.sleep(0))
+        events = list(subscription.queue)
+        subscription.queue.clear()
+        return events
+
+    def test_filters_and_bounded_queue(self):
+        broker = InProcessBroker()
+        near = self.attach(broker, channels=['slots'], bbox=(-77.1, -12.2, -77.0, -12.0))
+        one = self.attach(broker, intersection_ids=[2], max_queue=2, max_dropped=1)
+        events = [
+            {'intersection_id': 1, 'latitude': -12.1, 'longitude': -77.05},
+            {'intersection_id': 2, 'latitude': 10.0, 'longitude': 10.0},
+            {'intersection_id': 2},
+        ]
+        self.assertEqual(broker.publish('slots', events), 1 + 2)
+        self.assertEqual(self.drain(near), [('slots', events[0])])
+        self.assertEqual(self.drain(one), [('slots', events[1]), ('slots', events[2])])
+        self.assertEqual(broker.publish('incidents', [{'intersection_id': 1}]), 0)
+
+        # 큐가 가득 차면 오래된 이벤트부터 버리고, max_dropped를 넘기면 연결을 닫는다
+        broker.publish('slots', [{'intersection_id': 2, 'n': n} for n in range(3)])
+        self.assertEqual(self.drain(one), [('slots', {'intersection_id': 2, 'n': 1}), ('slots', {'intersection_id': 2, 'n': 2})])
+        self.assertEqual(one.dropped, 1)
+        self.assertFalse(one.closed)
+        broker.publish('slots', [{'intersection_id': 2}] * 3)
+        self.drain(one)
+        self.assertTrue(one.closed)
+
+    def test_polling_publishes_new_rows_once(self):
+        intersection = Intersection.objects.get(pk=seed_intersections(1, prefix='TEST')[0])
+        make_incident(1, intersection)
+        broker = DatabasePollingBroker()
+        subscription = self.attach(broker)
+
+        # 첫 폴링은 기준 시점만 기록 (구독 전의 사고는 보내지 않는다)
+        self.assertEqual(broker.poll(), 0)
+        LatestTrafficSnapshot.objects.create(intersection=intersection, datetime=START, total_volume=120, average_speed=31.5)
+        incident = make_incident(2, intersection)
+        self.assertEqual(broker.poll(), 2)
+        events = self.drain(subscription)
+        self.assertEqual([channel for channel, _ in events], ['slots', 'incidents'])
+        self.assertEqual(events[0][1]['total_volume'], 120)
+        self.assertEqual(events[1][1]['id'], incident.id)
+        self.assertEqual(events[1][1]['latitude'], intersection.latitude)
+
+        # 겹침 범위로 다시 읽은 행은 거르고, 바뀐 슬롯만 다시 보낸다
+        self.assertEqual(broker.poll(), 0)
+        LatestTrafficSnapshot.objects.filter(pk=intersection.pk).update(total_volume=90, updated_at=timezone.now())
+        self.assertEqual(broker.poll(), 1)
+        self.assertEqual(self.drain(subscription)[0][1]['total_volume'], 90)
+
+    def test_poll_loop_survives_errors(self):
+        broker = DatabasePollingBroker()
+        broker.interval = 0
+        broker._subscriptions.add(object())
+        calls = []
+
+        def poll():
+            calls.append(None)
+            if len(calls) == 1:
+                raise DatabaseError('연결 끊김')
+            if len(calls) == 3:
+                broker._subscriptions.clear()
+            return 0
+
+        broker.poll = poll
+        broker._since = START
+        with self.assertLogs('traffic.utils.realtime', 'ERROR') as logs:
+            asyncio.run(broker._poll_loop())
+        self.assertEqual(len(calls), 3)
+        self.assertIn('DB 폴링 실패', logs.output[0])
+        self.assertIsNone(broker._since)
+
+
+class ImportIncidentsTests(TestCase):
+    COLUMNS = [
+        'Nro', 'Ticket', 'Incidencia', 'Tipo', 'Cruce', 'Distrito', 'Administrado por', 'Asignado a',
+        'Detalle', 'Operador', 'Estado', 'Fecha de registro', 'Fecha ultimo Estado',
+    ]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.enterContext(override_settings(TRAFFIC_MATCHER_CACHE_PATH=os.path.join(self.tmp.name, 'index.pickle')))
+        self.arequipa = Intersection.objects.create(name='AV. AREQUIPA - JR. HUSARES DE JUNIN', latitude=-12.1, longitude=-77.03)
+        self.existing = make_incident(100, registered_at=START - timedelta(days=40), status='Pendiente')
+
+    def write_report(self, name, rows):
+        path = os.path.join(self.tmp.name, name)
+        pd.DataFrame([
+            [ticket, ticket, 'Semáforo', 'Apagado', location, 'Lince', 'MML', 'Equipo', '', 'op', status,
+             '2025-01-06 08:00:00', '2025-01-06 09:30:00']
+            for ticket, location, status in rows
+        ], columns=self.COLUMNS).to_excel(path, index=False)
+
+    def test_upsert_across_reports(self):
+        self.write_report('a.xlsx', [
+            (100, 'Jr. Húsares de Junín - Av. Arequipa', 'En proceso'),
+            (101, 'AV. AREQUIPA - JR. HUSARES DE JUNIN', 'Pendiente'),
+        ])
+        # 나중 파일의 같은 티켓이 우선
+        self.write_report('b.xlsx', [(101, 'AV. BRASIL - AV. SALAVERRY', 'Cerrado'), (102, 'AV. BRASIL - AV. SALAVERRY', 'Cerrado')])
+
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('import_incidents', self.tmp.name, batch_size=2, stdout=out)
+        lookups = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT') and '"ticket_number" IN' in q['sql']]
+        self.assertEqual(len(lookups), 2)  # 티켓 3개를 배치 2개로 나눠 조회
+
+        incidents = {incident.ticket_number: incident for incident in Incident.objects.all()}
+        self.assertEqual(sorted(incidents), [100, 101, 102])
+        self.assertEqual(incidents[100].pk, self.existing.pk)
+        self.assertEqual(incidents[100].status, 'En proceso')
+        self.assertEqual(incidents[100].intersection_id, self.arequipa.pk)
+        self.assertEqual(timezone.localtime(incidents[100].registered_at), START + timedelta(hours=8))
+        self.assertEqual(incidents[101].status, 'Cerrado')
+        self.assertIsNone(incidents[101].intersection_id)
+        self.assertIn('신규 2건, 갱신 1건', out.getvalue())
+        self.assertIn('AV. BRASIL - AV. SALAVERRY', out.getvalue())
+
+        # 같은 리포트를 다시 읽으면 행이 늘지 않는다
+        call_command('import_incidents', self.tmp.name, stdout=io.StringIO())
+        self.assertEqual(Incident.objects.count(), 3)
+
+
+class CongestionModelTests(CacheResetMixin, TestCase):
+    def test_models(self):
+        volumes = np.array([100.0, 600.0, 1200.0])
+        np.testing.assert_allclose(threshold_speeds(volumes), [50.0, 35.0, 25.0])
+        np.testing.assert_allclose(threshold_speeds(volumes, free_flow_speed=60, steps=[(500, 0.5)]), [60.0, 30.0, 30.0])
+        np.testing.assert_allclose(bpr_speeds(np.array([0.0, 1000.0, 5000.0])), [50.0, 50 / 1.15, 5.0])
+        np.testing.assert_allclose(calibrated_speeds(volumes, [(1000, 20), (0, 60)]), [56.0, 36.0, 20.0])
+
+    def test_per_intersection_configs(self):
+        ids = seed_intersections(3, prefix='TEST')
+        CongestionModelConfig.objects.create(intersection_id=ids[0], model='bpr', params={'capacity': 500})
+        CongestionModelConfig.objects.create(intersection_id=ids[2], model='calibrated', params={'points': [[0, 40], [800, 20]]})
+        estimator = SpeedEstimator()
+        speeds = estimator([ids[2], ids[0], ids[1], ids[0]], [400, 500, 600, 0])
+        np.testing.assert_allclose(speeds, [30.0, 43.48, 35.0, 50.0])
+
+        CongestionModelConfig.objects.create(intersection_id=ids[1], model='nope')
+        with self.assertRaises(ValueError):
+            SpeedEstimator()
+
+    def test_recompute_updates_changed_speeds_only(self):
+        ids = seed_intersections(2, prefix='TEST')
+        bulk_insert(TrafficVolume, iter_traffic_volumes(ids, 2 * 4 * 8, start=START, seed=5))
+        recompute_total_volumes([(None, None, None)])
+        before = dict(TotalTrafficVolume.objects.filter(intersection_id=ids[1]).values_list('datetime', 'average_speed'))
+
+        CongestionModelConfig.objects.create(intersection_id=ids[0], model='threshold', params={'free_flow_speed': 80})
+        self.assertEqual(recompute_average_speeds(), {'scanned': 16, 'updated': 8})
+        after = TotalTrafficVolume.objects.filter(intersection_id=ids[0]).values_list('total_volume', 'average_speed')
+        for total, speed in after:
+            self.assertEqual(speed, float(threshold_speeds(np.array([total]), free_flow_speed=80)[0]))
+        self.assertEqual(dict(TotalTrafficVolume.objects.filter(intersection_id=ids[1]).values_list('datetime', 'average_speed')), before)
+        # 최신 슬롯 스냅샷도 시그널로 함께 갱신된다
+        latest = TotalTrafficVolume.objects.filter(intersection_id=ids[0]).latest('datetime')
+        self.assertEqual(LatestTrafficSnapshot.objects.get(pk=ids[0]).average_speed, latest.average_speed)
+        self.assertEqual(recompute_average_speeds(), {'scanned': 16, 'updated': 0})
+
+
+class IncidentStatsTests(CacheResetMixin, TestCase):
+    url = '/api/incidents/'
+    RESOLVED = 'RESUELTO - FINALIZADO'
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        ticket = iter(range(1, 100))
+        # Lince: 처리 시간 5,1,3,2,4분 / Miraflores: 10,20분 (월요일 08시, 화요일 18시 등록)
+        for minutes in (5, 1, 3, 2, 4):
+            registered = START + timedelta(hours=8, minutes=minutes)
+            make_incident(next(ticket), registered_at=registered, district='Lince', status=self.RESOLVED,
+                          last_status_update=registered + timedelta(minutes=minutes))
+        for minutes in (10, 20):
+            registered = START + timedelta(days=1, hours=18)
+            make_incident(next(ticket), registered_at=registered, incident_type='정전', status=self.RESOLVED,
+                          last_status_update=registered + timedelta(minutes=minutes))
+        # 처리 중이거나 상태 변경 시각이 등록보다 앞선 사고는 처리 시간에서 제외
+        make_incident(next(ticket), registered_at=START + timedelta(days=1, hours=18), district='Lince')
+        make_incident(next(ticket), registered_at=START + timedelta(hours=8), status=self.RESOLVED,
+                      last_status_update=START)
+
+    def stats(self, **params):
+        response = self.client.get(f'{self.url}stats/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_counts(self):
+        data = self.stats()
+        self.assertEqual(data['total'], 9)
+        self.assertEqual(data['results'], [{'key': 'Lince', 'count': 6}, {'key': 'Miraflores', 'count': 3}])
+        self.assertEqual(self.stats(group_by='type', status=self.RESOLVED)['results'], [
+            {'key': '사고', 'count': 6}, {'key': '정전', 'count': 2},
+        ])
+        self.assertEqual(self.stats(group_by='hour_of_week')['results'], [
+            {'weekday': 1, 'hour': 8, 'count': 6}, {'weekday': 2, 'hour': 18, 'count': 3},
+        ])
+        window = {'start_time': (START + timedelta(days=1)).isoformat(), 'end_time': (START + timedelta(days=2)).isoformat()}
+        self.assertEqual(self.stats(**window)['total'], 3)
+
+        # 새 사고 저장은 등록 시각이 걸친 월의 캐시만 무효화한다
+        make_incident(50, registered_at=START + timedelta(days=1, hours=19), district='Lince')
+        self.assertEqual(self.stats(**window)['results'], [{'key': 'Lince', 'count': 2}, {'key': 'Miraflores', 'count': 2}])
+
+    def test_resolution_percentiles(self):
+        response = self.client.get(f'{self.url}resolution_times/', {'percentiles': '50,90,100'})
+        self.assertEqual(response.data['results'], [{
+            'key': None, 'count': 7, 'mean_seconds': round(45 * 60 / 7, 1),
+            'p50_seconds': 240.0, 'p90_seconds': 1200.0, 'p100_seconds': 1200.0,
+        }])
+
+        response = self.client.get(f'{self.url}resolution_times/', {'group_by': 'district', 'percentiles': '50,90'})
+        self.assertEqual(response.data['results'], [
+            {'key': 'Lince', 'count': 5, 'mean_seconds': 180.0, 'p50_seconds': 180.0, 'p90_seconds': 300.0},
+            {'key': 'Miraflores', 'count': 2, 'mean_seconds': 900.0, 'p50_seconds': 600.0, 'p90_seconds': 1200.0},
+        ])
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(f'{self.url}stats/', {'group_by': 'weather'}).status_code, 400)
+        self.assertEqual(self.client.get(f'{self.url}resolution_times/', {'group_by': 'status'}).status_code, 400)
+        self.assertEqual(self.client.get(f'{self.url}resolution_times/', {'percentiles': '0'}).status_code, 400)
+
+
+class IncidentImpactTests(TestCase):
+    def test_interval_sums(self):
+        times = np.arange(5.0)
+        counts, volumes, speeds = interval_sums(
+            times, np.array([10.0, 20, 30, 40, 50]), np.arange(1.0, 6),
+            starts=np.array([0, 1, 5, 2.5]), ends=np.array([2, 5, 6, 3.5]),
+        )
+        self.assertEqual(counts.tolist(), [2, 4, 0, 1])
+        self.assertEqual(volumes.tolist(), [30, 140, 0, 40])
+        self.assertEqual(speeds.tolist(), [3, 14, 0, 4])
+
+        # 무작위 구간도 구간마다 직접 더한 값과 같다
+        rng = np.random.default_rng(3)
+        times = np.sort(rng.choice(1000, 300, replace=False)).astype(np.float64)
+        values = rng.integers(0, 500, 300).astype(np.float64)
+        starts = rng.uniform(-50, 1000, 100)
+        ends = starts + rng.uniform(0, 200, 100)
+        counts, sums, _ = interval_sums(times, values, values, starts, ends)
+        for start, end, count, total in zip(starts, ends, counts, sums):
+            mask = (times >= start) & (times < end)
+            self.assertEqual((count, total), (mask.sum(), values[mask].sum()))
+
+    def test_impacts_health_and_endpoint(self):
+        quiet, busy = seed_intersections(2, prefix='TEST')
+        # 4주 동안 월요일 08시대 슬롯당 100대/40km/h, 사고가 난 5주째는 40대/20km/h
+        TotalTrafficVolume.objects.bulk_create([
+            TotalTrafficVolume(
+                intersection_id=busy, datetime=START + week * WEEK + timedelta(hours=8) + SLOT * i,
+                total_volume=40 if week == 4 else 100, average_speed=20.0 if week == 4 else 40.0,
+            )
+            for week in range(5) for i in range(4)
+        ])
+        registered = START + 4 * WEEK + timedelta(hours=8, minutes=3)
+        crash = make_incident(1, Intersection.objects.get(pk=busy), registered_at=registered,
+                              status='RESUELTO - FINALIZADO', last_status_update=START + 4 * WEEK + timedelta(hours=9))
+        outage = make_incident(2, Intersection.objects.get(pk=quiet), registered_at=registered,
+                               incident_detail_type='CRUCE APAGADO')
+        make_incident(3, registered_at=registered)  # 교차로가 없는 사고는 제외
+        now = START + 5 * WEEK
+
+        self.assertEqual(compute_incident_impacts(now, full=True), {'planned': 2, 'upserted': 2, 'deleted': 0})
+        impact = IncidentImpact.objects.get(pk=crash.pk)
+        self.assertEqual(
+            (impact.window_start, impact.window_end, impact.slots, impact.observed_volume, impact.baseline_volume,
+             impact.observed_speed, impact.baseline_speed, impact.is_outage),
+            (registered - timedelta(minutes=3), registered + timedelta(minutes=57), 4, 160, 400.0, 20.0, 40.0, False),
+        )
+        impact = IncidentImpact.objects.get(pk=outage.pk)
+        # 미처리 사고는 현재까지, 최대 24시간
+        self.assertEqual(impact.window_end - impact.window_start, timedelta(hours=24))
+        self.assertEqual((impact.slots, impact.baseline_volume, impact.observed_speed, impact.is_outage), (0, None, None, True))
+
+        self.assertEqual(refresh_health(now), {'intersections': 2, 'deleted': 0})
+        health = IntersectionHealth.objects.get(pk=busy)
+        self.assertEqual((health.lost_volume, health.volume_loss_ratio, health.speed_loss_ratio), (240.0, 0.6, 0.5))
+        self.assertEqual(health.score, health_score(1, 1.0, 0.6, 0.5))
+        self.assertEqual(health.score, 95.8)
+        self.assertEqual(IntersectionHealth.objects.get(pk=quiet).score, 72.5)  # 정전 24시간은 48시간으로 계산
+
+        response = APIClient().get('/api/intersections/health/', {'limit': 1})
+        self.assertEqual([(row['intersection'], row['score']) for row in response.data], [(quiet, 72.5)])
+        response = APIClient().get(f'/api/intersections/{busy}/incident_impacts/')
+        self.assertEqual(response.data['results'][0]['ticket_number'], 1)
+
+        # 증분: 바뀐 사고만 다시 계산
+        self.assertEqual(compute_incident_impacts(now, watermark=now)['planned'], 0)
+        Incident.objects.filter(pk=outage.pk).update(status='RESUELTO - FINALIZADO', last_status_update=registered + timedelta(hours=2))
+        self.assertEqual(compute_incident_impacts(now, watermark=now), {'planned': 1, 'upserted': 1, 'deleted': 0})
+        self.assertEqual(IncidentImpact.objects.get(pk=outage.pk).window_end, registered + timedelta(hours=2))
+
+        # 기간 안에 사고가 없는 교차로는 순위에서 빠진다
+        self.assertEqual(refresh_health(now + timedelta(days=200)), {'intersections': 0, 'deleted': 2})
+
+
+class QueryCacheInvalidationTests(CacheResetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+        self.end = START + timedelta(days=1)
+
+    def lookup(self, scope):
+        return cached_window('test', scope, START, self.end, lambda: self.calls.append(scope) or len(self.calls))
+
+    def test_slots_updated_invalidates_only_touched_scope(self):
+        self.assertEqual(self.lookup(1), 1)
+        self.assertEqual(self.lookup(2), 2)
+        self.assertEqual(self.lookup(1), 1)
+        self.assertEqual(self.calls, [1, 2])
+
+        traffic_slots_updated.send(
+            sender=TotalTrafficVolume, intersection_ids={1}, slot_min=START + SLOT, slot_max=START + SLOT,
+        )
+        self.assertEqual(self.lookup(1), 3)
+        self.assertEqual(self.lookup(2), 2)
+        self.assertEqual(self.calls, [1, 2, 1])
+
+    def test_other_months_stay_cached(self):
+        self.lookup(1)
+        later = START + timedelta(days=60)
+        traffic_slots_updated.send(sender=TotalTrafficVolume, intersection_ids={1}, slot_min=later, slot_max=later)
+        self.lookup(1)
+        self.assertEqual(self.calls, [1])
+
+    def test_closed_windows_kept_long_only_in_shared_cache(self):
+        # LocMemCache는 다른 프로세스의 무효화를 볼 수 없으므로 끝난 윈도우도 짧게 보관하고 경고한다
+        self.assertEqual(window_timeout(self.end), settings.TRAFFIC_QUERY_CACHE_OPEN_TIMEOUT)
+        self.assertEqual([warning.id for warning in check_query_cache_backend(None)], ['traffic.W001'])
+
+        with tempfile.TemporaryDirectory() as tmp, override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tmp,
+        }}):
+            self.assertEqual(window_timeout(self.end), settings.TRAFFIC_QUERY_CACHE_CLOSED_TIMEOUT)
+            self.assertEqual(window_timeout(None), settings.TRAFFIC_QUERY_CACHE_OPEN_TIMEOUT)
+            self.assertEqual(check_query_cache_backend(None), [])
+
+
+class DownsampleTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.arange(1000, dtype=np.float64)
+        self.y = rng.normal(100, 20, 1000)
+        self.y[437] = 1000
+        self.y[712] = -500
+
+    def test_lttb_keeps_endpoints_and_size(self):
+        indices = lttb_indices(self.x, self.y, 50)
+        self.assertEqual(len(indices), 50)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(437, indices)
+        self.assertIn(712, indices)
+
+    def test_lttb_small_series_unchanged(self):
+        np.testing.assert_array_equal(lttb_indices(self.x[:10], self.y[:10], 50), np.arange(10))
+
+    def test_minmax_keeps_extremes_within_bound(self):
+        indices = minmax_indices(self.y, 40)
+        self.assertLessEqual(len(indices), 40)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(437, indices)
+        self.assertIn(712, indices)
+
+    def test_downsample_rows(self):
+        rows = [{'datetime': START + SLOT * i, 'total_volume': float(v)} for i, v in enumerate(self.y)]
+        self.assertIs(downsample_rows(rows, None), rows)
+        for method in ('lttb', 'minmax'):
+            sampled = downsample_rows(rows, 100, method)
+            self.assertLessEqual(len(sampled), 100)
+            self.assertEqual(sampled, sorted(sampled, key=lambda row: row['datetime']))
+
+
+class SpatialIndexTests(TestCase):
+    def setUp(self):
+        invalidate_spatial_index()
+        self.client = APIClient()
+
+    def test_grid_matches_brute_force(self):
+        rng = np.random.default_rng(11)
+        lats = LIMA_CENTER[0] + rng.uniform(-0.05, 0.05, 2000)
+        lons = LIMA_CENTER[1] + rng.uniform(-0.05, 0.05, 2000)
+        index = GridIndex(np.arange(2000), lats, lons, cell_size=0.005)
+        for lat, lon, radius in [(LIMA_CENTER[0], LIMA_CENTER[1], 800), (-12.08, -77.01, 2500), (-12.0, -77.2, 300)]:
+            distances = haversine_m(lat, lon, lats, lons)
+            ids, got = index.nearby(lat, lon, radius)
+            expected = np.flatnonzero(distances <= radius)
+            self.assertEqual(sorted(ids.tolist()), expected.tolist())
+            self.assertTrue(np.all(np.diff(got) >= 0))
+            self.assertEqual(index.nearest(lat, lon, 50000)[0], int(distances.argmin()))
+
+        bbox = (-77.05, -12.06, -77.03, -12.04)
+        inside = (lons >= bbox[0]) & (lons <= bbox[2]) & (lats >= bbox[1]) & (lats <= bbox[3])
+        self.assertEqual(sorted(index.within(bbox).tolist()), np.flatnonzero(inside).tolist())
+        self.assertIsNone(GridIndex([], [], []).nearest(0, 0))
+
+    def test_endpoints(self):
+        ids = seed_intersections(9, prefix='TEST')  # 0.002도(약 220m) 간격 3×3 격자
+        center = Intersection.objects.get(pk=ids[4])
+
+        response = self.client.get('/api/intersections/nearby/', {'lat': center.latitude, 'lon': center.longitude, 'radius': 250})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['id'], center.pk)
+        self.assertEqual(response.data[0]['distance_m'], 0.0)
+        self.assertEqual(len(response.data), 5)  # 중심 + 상하좌우
+        self.assertEqual(len(self.client.get('/api/intersections/nearby/', {
+            'lat': center.latitude, 'lon': center.longitude, 'radius': 1000, 'limit': 3,
+        }).data), 3)
+
+        response = self.client.get('/api/intersections/nearest/', {'lat': center.latitude + 0.0003, 'lon': center.longitude})
+        self.assertEqual(response.data['id'], center.pk)
+        self.assertAlmostEqual(response.data['distance_m'], 33.4, delta=0.5)
+        response = self.client.get('/api/intersections/nearest/', {'lat': -12.5, 'lon': -77.0, 'max_radius': 1000})
+        self.assertEqual(response.status_code, 404)
+
+        bbox = f'{center.longitude - 0.001},{center.latitude - 0.003},{center.longitude + 0.001},{center.latitude + 0.003}'
+        response = self.client.get('/api/intersections/within/', {'bbox': bbox})
+        self.assertEqual(sorted(item['id'] for item in response.data), [ids[1], ids[4], ids[7]])
+        self.assertEqual(self.client.get('/api/intersections/within/').status_code, 400)
+        self.assertEqual(self.client.get('/api/intersections/nearby/', {'lat': 95, 'lon': 0}).status_code, 400)
+
+        # 같은 프로세스의 저장은 시그널로 색인에 바로 반영된다
+        added = Intersection.objects.create(name='NEW', latitude=center.latitude + 0.0001, longitude=center.longitude)
+        response = self.client.get('/api/intersections/nearest/', {'lat': center.latitude + 0.0001, 'lon': center.longitude})
+        self.assertEqual(response.data['id'], added.pk)
+
+
+class ImportKmlTests(TestCase):
+    PLACEMARK = """<Placemark><name>{name}</name><description><![CDATA[{description}]]></description>
+<Point><coordinates>{lon},{lat},0</coordinates></Point></Placemark>"""
+
+    def write_kml(self, directory, filename, placemarks):
+        path = os.path.join(directory, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<kml xmlns="http://www.opengis.net/kml/2.2"><Document><Folder>')
+            f.write(''.join(self.PLACEMARK.format(**placemark) for placemark in placemarks))
+            f.write('</Folder></Document></kml>')
+        return path
+
+    def test_parse_and_import(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = self.write_kml(tmp, 'a.kml', [
+                {'name': 'S-001', 'description': 'CODIGO: 1<br>RED SEMAFORICA: AV. AREQUIPA &amp; JR. HUSARES<br>', 'lat': -12.1, 'lon': -77.03},
+                {'name': ' S-002 ', 'description': '', 'lat': -12.2, 'lon': -77.04},
+                {'name': '', 'description': 'RED SEMAFORICA: <b></b>', 'lat': -12.3, 'lon': -77.05},
+                {'name': 'BAD', 'description': '', 'lat': 'x', 'lon': 'y'},
+            ])
+            second = self.write_kml(tmp, 'b.kml', [
+                {'name': 'S-001', 'description': 'RED SEMAFORICA: AV. AREQUIPA &amp; JR. HUSARES', 'lat': -12.1, 'lon': -77.03},
+                {'name': 'S-004', 'description': '', 'lat': -12.4, 'lon': -77.06},
+            ])
+
+            out = io.StringIO()
+            call_command('import_kml', first, second, batch_size=2, stdout=out)
+            self.assertEqual(
+                sorted(Intersection.objects.values_list('name', 'latitude', 'longitude')),
+                [('AV. AREQUIPA & JR. HUSARES', -12.1, -77.03), ('S-002', -12.2, -77.04), ('S-004', -12.4, -77.06), ('Unnamed', -12.3, -77.05)],
+            )
+            self.assertIn('4 intersections inserted. (파싱 5개', out.getvalue())
+
+            # 같은 파일을 다시 가져오면 새로 만들지 않고, dry-run은 DB에 쓰지 않는다
+            call_command('import_kml', first, stdout=io.StringIO())
+            self.assertEqual(Intersection.objects.count(), 4)
+            out = io.StringIO()
+            call_command('import_kml', self.write_kml(tmp, 'c.kml', [
+                {'name': 'S-005', 'description': '', 'lat': -12.5, 'lon': -77.07},
+            ]), dry_run=True, stdout=out)
+            self.assertIn('[dry-run] 1 intersections inserted.', out.getvalue())
+            self.assertEqual(Intersection.objects.count(), 4)
+
+            with open(os.path.join(tmp, 'broken.kml'), 'w') as f:
+                f.write('<kml><Placemark>')
+            with self.assertRaises(CommandError):
+                call_command('import_kml', f.name, stdout=io.StringIO())
+
+
+class IntersectionMatcherTests(TestCase):
+    def setUp(self):
+        self.index = IntersectionIndex([
+            (1, 'AV. JAVIER PRADO ESTE - AV. AREQUIPA'),
+            (2, 'AV. AREQUIPA - JR. HUSARES DE JUNIN'),
+            (3, 'AV. GRAL. GARZON - JR. HUSARES DE JUNIN'),
+            (4, 'AV. BOLIVAR - AV. GRAL. CORDOVA Distrito: PUEBLO LIBRE'),
+        ])
+
+    def test_exact_and_reversed(self):
+        self.assertEqual(self.index.match('AV. JAVIER PRADO ESTE - AV. AREQUIPA'), 1)
+        self.assertEqual(self.index.match('Av. Arequipa - Av. Javier Prado Este'), 1)
+
+    def test_accents_prefixes_and_metadata(self):
+        self.assertEqual(self.index.match('Jr. Húsares de Junín - Av. Gral. Garzón'), 3)
+        self.assertEqual(self.index.match('AV. BOLIVAR - AV. GRAL. CORDOVA'), 4)
+
+    def test_fuzzy_tokens(self):
+        self.assertEqual(self.index.match('AV. AREQIPA - JR. HUSARES DE JUNIN'), 2)
+        self.assertIsNone(self.index.match('AV. AREQIPA - JR. HUSARES DE JUNIN', fuzzy=False))
+
+    def test_no_match(self):
+        self.assertIsNone(self.index.match('AV. BRASIL - AV. AREQUIPA'))
+        self.assertIsNone(self.index.match('AV. AREQUIPA'))
+
+
+class IntersectionNameMergeTests(CacheResetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.keep = Intersection.objects.create(name='AV. AREQUIPA - JR. HUSARES Distrito: LINCE', latitude=-12.1, longitude=-77.03)
+        self.dup = Intersection.objects.create(name='Av. Arequipa  /  Jr. Husares', latitude=-12.1001, longitude=-77.03)
+        self.single = Intersection.objects.create(name='AV. BRASIL', latitude=-12.2, longitude=-77.04)
+        volumes = [
+            (self.keep, START, 'NS', 10), (self.keep, START, 'SN', 20),
+            (self.dup, START, 'NS', 99),  # 남는 교차로와 같은 슬롯: 남는 쪽 값 유지
+            (self.dup, START + SLOT, 'NS', 7),
+        ]
+        TrafficVolume.objects.bulk_create([
+            TrafficVolume(intersection=intersection, datetime=slot, direction=direction, volume=volume)
+            for intersection, slot, direction, volume in volumes
+        ])
+        # 원본 보존 기간이 지난 롤업: 충돌하면 합산
+        old = START - timedelta(days=60)
+        HourlyTrafficVolume.objects.bulk_create([
+            HourlyTrafficVolume(intersection=self.keep, datetime=old, direction='NS', volume=40, samples=4),
+            HourlyTrafficVolume(intersection=self.dup, datetime=old, direction='NS', volume=30, samples=3),
+        ])
+        recompute_total_volumes([(None, None, None)])
+        self.incident = make_incident(1, self.dup)
+
+    def test_dry_run_plans_only(self):
+        result = normalize_intersection_names(two_road_name, dry_run=True, merge_duplicates=True)
+        self.assertEqual(result['deletes'], [(self.single.pk, 'AV. BRASIL')])
+        self.assertEqual(result['merges'], [(self.keep.pk, [self.dup.pk], 'AV. AREQUIPA - JR. HUSARES')])
+        self.assertEqual(Intersection.objects.count(), 3)
+
+    def test_merge_moves_rows_and_recomputes(self):
+        result = normalize_intersection_names(two_road_name, merge_duplicates=True)
+        stats = result['merge_stats']
+        self.assertEqual(stats['merged'], 1)
+        self.assertEqual(stats['dropped']['TrafficVolume'], 1)
+        self.assertEqual(stats['moved']['TrafficVolume'], 1)
+        self.assertEqual(stats['incidents'], 1)
+
+        self.assertEqual(list(Intersection.objects.values_list('pk', 'name')), [(self.keep.pk, 'AV. AREQUIPA - JR. HUSARES')])
+        self.assertEqual(
+            sorted(TrafficVolume.objects.values_list('datetime', 'direction', 'volume')),
+            [(START, 'NS', 10), (START, 'SN', 20), (START + SLOT, 'NS', 7)],
+        )
+        self.assertEqual(
+            list(TotalTrafficVolume.objects.order_by('datetime').values_list('intersection_id', 'datetime', 'total_volume')),
+            [(self.keep.pk, START, 30), (self.keep.pk, START + SLOT, 7)],
+        )
+        old = HourlyTrafficVolume.objects.get(datetime=START - timedelta(days=60))
+        self.assertEqual((old.intersection_id, old.volume, old.samples), (self.keep.pk, 70, 7))
+        self.assertEqual(
+            sorted(HourlyTrafficVolume.objects.filter(datetime=START).values_list('direction', 'volume', 'samples')),
+            [('NS', 17, 2), ('SN', 20, 1)],
+        )
+        self.assertEqual(Incident.objects.get(pk=self.incident.pk).intersection_id, self.keep.pk)
+        snapshot = LatestTrafficSnapshot.objects.get(pk=self.keep.pk)
+        self.assertEqual((snapshot.datetime, snapshot.total_volume), (START + SLOT, 7))
+
+
+class BaselineTests(CacheResetMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.ids = seed_intersections(2, prefix='TEST')
+        bulk_insert(TrafficVolume, iter_seasonal_traffic_volumes(self.ids, 21, start=START, seed=3))
+        recompute_total_volumes([(None, None, None)])
+
+    def test_update_and_score(self):
+        stats = update_baselines(full_windows(weeks=3), weeks=3)
+        self.assertEqual(stats['intersections'], 2)
+        self.assertEqual(TrafficBaseline.objects.count(), 2)
+
+        store = build_baseline_store(baseline_fingerprint())
+        last = TotalTrafficVolume.objects.order_by('-datetime').values_list('datetime', flat=True)[0]
+        spiked = TotalTrafficVolume.objects.get(intersection_id=self.ids[0], datetime=last)
+        spiked.total_volume *= 10
+        spiked.save()
+
+        anomalies, scored = find_anomalies([last], 3.5, store=store)
+        self.assertEqual(scored, 2)
+        self.assertEqual(anomalies[0]['intersection_id'], self.ids[0])
+        self.assertGreater(anomalies[0]['z_score'], 3.5)
+
+    def test_incremental_update_matches_full(self):
+        update_baselines(full_windows(weeks=3), weeks=3)
+        before = {b.intersection_id: bytes(b.median) for b in TrafficBaseline.objects.all()}
+        update_baselines(full_windows(weeks=3), weeks=3)
+        after = {b.intersection_id: bytes(b.median) for b in TrafficBaseline.objects.all()}
+        self.assertEqual(before, after)
+
+    def test_baseline_endpoint(self):
+        update_baselines(full_windows(weeks=3), weeks=3)
+        response = APIClient().get(f'/api/intersections/{self.ids[0]}/baseline/?weekday=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['days']), 1)
+        self.assertEqual(len(response.data['days'][0]['median']), 96)
+        self.assertEqual(APIClient().get(f'/api/intersections/{self.ids[0]}/baseline/?weekday=8').status_code, 400)
+
+
+class ForecastTests(TestCase):
+    def test_seasonal_methods_on_periodic_history(self):
+        pattern = np.stack([daily_profile(i) * 100 for i in range(3)])
+        history = np.tile(pattern, 14)
+        np.testing.assert_allclose(seasonal_naive(history, 8), pattern[:, :8])
+        np.testing.assert_allclose(ewm(history, 8), pattern[:, :8], rtol=1e-6)
+
+    def test_methods_handle_gaps(self):
+        history = np.tile(np.stack([daily_profile(i) * 50 for i in range(4)]), 10)
+        history[:, -30:-20] = np.nan
+        history[0, :DAY_SLOTS] = np.nan
+        for method in METHODS:
+            predictions = predict(history, 12, method)
+            self.assertEqual(predictions.shape, (4, 12))
+            self.assertTrue(np.isfinite(predictions).all(), method)
+            self.assertTrue((predictions >= 0).all(), method)
+
+    def test_backtest_reports_errors(self):
+        history = np.tile(np.stack([daily_profile(i) * 50 for i in range(4)]), 14)
+        results = backtest(history, 8, origins=3)
+        self.assertEqual(set(results), set(METHODS))
+        self.assertEqual(results['seasonal_naive']['origins'], 3)
+        # 주기가 정확한 이력이므로 오차는 정수 반올림분뿐
+        self.assertLessEqual(results['seasonal_naive']['mae'], 0.5)
+
+    def test_write_forecasts_are_simulated_and_not_aggregated(self):
+        ids = seed_intersections(2, prefix='TEST')
+        bulk_insert(TrafficVolume, iter_seasonal_traffic_volumes(ids, 8, start=START, seed=5))
+        origin = START + timedelta(days=8) - SLOT
+
+        stats = write_forecasts(horizon=4, days=8)
+        self.assertEqual(stats['origin'], origin)
+        self.assertEqual(stats['rows'], 2 * 4 * 4)
+        forecasts = TrafficVolume.objects.filter(is_simulated=True)
+        self.assertEqual(forecasts.count(), 2 * 4 * 4)
+        self.assertFalse(forecasts.filter(datetime__lte=origin).exists())
+
+        # 다시 실행하면 기존 예측을 교체
+        stats = write_forecasts(horizon=2, days=8)
+        self.assertEqual(stats['deleted'], 2 * 4 * 4)
+        self.assertEqual(forecasts.count(), 2 * 2 * 4)
+
+        recompute_total_volumes([(None, None, None)])
+        self.assertEqual(TotalTrafficVolume.objects.latest('datetime').datetime, origin)
+
+        origin_live, rows = forecast_intersection(ids[0], horizon=3, days=8)
+        self.assertEqual(origin_live, origin)
+        self.assertEqual(len(rows), 3 * 4)
+        self.assertEqual(min(row['datetime'] for row in rows), origin + SLOT)
+
+
+class LatestVolumeETagTests(CacheResetMixin, TestCase):
+    url = '/api/intersections/latest_volume/'
+
+    def setUp(self):
+        super().setUp()
+        self.ids = seed_intersections(3, prefix='TEST')
+        bulk_insert(TrafficVolume, iter_traffic_volumes(self.ids, 24, start=START))
+        recompute_total_volumes([(None, None, None)])
+        self.client = APIClient()
+
+    def test_etag_and_not_modified(self):
+        self.assertEqual(LatestTrafficSnapshot.objects.count(), 3)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_changes_after_aggregation(self):
+        etag = self.client.get(self.url)['ETag']
+        TrafficVolume.objects.filter(intersection_id=self.ids[0]).update(volume=0)
+        recompute_total_volumes([(self.ids[0], None, None)])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        row = next(row for row in response.json() if row['id'] == self.ids[0])
+        self.assertEqual(row['total_volume'], 0)
+
+    def test_cached_payload_follows_writes_from_other_processes(self):
+        # 다른 프로세스(집계 명령)의 갱신은 이 프로세스의 캐시를 지우지 못하므로 테이블 버전으로 감지한다
+        etag = self.client.get(self.url)['ETag']
+        # 캐시 적중 시 버전 확인(MAX(updated_at), COUNT)만 실행
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        LatestTrafficSnapshot.objects.filter(intersection_id=self.ids[0]).update(
+            total_volume=7, updated_at=timezone.now(),
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        row = next(row for row in response.json() if row['id'] == self.ids[0])
+        self.assertEqual(row['total_volume'], 7)
+
+        LatestTrafficSnapshot.objects.filter(intersection_id=self.ids[1]).delete()
+        self.assertEqual(len(self.client.get(self.url).json()), 2)
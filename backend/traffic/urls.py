@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import IntersectionViewSet, TrafficVolumeViewSet, get_intersection_traffic_data, get_all_intersections_traffic_data, IncidentViewSet
+from .views import IntersectionViewSet, TrafficVolumeViewSet, get_intersection_traffic_data, get_all_intersections_traffic_data, get_batch_traffic_data, export_traffic_data, get_traffic_anomalies, traffic_stream, IncidentViewSet
 
 router = DefaultRouter()
 router.register(r'intersections', IntersectionViewSet)
@@ -12,4 +12,9 @@ urlpatterns = [
     # 교차로 교통 데이터 API             
     path('traffic-data/intersection/<int:intersection_id>/', get_intersection_traffic_data, name='get_intersection_traffic_data'),
     path('traffic-data/intersections/', get_all_intersections_traffic_data, name='get_all_intersections_traffic_data'),
+    path('traffic-data/batch/', get_batch_traffic_data, name='get_batch_traffic_data'),
+    path('traffic-data/export/', export_traffic_data, name='export_traffic_data'),
+    path('traffic-data/anomalies/', get_traffic_anomalies, name='get_traffic_anomalies'),
+    # 실시간 스트림 (SSE, ASGI 전용)
+    path('stream/', traffic_stream, name='traffic_stream'),
 ] 
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""TrafficVolume → TotalTrafficVolume 15분 슬롯 집계 (DB GROUP BY 기반)"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, Min, OuterRef, Q, Sum
+from django.db.models.functions import ExtractMinute, Floor, TruncHour
+
+from traffic.models import ProcessingCheckpoint, TotalTrafficVolume, TrafficVolume
+from traffic.signals import traffic_slots_updated
+from traffic.utils.bulk import bulk_upsert, chunked
+from traffic.utils.congestion import SpeedEstimator
+from traffic.utils.retention import RETENTION_CHECKPOINT
+
+SLOT_MINUTES = 15
+SLOT = timedelta(minutes=SLOT_MINUTES)
+
+
+def floor_to_slot(dt):
+    """datetime을 해당 15분 슬롯의 시작 시각으로 내림"""
+    return dt.replace(minute=(dt.minute // SLOT_MINUTES) * SLOT_MINUTES, second=0, microsecond=0)
+
+
+def window_q(windows):
+    """(intersection_id, start, end) 목록을 슬롯 경계로 맞춘 Q 조건으로 변환
+
+    intersection_id/start/end가 None이면 해당 조건을 걸지 않는다.
+    end가 속한 슬롯까지 포함한다.
+    """
+    q = Q()
+    for intersection_id, start, end in windows:
+        cond = Q()
+        if intersection_id is not None:
+            cond &= Q(intersection_id=intersection_id)
+        if start is not None:
+            cond &= Q(datetime__gte=floor_to_slot(start))
+        if end is not None:
+            cond &= Q(datetime__lt=floor_to_slot(end) + SLOT)
+        if not cond:
+            return Q()
+        q |= cond
+    return q
+
+
+def aggregate_slots(volume_qs):
+    """TrafficVolume queryset을 DB에서 (교차로, 15분 슬롯) 단위로 합산
+
+    15분 단위 truncate 함수가 DB마다 달라 TruncHour + FLOOR(분 / 15)로 그룹핑한 뒤
+    슬롯 시작 시각은 파이썬에서 조합한다.
+    """
+    rows = volume_qs.annotate(
+        slot_hour=TruncHour('datetime'),
+        slot_quarter=Floor(ExtractMinute('datetime') / SLOT_MINUTES),
+    ).values('intersection_id', 'slot_hour', 'slot_quarter').annotate(
+        total_volume=Sum('volume'),
+    ).order_by()
+
+    for row in rows.iterator(chunk_size=5000):
+        yield (
+            row['intersection_id'],
+            row['slot_hour'] + timedelta(minutes=SLOT_MINUTES * int(row['slot_quarter'])),
+            row['total_volume'],
+        )
+
+
+def recompute_total_volumes(windows, batch_size=5000, chunk_windows=500):
+    """지정한 윈도우의 TotalTrafficVolume을 재계산해 upsert
+
+    기존 행을 먼저 지우지 않고 한 트랜잭션 안에서 upsert 후, 윈도우 안에서
+    더 이상 원본 데이터가 없는 슬롯만 삭제하므로 조회 측에서 빈 구간이 보이지 않는다.
+    보존 정책(manage_traffic_retention)으로 원본이 만료된 구간의 합계는 이력으로 남긴다.
+    """
+    stats = {'upserted': 0, 'deleted': 0, 'intersection_ids': set(), 'slot_min': None, 'slot_max': None}
+
+    def track(intersection_id, slot_start):
+        stats['intersection_ids'].add(intersection_id)
+        if stats['slot_min'] is None or slot_start < stats['slot_min']:
+            stats['slot_min'] = slot_start
+        if stats['slot_max'] is None or slot_start > stats['slot_max']:
+            stats['slot_max'] = slot_start
+
+    estimator = SpeedEstimator()
+    expired_before = ProcessingCheckpoint.objects.filter(
+        name=RETENTION_CHECKPOINT,
+    ).values_list('watermark', flat=True).first()
+
+    def build_objects(q):
+        # 평균 속도는 배치 단위로 교차로별 모델을 벡터 연산으로 계산 (예측값 is_simulated는 제외)
+        for batch in chunked(aggregate_slots(TrafficVolume.objects.filter(q, is_simulated=False)), batch_size):
+            intersection_ids, slot_starts, total_volumes = zip(*batch)
+            speeds = estimator(intersection_ids, total_volumes).tolist()
+            for intersection_id, slot_start, total_volume, speed in zip(intersection_ids, slot_starts, total_volumes, speeds):
+                track(intersection_id, slot_start)
+                yield TotalTrafficVolume(
+                    intersection_id=intersection_id,
+                    datetime=slot_start,
+                    total_volume=total_volume,
+                    average_speed=speed,
+                )
+
+    with transaction.atomic():
+        for window_chunk in chunked(windows, chunk_windows):
+            q = window_q(window_chunk)
+            stats['upserted'] += bulk_upsert(
+                TotalTrafficVolume, build_objects(q),
+                unique_fields=['intersection', 'datetime'],
+                update_fields=['total_volume', 'average_speed'],
+                batch_size=batch_size,
+            )
+            # 원본 TrafficVolume이 사라진 슬롯 정리 (집합 연산으로 처리)
+            has_source = TrafficVolume.objects.filter(
+                is_simulated=False,
+                intersection_id=OuterRef('intersection_id'),
+                datetime__gte=OuterRef('datetime'),
+                datetime__lt=OuterRef('datetime') + SLOT,
+            )
+            stale = TotalTrafficVolume.objects.filter(q).filter(~Exists(has_source))
+            if expired_before is not None:
+                stale = stale.filter(datetime__gte=expired_before)
+            for row in stale.values('intersection_id').annotate(first=Min('datetime'), last=Max('datetime')).order_by():
+                track(row['intersection_id'], row['first'])
+                track(row['intersection_id'], row['last'])
+            stats['deleted'] += stale.delete()[0]
+
+    if stats['intersection_ids']:
+        traffic_slots_updated.send(
+            sender=TotalTrafficVolume,
+            intersection_ids=stats['intersection_ids'],
+            slot_min=stats['slot_min'],
+            slot_max=stats['slot_max'],
+        )
+    return stats
+
+
+def lagged_watermark(started_at):
+    """증분 작업이 다음 실행을 위해 저장할 watermark (실행 시작 시각 - TRAFFIC_WATERMARK_LAG초)
+
+    updated_at은 커밋 전에 찍히므로, 실행 중에 started_at 이전 시각으로 늦게 커밋된 행을
+    놓치지 않도록 겹치는 구간을 다음 실행에서 다시 처리한다 (재계산은 멱등).
+    """
+    return started_at - timedelta(seconds=getattr(settings, 'TRAFFIC_WATERMARK_LAG', 300))
+
+
+def touched_windows(watermark, until=None):
+    """watermark 이후 수정된 실제 관측 TrafficVolume이 속한 교차로별 (최소, 최대) 시간 범위"""
+    qs = TrafficVolume.objects.filter(updated_at__gt=watermark, is_simulated=False)
+    if until is not None:
+        qs = qs.filter(updated_at__lte=until)
+    return [
+        (row['intersection_id'], row['first'], row['last'])
+        for row in qs.values('intersection_id').annotate(
+            first=Min('datetime'), last=Max('datetime')
+        ).order_by()
+    ]
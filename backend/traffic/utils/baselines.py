@@ -0,0 +1,275 @@
+"""요일×15분 슬롯 교통량 기준선(중앙값/MAD)과 이상치 점수
+
+- 교차로마다 최근 weeks주의 슬롯 관측값을 uint16 링 버퍼 (weeks, 7, 96)로 보관한다.
+  새 주의 값은 (주 번호 % weeks) 행을 덮어쓰므로 저장 크기는 교차로당 고정이다.
+- 중앙값/MAD는 갱신할 때 교차로 묶음 단위로 한 번에 계산해 함께 저장한다.
+- 점수는 robust z = (x - median) / (1.4826 × MAD)이며, 조회 측은 모든 교차로의
+  median/MAD를 (교차로 수, 7, 96) 배열로 메모리에 두고 한 번의 배열 연산으로 계산한다.
+요일/슬롯은 현지 시각(TIME_ZONE) 기준, 주 번호는 월요일 시작이다.
+"""
+import threading
+import time
+import warnings
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from traffic.models import TotalTrafficVolume, TrafficBaseline
+from traffic.utils.aggregation import SLOT, SLOT_MINUTES, window_q
+from traffic.utils.bulk import bulk_upsert, chunked
+
+BASELINE_CHECKPOINT = 'traffic_baselines'
+DEFAULT_WEEKS = 8
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+MISSING = np.iinfo(np.uint16).max
+# 정규분포에서 MAD를 표준편차로 환산하는 계수, MAD가 0인 슬롯은 MIN_MAD를 쓴다
+MAD_SCALE = 1.4826
+MIN_MAD = 1.0
+# 관측이 이보다 적은 슬롯은 점수를 매기지 않는다
+MIN_SAMPLES = 3
+BASELINE_UPDATE_FIELDS = ['weeks', 'ring', 'ring_weeks', 'median', 'mad', 'samples', 'updated_at']
+
+
+def slot_coordinates(datetimes):
+    """datetime 목록 → (주 번호, 요일 0=월, 하루 중 슬롯 번호) 배열 (현지 시각 기준, 벡터 연산)"""
+    index = pd.DatetimeIndex(pd.to_datetime(list(datetimes), utc=True)).tz_convert(timezone.get_current_timezone_name())
+    days = (index.normalize().tz_localize(None) - pd.Timestamp('1970-01-05')).days.to_numpy()  # 1970-01-05: 월요일
+    slots = (index.hour.to_numpy() * 60 + index.minute.to_numpy()) // SLOT_MINUTES
+    return days // 7, index.dayofweek.to_numpy(), slots
+
+
+def empty_ring(weeks):
+    return np.full((weeks, 7, SLOTS_PER_DAY), MISSING, dtype=np.uint16), np.full(weeks, -1, dtype=np.int32)
+
+
+def decode_ring(baseline):
+    ring = np.frombuffer(bytes(baseline.ring), dtype=np.uint16).reshape(baseline.weeks, 7, SLOTS_PER_DAY).copy()
+    return ring, np.frombuffer(bytes(baseline.ring_weeks), dtype=np.int32).copy()
+
+
+def apply_observations(ring, ring_weeks, weeks_no, weekdays, slots, volumes):
+    """관측값을 링 버퍼에 기록 (가장 최근 weeks주만 유지, 더 오래된 행은 비움)"""
+    size = len(ring_weeks)
+    newest = max(int(ring_weeks.max()), int(weeks_no.max()) if len(weeks_no) else -1)
+    keep = weeks_no > newest - size
+    weeks_no, weekdays, slots = weeks_no[keep], weekdays[keep], slots[keep]
+    volumes = np.clip(volumes[keep], 0, MISSING - 1).astype(np.uint16)
+
+    stale = ring_weeks <= newest - size
+    ring[stale] = MISSING
+    ring_weeks[stale] = -1
+    positions = weeks_no % size
+    for week in np.unique(weeks_no).tolist():
+        position = week % size
+        if ring_weeks[position] != week:
+            ring[position] = MISSING
+            ring_weeks[position] = week
+    ring[positions, weekdays, slots] = volumes
+
+
+def ring_statistics(rings):
+    """링 버퍼 묶음 (n, weeks, 7, 96) → median, mad (float32), samples (uint8), 각각 (n, 7, 96)"""
+    values = np.where(rings == MISSING, np.nan, rings.astype(np.float32))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # 관측이 없는 슬롯 (All-NaN slice)
+        median = np.nanmedian(values, axis=1)
+        mad = np.nanmedian(np.abs(values - median[:, None]), axis=1)
+    samples = (rings != MISSING).sum(axis=1).astype(np.uint8)
+    return median.astype(np.float32), mad.astype(np.float32), samples
+
+
+def full_windows(weeks=DEFAULT_WEEKS):
+    """전체 재구성용 windows: 교통량이 있는 모든 교차로의 마지막 슬롯 기준 최근 weeks주"""
+    latest = TotalTrafficVolume.objects.aggregate(latest=Max('datetime'))['latest']
+    if latest is None:
+        return []
+    start = latest - timedelta(weeks=weeks)
+    ids = TotalTrafficVolume.objects.filter(datetime__gt=start).values_list('intersection_id', flat=True).distinct()
+    return [(intersection_id, start + SLOT, latest) for intersection_id in ids.order_by()]
+
+
+def update_baselines(windows, weeks=DEFAULT_WEEKS, chunk_intersections=200, batch_size=500):
+    """windows [(intersection_id, start, end)]의 TotalTrafficVolume 슬롯을 기준선에 반영
+
+    교차로 묶음마다 슬롯 쿼리 1회, 통계 계산은 묶음 전체를 한 번에 한다. 반환: {'intersections', 'slots'}
+    """
+    stats = {'intersections': 0, 'slots': 0}
+    with transaction.atomic():
+        for chunk in chunked(sorted(windows, key=lambda w: w[0]), chunk_intersections):
+            ids = [w[0] for w in chunk]
+            existing = {b.intersection_id: b for b in TrafficBaseline.objects.filter(intersection_id__in=ids)}
+            rings = {}
+            for intersection_id in ids:
+                baseline = existing.get(intersection_id)
+                rings[intersection_id] = (
+                    decode_ring(baseline) if baseline is not None and baseline.weeks == weeks else empty_ring(weeks)
+                )
+
+            rows = list(TotalTrafficVolume.objects.filter(window_q(chunk)).order_by('intersection_id').values_list(
+                'intersection_id', 'datetime', 'total_volume',
+            ))
+            if rows:
+                row_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+                weeks_no, weekdays, slots = slot_coordinates(row[1] for row in rows)
+                volumes = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+                bounds = np.flatnonzero(np.diff(row_ids)) + 1
+                for part in np.split(np.arange(len(rows)), bounds):
+                    ring, ring_weeks = rings[int(row_ids[part[0]])]
+                    apply_observations(ring, ring_weeks, weeks_no[part], weekdays[part], slots[part], volumes[part])
+                stats['slots'] += len(rows)
+
+            medians, mads, samples = ring_statistics(np.stack([rings[i][0] for i in ids]))
+            objs = [
+                TrafficBaseline(
+                    intersection_id=intersection_id,
+                    weeks=weeks,
+                    ring=rings[intersection_id][0].tobytes(),
+                    ring_weeks=rings[intersection_id][1].tobytes(),
+                    median=medians[i].tobytes(),
+                    mad=mads[i].tobytes(),
+                    samples=samples[i].tobytes(),
+                )
+                for i, intersection_id in enumerate(ids)
+            ]
+            stats['intersections'] += bulk_upsert(
+                TrafficBaseline, objs,
+                unique_fields=['intersection'],
+                update_fields=BASELINE_UPDATE_FIELDS,
+                batch_size=batch_size,
+            )
+    return stats
+
+
+class BaselineStore:
+    """모든 교차로의 median/MAD/관측 수를 (교차로 수, 7, 96) 배열로 들고 있는 조회용 저장소"""
+
+    def __init__(self, ids, medians, mads, samples, fingerprint=None):
+        order = np.argsort(ids)
+        self.ids = np.asarray(ids, dtype=np.int64)[order]
+        self.medians = medians[order]
+        self.mads = mads[order]
+        self.samples = samples[order]
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.ids)
+
+    def lookup(self, intersection_ids):
+        """교차로 id 배열 → 저장소 행 번호 배열 (기준선이 없으면 -1)"""
+        intersection_ids = np.asarray(intersection_ids, dtype=np.int64)
+        if not len(self.ids):
+            return np.full(len(intersection_ids), -1)
+        rows = np.minimum(np.searchsorted(self.ids, intersection_ids), len(self.ids) - 1)
+        return np.where(self.ids[rows] == intersection_ids, rows, -1)
+
+    def score(self, intersection_ids, datetimes, volumes):
+        """슬롯별 (robust z, 기준 중앙값) 배열, 기준선이 없거나 관측이 부족하면 NaN"""
+        rows = self.lookup(intersection_ids)
+        _, weekdays, slots = slot_coordinates(datetimes)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        z = np.full(len(rows), np.nan)
+        median = np.full(len(rows), np.nan)
+        has = rows >= 0
+        if has.any():
+            r, d, s = rows[has], weekdays[has], slots[has]
+            med = self.medians[r, d, s].astype(np.float64)
+            spread = np.maximum(self.mads[r, d, s].astype(np.float64), MIN_MAD) * MAD_SCALE
+            enough = self.samples[r, d, s] >= MIN_SAMPLES
+            z[has] = np.where(enough, (volumes[has] - med) / spread, np.nan)
+            median[has] = np.where(enough, med, np.nan)
+        return z, median
+
+
+_state = {'store': None, 'checked': 0.0}
+_lock = threading.Lock()
+
+
+def baseline_fingerprint():
+    stats = TrafficBaseline.objects.aggregate(count=Count('intersection'), updated=Max('updated_at'))
+    return stats['count'], stats['updated']
+
+
+def build_baseline_store(fingerprint=None):
+    rows = list(TrafficBaseline.objects.values_list('intersection_id', 'median', 'mad', 'samples'))
+    shape = (len(rows), 7, SLOTS_PER_DAY)
+
+    def stack(column, dtype):
+        return np.frombuffer(b''.join(bytes(row[column]) for row in rows), dtype=dtype).reshape(shape)
+
+    return BaselineStore(
+        [row[0] for row in rows], stack(1, np.float32), stack(2, np.float32), stack(3, np.uint8), fingerprint,
+    )
+
+
+def get_baseline_store():
+    """프로세스 공유 기준선 저장소 (TRAFFIC_BASELINE_CHECK_INTERVAL초마다 변경 여부 확인)"""
+    interval = getattr(settings, 'TRAFFIC_BASELINE_CHECK_INTERVAL', 30)
+    now = time.monotonic()
+    store = _state['store']
+    if store is not None and now - _state['checked'] < interval:
+        return store
+
+    with _lock:
+        store = _state['store']
+        if store is not None and now - _state['checked'] < interval:
+            return store
+        fingerprint = baseline_fingerprint()
+        if store is None or store.fingerprint != fingerprint:
+            store = build_baseline_store(fingerprint)
+            _state['store'] = store
+        _state['checked'] = now
+        return store
+
+
+def invalidate_baseline_store():
+    _state['store'] = None
+
+
+def find_anomalies(slots, threshold, intersection_ids=None, store=None):
+    """slots 시각들의 TotalTrafficVolume을 기준선으로 점수 매겨 |z| >= threshold인 슬롯 목록 (|z| 내림차순)"""
+    store = store or get_baseline_store()
+    queryset = TotalTrafficVolume.objects.filter(datetime__in=slots)
+    if intersection_ids:
+        queryset = queryset.filter(intersection_id__in=intersection_ids)
+    rows = list(queryset.values_list('intersection_id', 'datetime', 'total_volume', 'average_speed'))
+    if not rows:
+        return [], 0
+    ids, datetimes, volumes, speeds = zip(*rows)
+    z, median = store.score(ids, datetimes, volumes)
+    scored = ~np.isnan(z)
+    hits = np.flatnonzero(scored & (np.abs(np.nan_to_num(z)) >= threshold))
+    hits = hits[np.argsort(-np.abs(z[hits]), kind='stable')]
+    return [
+        {
+            'intersection_id': ids[i],
+            'datetime': timezone.localtime(datetimes[i]),
+            'total_volume': volumes[i],
+            'average_speed': speeds[i],
+            'baseline_volume': round(float(median[i]), 1),
+            'z_score': round(float(z[i]), 2),
+        }
+        for i in hits.tolist()
+    ], int(scored.sum())
+
+
+def baseline_profile(baseline, weekday=None):
+    """TrafficBaseline → 요일별 슬롯 median/mad/samples 목록 (weekday: 0=월, None이면 전체 요일)"""
+    shape = (7, SLOTS_PER_DAY)
+    median = np.frombuffer(bytes(baseline.median), dtype=np.float32).reshape(shape)
+    mad = np.frombuffer(bytes(baseline.mad), dtype=np.float32).reshape(shape)
+    samples = np.frombuffer(bytes(baseline.samples), dtype=np.uint8).reshape(shape)
+    days = range(7) if weekday is None else (weekday,)
+    return [
+        {
+            'weekday': day + 1,
+            'median': [None if np.isnan(v) else round(float(v), 1) for v in median[day]],
+            'mad': [None if np.isnan(v) else round(float(v), 1) for v in mad[day]],
+            'samples': samples[day].tolist(),
+        }
+        for day in days
+    ]
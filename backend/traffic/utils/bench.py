@@ -0,0 +1,191 @@
+"""벤치마크 명령어에서 공통으로 사용하는 합성 데이터 생성 및 측정 헬퍼"""
+import math
+import random
+import statistics
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from traffic.models import Incident, Intersection, TotalTrafficVolume, TrafficVolume
+
+# 리마 도심 중심 좌표
+LIMA_CENTER = (-12.0464, -77.0428)
+GRID_STEP = 0.002
+DIRECTIONS = [code for code, _ in TrafficVolume.DIRECTION_CHOICES]
+BENCH_PREFIX = 'BENCH'
+
+
+def seed_intersections(count, prefix=BENCH_PREFIX, batch_size=2000):
+    """리마 중심 격자 위에 교차로를 생성하고 생성된 id 목록을 반환"""
+    side = math.ceil(math.sqrt(count))
+    objs = []
+    for i in range(count):
+        row, col = divmod(i, side)
+        objs.append(Intersection(
+            name=f'{prefix} AV. {row:03d} - JR. {col:03d}',
+            latitude=LIMA_CENTER[0] + (row - side / 2) * GRID_STEP,
+            longitude=LIMA_CENTER[1] + (col - side / 2) * GRID_STEP,
+        ))
+    Intersection.objects.bulk_create(objs, batch_size=batch_size)
+    return list(
+        Intersection.objects.filter(name__startswith=prefix).order_by('id').values_list('id', flat=True)
+    )
+
+
+def iter_traffic_volumes(intersection_ids, rows, start=None, seed=0):
+    """교차로별로 15분 간격, 4방향 순환하는 TrafficVolume 객체를 rows개 생성"""
+    rng = random.Random(seed)
+    start = start or timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=30)
+    per_intersection = max(1, rows // len(intersection_ids))
+    produced = 0
+    for intersection_id in intersection_ids:
+        for j in range(per_intersection):
+            if produced >= rows:
+                return
+            slot, direction = divmod(j, len(DIRECTIONS))
+            yield TrafficVolume(
+                intersection_id=intersection_id,
+                datetime=start + timedelta(minutes=15 * slot),
+                direction=DIRECTIONS[direction],
+                volume=rng.randint(0, 400),
+            )
+            produced += 1
+
+
+def daily_profile(direction_index, slots_per_day=96):
+    """방향별 하루 교통량 형태 (오전/오후 출퇴근 정점, 방향마다 정점 비중이 다름), 평균 1 근처"""
+    hours = np.arange(slots_per_day) * 24 / slots_per_day
+    morning = np.exp(-((hours - 8.0) ** 2) / 2.0)
+    evening = np.exp(-((hours - 18.5) ** 2) / 3.0)
+    night = 0.15 + 0.35 * np.clip(np.sin((hours - 5.0) / 24 * 2 * np.pi), 0, None)
+    weight = (0.8, 0.4, 0.6, 0.6)[direction_index % 4]
+    return night + 1.6 * weight * morning + 1.6 * (1.2 - weight) * evening
+
+
+def iter_seasonal_traffic_volumes(intersection_ids, days, start=None, seed=0, noise=0.1):
+    """교차로×방향별 일/주 계절성(출퇴근 정점, 주말 감소)과 잡음이 있는 15분 TrafficVolume 객체 생성"""
+    rng = np.random.default_rng(seed)
+    start = start or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    slots = days * 96
+    weekday = np.array([(start + timedelta(days=d)).weekday() for d in range(days)]).repeat(96)
+    weekly = np.where(weekday >= 5, 0.7, 1.0)
+    stamps = [start + timedelta(minutes=15 * i) for i in range(slots)]
+    profiles = [np.tile(daily_profile(i), days) * weekly for i in range(len(DIRECTIONS))]
+    for intersection_id in intersection_ids:
+        scale = rng.uniform(20, 200)
+        for i, direction in enumerate(DIRECTIONS):
+            mean = profiles[i] * scale * rng.uniform(0.6, 1.4)
+            volumes = np.maximum(0, rng.normal(mean, mean * noise + 1)).round().astype(int).tolist()
+            for stamp, volume in zip(stamps, volumes):
+                yield TrafficVolume(
+                    intersection_id=intersection_id,
+                    datetime=stamp,
+                    direction=direction,
+                    volume=volume,
+                )
+
+
+def iter_total_volumes(intersection_ids, days, start=None, seed=0):
+    """교차로별로 days일치 15분 슬롯 TotalTrafficVolume 객체 생성"""
+    rng = random.Random(seed)
+    start = start or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    for intersection_id in intersection_ids:
+        for slot in range(days * 96):
+            total_volume = rng.randint(50, 1500)
+            yield TotalTrafficVolume(
+                intersection_id=intersection_id,
+                datetime=start + timedelta(minutes=15 * slot),
+                total_volume=total_volume,
+                average_speed=50.0 if total_volume <= 500 else 35.0,
+            )
+
+
+# 합성 사고 값 후보 (실제 데이터의 유형/상태/구 이름)
+INCIDENT_TYPES = [
+    ('PROBLEMA - CRUCE', ['CRUCE APAGADO', 'SEMAFORO INTERMITENTE', 'LAMPARA QUEMADA', 'ESTRUCTURA DAÑADA']),
+    ('TRABAJOS - PROGRAMADOR', ['SINCRONISMO - CAMPO', 'CORTE PROGRAMADO']),
+    ('TRABAJOS - OPERADOR', ['MONITOREO', 'RECORRIDO GPS']),
+    ('PROBLEMA - PERIFERICOS', ['PERDIDA DE COMUNICACION']),
+]
+INCIDENT_DISTRICTS = [
+    'LIMA', 'CHORRILLOS', 'PUEBLO LIBRE', 'VILLA EL SALVADOR', 'ATE', 'LA VICTORIA', 'RIMAC', 'SAN MIGUEL',
+    'MIRAFLORES', 'SURQUILLO',
+]
+INCIDENT_STATUSES = ['RESUELTO - FINALIZADO', 'RESUELTO - FINALIZADO', 'RESUELTO - FINALIZADO', 'ASIGNADO', 'EN PROCESO']
+
+
+def iter_synthetic_incidents(intersection_ids, count, days, start=None, seed=0, first_ticket=1):
+    """교차로에 무작위로 배정한 사고 count건 생성 (출퇴근 시간대에 몰리고, 처리 완료는 30분~12시간 뒤)"""
+    rng = random.Random(seed)
+    start = start or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    names = dict(Intersection.objects.filter(id__in=intersection_ids).values_list('id', 'name'))
+    hours = list(range(24))
+    hour_weights = [2 if 7 <= h <= 9 or 17 <= h <= 20 else 1 for h in hours]
+    for i in range(count):
+        intersection_id = rng.choice(intersection_ids)
+        incident_type, details = rng.choice(INCIDENT_TYPES)
+        status = rng.choice(INCIDENT_STATUSES)
+        registered_at = start + timedelta(
+            days=rng.randrange(days), hours=rng.choices(hours, hour_weights)[0], minutes=rng.randrange(60),
+        )
+        resolved = status.startswith('RESUELTO')
+        yield Incident(
+            incident_number=first_ticket + i,
+            ticket_number=first_ticket + i,
+            incident_type=incident_type,
+            incident_detail_type=rng.choice(details),
+            location_name=names.get(intersection_id, ''),
+            district=rng.choice(INCIDENT_DISTRICTS),
+            managed_by=rng.choice(['GMU - CENTRALIZADO', 'GMU - NO CENTRALIZADO']),
+            assigned_to='DIESM - CENTRALIZADO',
+            description='합성 데이터',
+            operator=f'operator{rng.randrange(10)}',
+            status=status,
+            registered_at=registered_at,
+            last_status_update=registered_at + timedelta(minutes=rng.randint(30, 720) if resolved else rng.randint(0, 30)),
+            intersection_id=intersection_id,
+        )
+
+
+def bulk_insert(model, objs, batch_size=10000):
+    """이터러블을 batch_size 단위로 bulk_create, 저장 건수 반환"""
+    batch = []
+    count = 0
+    for obj in objs:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            count += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch, batch_size=batch_size)
+        count += len(batch)
+    return count
+
+
+def measure(fn, repeat=5):
+    """fn을 repeat회 실행하여 지연시간(ms)과 1회 실행당 쿼리 수를 측정"""
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = len(ctx.captured_queries)
+    return {
+        'queries': queries,
+        'min_ms': round(min(timings), 2),
+        'p50_ms': round(statistics.median(timings), 2),
+        'max_ms': round(max(timings), 2),
+    }
+
+
+def format_result(label, result):
+    return (f"{label:<24} queries={result['queries']:<6} "
+            f"min={result['min_ms']}ms p50={result['p50_ms']}ms max={result['max_ms']}ms")
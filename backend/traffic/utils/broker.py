@@ -0,0 +1,131 @@
+"""실시간 이벤트 fan-out 브로커 (SSE 구독자용)
+
+publish는 어느 스레드에서 호출해도 되며, 각 구독자의 이벤트 루프로
+call_soon_threadsafe를 통해 전달된다. 구독자 큐는 크기가 제한되어 있어
+느린 클라이언트는 오래된 이벤트부터 버려지고, 너무 많이 밀리면 연결을 끊는다.
+다른 백엔드(예: Redis pub/sub)는 같은 subscribe/unsubscribe/publish 인터페이스로
+구현해 TRAFFIC_BROKER_BACKEND에 지정한다. 기본 설정은 다른 프로세스의 변경을
+DB 폴링으로 받는 traffic.utils.realtime.DatabasePollingBroker이다.
+"""
+import asyncio
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+CHANNELS = ('slots', 'incidents')
+
+
+class Subscription:
+    def __init__(self, loop, channels=CHANNELS, intersection_ids=None, bbox=None, max_queue=100, max_dropped=1000):
+        self.loop = loop
+        self.channels = set(channels)
+        self.intersection_ids = set(intersection_ids) if intersection_ids else None
+        self.bbox = bbox
+        self.max_queue = max_queue
+        self.max_dropped = max_dropped
+        self.queue = deque()
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+
+    def matches(self, channel, event):
+        if channel not in self.channels:
+            return False
+        if self.intersection_ids is not None and event.get('intersection_id') not in self.intersection_ids:
+            return False
+        if self.bbox is not None:
+            lat, lon = event.get('latitude'), event.get('longitude')
+            if lat is None or lon is None:
+                return False
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+            if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                return False
+        return True
+
+    def put(self, channel, event):
+        """구독자 이벤트 루프 스레드에서만 호출"""
+        if self.closed:
+            return
+        if len(self.queue) >= self.max_queue:
+            self.queue.popleft()
+            self.dropped += 1
+            if self.dropped > self.max_dropped:
+                self.closed = True
+        self.queue.append((channel, event))
+        self.ready.set()
+
+    async def get(self, timeout=None):
+        """다음 이벤트 (timeout 동안 없으면 None)"""
+        if not self.queue:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.queue.popleft() if self.queue else None
+
+
+class InProcessBroker:
+    """단일 프로세스(워커) 안에서 publish된 이벤트만 전달하는 브로커"""
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, **filters):
+        options = {
+            'max_queue': getattr(settings, 'TRAFFIC_STREAM_QUEUE_SIZE', 100),
+            'max_dropped': getattr(settings, 'TRAFFIC_STREAM_MAX_DROPPED', 1000),
+        }
+        options.update(filters)
+        subscription = Subscription(asyncio.get_running_loop(), **options)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.closed = True
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def subscriber_count(self):
+        return len(self._subscriptions)
+
+    def publish(self, channel, events):
+        """이벤트 목록을 조건에 맞는 구독자에게 전달, 전달 건수 반환"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        delivered = 0
+        for subscription in subscriptions:
+            matched = [event for event in events if subscription.matches(channel, event)]
+            if not matched:
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(_put_many, subscription, channel, matched)
+            except RuntimeError:
+                # 루프가 이미 닫힌 구독자
+                self.unsubscribe(subscription)
+                continue
+            delivered += len(matched)
+        return delivered
+
+
+def _put_many(subscription, channel, events):
+    for event in events:
+        subscription.put(channel, event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, 'TRAFFIC_BROKER_BACKEND', 'traffic.utils.broker.InProcessBroker')
+                _broker = import_string(backend)()
+    return _broker
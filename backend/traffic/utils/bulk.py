@@ -0,0 +1,31 @@
+from itertools import islice
+
+from django.db import connections, router
+
+
+def chunked(iterable, size):
+    """이터러블을 size 크기의 리스트로 나눠서 반환"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_upsert(model, objs, unique_fields, update_fields, batch_size=1000):
+    """unique_fields가 충돌하면 update_fields만 갱신하는 배치 upsert, 처리 건수 반환
+
+    MySQL은 ON DUPLICATE KEY UPDATE라 충돌 대상 컬럼을 지정할 수 없으므로
+    백엔드가 지원할 때만 unique_fields를 넘긴다.
+    """
+    db = router.db_for_write(model)
+    options = {'update_conflicts': True, 'update_fields': update_fields}
+    if connections[db].features.supports_update_conflicts_with_target:
+        options['unique_fields'] = unique_fields
+
+    count = 0
+    for batch in chunked(objs, batch_size):
+        model.objects.using(db).bulk_create(batch, **options)
+        count += len(batch)
+    return count
@@ -0,0 +1,148 @@
+"""교통량 → 평균 속도 추정 모델 (NumPy 벡터 연산)
+
+모델은 (volumes 배열, **params) → speeds 배열 함수로, register_congestion_model로 등록하거나
+settings.TRAFFIC_CONGESTION_MODELS에 {이름: dotted path}로 추가한다.
+교차로별 모델/파라미터는 CongestionModelConfig에 저장하고, 설정이 없으면
+TRAFFIC_CONGESTION_DEFAULT를 쓴다. volumes는 15분 슬롯 합계(대) 기준이다.
+"""
+import json
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from traffic.models import CongestionModelConfig, TotalTrafficVolume
+from traffic.signals import traffic_slots_updated
+from traffic.utils.bulk import bulk_upsert, chunked
+
+CONGESTION_MODELS = {}
+
+
+def register_congestion_model(name):
+    def decorator(fn):
+        CONGESTION_MODELS[name] = fn
+        return fn
+    return decorator
+
+
+def get_congestion_model(name):
+    if name not in CONGESTION_MODELS:
+        path = getattr(settings, 'TRAFFIC_CONGESTION_MODELS', {}).get(name)
+        if path is None:
+            raise ValueError(f"알 수 없는 속도 모델입니다: {name}")
+        CONGESTION_MODELS[name] = import_string(path)
+    return CONGESTION_MODELS[name]
+
+
+@register_congestion_model('threshold')
+def threshold_speeds(volumes, free_flow_speed=50.0, steps=((1000, 0.5), (500, 0.7))):
+    """구간별 감속: volume이 threshold를 넘으면 free_flow_speed × factor (기본값은 기존 3단계 규칙)"""
+    steps = sorted(steps, reverse=True)
+    factors = np.select([volumes > threshold for threshold, _ in steps], [factor for _, factor in steps], 1.0)
+    return free_flow_speed * factors
+
+
+@register_congestion_model('bpr')
+def bpr_speeds(volumes, free_flow_speed=50.0, capacity=1000.0, alpha=0.15, beta=4.0, min_speed=5.0):
+    """BPR 통행시간 함수 t = t0 × (1 + α(v/c)^β) 를 속도로 환산, capacity는 15분당 용량"""
+    speeds = free_flow_speed / (1.0 + alpha * np.power(volumes / capacity, beta))
+    return np.maximum(speeds, min_speed)
+
+
+@register_congestion_model('calibrated')
+def calibrated_speeds(volumes, points):
+    """관측으로 보정한 (volume, speed) 점들을 선형 보간, 범위 밖은 양 끝 값 유지"""
+    points = sorted(points)
+    return np.interp(volumes, [p[0] for p in points], [p[1] for p in points])
+
+
+def _config_key(model, params):
+    return model, json.dumps(params, sort_keys=True)
+
+
+class SpeedEstimator:
+    """교차로별 설정을 한 번 읽어 두고 (교차로 id 배열, 교통량 배열)을 속도 배열로 변환"""
+
+    def __init__(self, intersection_ids=None):
+        default = getattr(settings, 'TRAFFIC_CONGESTION_DEFAULT', {'model': 'threshold', 'params': {}})
+        self.default_key = _config_key(default['model'], default.get('params', {}))
+        configs = CongestionModelConfig.objects.all()
+        if intersection_ids is not None:
+            configs = configs.filter(intersection_id__in=list(intersection_ids))
+        self.keys = {
+            intersection_id: _config_key(model, params)
+            for intersection_id, model, params in configs.values_list('intersection_id', 'model', 'params')
+        }
+        # 잘못된 설정은 집계 도중이 아니라 여기서 바로 드러나게 한다
+        for key in {self.default_key, *self.keys.values()}:
+            get_congestion_model(key[0])
+
+    def _evaluate(self, key, volumes):
+        model, params = key
+        return get_congestion_model(model)(volumes, **json.loads(params))
+
+    def __call__(self, intersection_ids, volumes):
+        ids = np.asarray(intersection_ids, dtype=np.int64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        if not self.keys:
+            return np.round(self._evaluate(self.default_key, volumes), 2)
+
+        # 같은 설정을 쓰는 위치끼리 모아 모델마다 한 번씩만 계산
+        order = np.argsort(ids, kind='stable')
+        unique_ids, starts = np.unique(ids[order], return_index=True)
+        ends = np.append(starts[1:], len(ids))
+        groups = {}
+        for intersection_id, start, end in zip(unique_ids.tolist(), starts, ends):
+            groups.setdefault(self.keys.get(intersection_id, self.default_key), []).append(order[start:end])
+
+        speeds = np.empty(len(ids), dtype=np.float64)
+        for key, positions in groups.items():
+            positions = np.concatenate(positions)
+            speeds[positions] = self._evaluate(key, volumes[positions])
+        return np.round(speeds, 2)
+
+
+def recompute_average_speeds(intersection_ids=None, batch_size=10000):
+    """저장된 TotalTrafficVolume의 average_speed만 현재 모델 설정으로 다시 계산
+
+    집계는 다시 하지 않으며 값이 바뀐 슬롯만 upsert한다. 반환: {'scanned', 'updated'}
+    """
+    estimator = SpeedEstimator(intersection_ids)
+    queryset = TotalTrafficVolume.objects.all()
+    if intersection_ids is not None:
+        queryset = queryset.filter(intersection_id__in=list(intersection_ids))
+    rows = queryset.values_list('intersection_id', 'datetime', 'total_volume', 'average_speed').order_by()
+
+    stats = {'scanned': 0, 'updated': 0}
+    touched, slot_min, slot_max = set(), None, None
+    with transaction.atomic():
+        for batch in chunked(rows.iterator(chunk_size=batch_size), batch_size):
+            ids, slots, totals, old_speeds = zip(*batch)
+            speeds = estimator(ids, totals)
+            changed = np.flatnonzero(speeds != np.asarray(old_speeds, dtype=np.float64))
+            stats['scanned'] += len(batch)
+            if not len(changed):
+                continue
+            objs = [
+                TotalTrafficVolume(
+                    intersection_id=ids[i], datetime=slots[i], total_volume=totals[i], average_speed=float(speeds[i]),
+                )
+                for i in changed.tolist()
+            ]
+            stats['updated'] += bulk_upsert(
+                TotalTrafficVolume, objs,
+                unique_fields=['intersection', 'datetime'],
+                update_fields=['average_speed'],
+                batch_size=batch_size,
+            )
+            touched.update(obj.intersection_id for obj in objs)
+            first, last = min(obj.datetime for obj in objs), max(obj.datetime for obj in objs)
+            slot_min = first if slot_min is None else min(slot_min, first)
+            slot_max = last if slot_max is None else max(slot_max, last)
+
+    if touched:
+        traffic_slots_updated.send(
+            sender=TotalTrafficVolume, intersection_ids=touched, slot_min=slot_min, slot_max=slot_max,
+        )
+    return stats
@@ -0,0 +1,245 @@
+"""시계열 API용 시간 버킷 집계와 다운샘플링
+
+- granularity(15m/1h/1d/1w) 버킷 합계는 DB GROUP BY로 계산한다.
+- 방향별 교통량은 롤업 워터마크 이전 구간을 시간/일 롤업 테이블에서, 이후 구간을 원본에서 읽는다.
+- 시계열 조회는 queryset 대신 월 파티션별 queryset 목록(partition_querysets)을 받아 결과를 합친다.
+- max_points가 주어지면 NumPy로 LTTB 또는 버킷별 min/max 점만 남겨 응답 크기를 제한한다.
+- 반환하는 datetime은 granularity와 관계없이 현지 시간(settings.TIME_ZONE)이다.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncWeek
+from django.utils import timezone
+
+from traffic.models import DailyTrafficVolume, HourlyTrafficVolume, ProcessingCheckpoint, TrafficVolume
+from traffic.utils.partitions import merge_sorted, partition_querysets
+from traffic.utils.query_params import filter_time_window
+from traffic.utils.retention import ROLLUP_CHECKPOINT
+
+# granularity → (DB truncate 함수, 방향별 교통량에 쓸 롤업 모델)
+GRANULARITIES = {
+    '15m': (None, None),
+    '1h': (TruncHour, HourlyTrafficVolume),
+    '1d': (TruncDay, DailyTrafficVolume),
+    '1w': (TruncWeek, DailyTrafficVolume),
+}
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+MAX_POINTS_LIMIT = 10000
+
+
+def parse_granularity(value):
+    value = value or '15m'
+    if value not in GRANULARITIES:
+        raise ValueError(f"granularity는 {', '.join(GRANULARITIES)} 중 하나여야 합니다.")
+    return value
+
+
+def parse_downsample(max_points, method):
+    """max_points(없으면 None)와 다운샘플 방식 파싱"""
+    method = method or 'lttb'
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"downsample은 {', '.join(DOWNSAMPLE_METHODS)} 중 하나여야 합니다.")
+    if not max_points:
+        return None, method
+    try:
+        max_points = int(max_points)
+    except ValueError:
+        raise ValueError("max_points는 정수여야 합니다.")
+    if not 3 <= max_points <= MAX_POINTS_LIMIT:
+        raise ValueError(f"max_points는 3~{MAX_POINTS_LIMIT} 범위여야 합니다.")
+    return max_points, method
+
+
+def _parts(querysets):
+    """queryset 하나 또는 파티션별 queryset 목록을 목록으로 통일"""
+    return list(querysets) if isinstance(querysets, (list, tuple)) else [querysets]
+
+
+def bucket_totals(querysets, granularity):
+    """TotalTrafficVolume queryset(또는 partition_querysets로 나눈 목록)을 granularity 버킷으로 합산
+
+    15m이면 슬롯 그대로 반환한다. 월 테이블 경계에 걸친 버킷(주 단위)은 파티션별 합계를 다시 합친다.
+    반환 행: datetime, total_volume, average_speed (+ 버킷이면 samples: 포함된 15분 슬롯 수)
+    """
+    parts = _parts(querysets)
+    trunc, _ = GRANULARITIES[granularity]
+    if trunc is None:
+        rows = [
+            dict(row, datetime=timezone.localtime(row['datetime']))
+            for queryset in parts
+            for row in queryset.order_by('datetime').values('datetime', 'total_volume', 'average_speed')
+        ]
+        if len(parts) > 1:
+            rows.sort(key=lambda row: row['datetime'])
+        return rows
+    buckets = defaultdict(lambda: [0, 0.0, 0])
+    for queryset in parts:
+        rows = queryset.annotate(bucket=trunc('datetime')).values('bucket').annotate(
+            volume_sum=Sum('total_volume'), speed_sum=Sum('average_speed'), slots=Count('id'),
+        ).order_by()
+        for row in rows:
+            bucket = buckets[row['bucket']]
+            bucket[0] += row['volume_sum']
+            bucket[1] += row['speed_sum']
+            bucket[2] += row['slots']
+    return [{
+        'datetime': timezone.localtime(bucket),
+        'total_volume': volume,
+        'average_speed': round(speed_sum / slots, 2),
+        'samples': slots,
+    } for bucket, (volume, speed_sum, slots) in sorted(buckets.items())]
+
+
+def bucket_totals_by_intersection(querysets, granularity):
+    """여러 교차로의 TotalTrafficVolume을 (교차로, 버킷) 순으로 합산 (파티션마다 쿼리 하나)
+
+    반환: (intersection_id, datetime, total_volume, average_speed) 이터레이터
+    """
+    parts = _parts(querysets)
+    trunc, _ = GRANULARITIES[granularity]
+    if trunc is None:
+        rows = merge_sorted([
+            queryset.order_by('intersection_id', 'datetime').values_list(
+                'intersection_id', 'datetime', 'total_volume', 'average_speed',
+            )
+            for queryset in parts
+        ], chunk_size=5000)
+        return (
+            (intersection_id, timezone.localtime(slot), volume, speed)
+            for intersection_id, slot, volume, speed in rows
+        )
+    rows = merge_sorted([
+        queryset.annotate(bucket=trunc('datetime')).values_list('intersection_id', 'bucket').annotate(
+            volume_sum=Sum('total_volume'), speed_sum=Sum('average_speed'), slots=Count('id'),
+        ).order_by('intersection_id', 'bucket')
+        for queryset in parts
+    ], chunk_size=5000)
+    return _merge_intersection_buckets(rows)
+
+
+def _merge_intersection_buckets(rows):
+    """(교차로, 버킷, 합계, 속도 합, 슬롯 수) 정렬 스트림에서 같은 버킷을 합쳐 평균 속도 계산"""
+    for (intersection_id, bucket), group in groupby(rows, key=itemgetter(0, 1)):
+        volume = speed_sum = slots = 0
+        for row in group:
+            volume += row[2]
+            speed_sum += row[3]
+            slots += row[4]
+        yield intersection_id, timezone.localtime(bucket), volume, round(speed_sum / slots, 2)
+
+
+def rollup_watermark():
+    """롤업이 원본 변경을 반영한 마지막 시각 (롤업 작업이 돈 적 없으면 None)"""
+    return ProcessingCheckpoint.objects.filter(name=ROLLUP_CHECKPOINT).values_list('watermark', flat=True).first()
+
+
+def bucket_direction_volumes(intersection_id, start, end, granularity):
+    """교차로의 방향별 교통량을 granularity 버킷으로 합산
+
+    롤업 워터마크가 속한 일(day) 이전 버킷은 롤업 테이블에서, 이후 버킷은 원본 TrafficVolume에서 읽는다.
+    원본은 partition_querysets로 범위와 겹치는 월 파티션만 읽는다.
+    반환 행: datetime, direction, volume, samples
+    """
+    trunc, rollup_model = GRANULARITIES[granularity]
+    watermark = rollup_watermark() if trunc is not None else None
+    parts = []
+    if watermark is not None:
+        # 주 단위 버킷이 롤업/원본으로 나뉘지 않도록 경계를 버킷 시작으로 내린다
+        boundary = timezone.localtime(watermark).replace(hour=0, minute=0, second=0, microsecond=0)
+        if granularity == '1w':
+            boundary -= timedelta(days=boundary.weekday())
+        rollups = filter_time_window(
+            rollup_model.objects.filter(intersection_id=intersection_id, datetime__lt=boundary), start, end,
+        )
+        parts.append(rollups.annotate(bucket=trunc('datetime')).values('bucket', 'direction').annotate(
+            volume_sum=Sum('volume'), slots=Sum('samples'),
+        ).order_by())
+        start = max(start, boundary) if start else boundary
+
+    # 원본은 범위와 겹치는 월 파티션만 읽는다
+    raw_parts = [
+        filter_time_window(queryset.filter(intersection_id=intersection_id, is_simulated=False), start, end)
+        for queryset in partition_querysets(TrafficVolume, start, end)
+    ]
+    if trunc is None:
+        rows = [
+            dict(row, datetime=timezone.localtime(row['datetime']), samples=1)
+            for raw in raw_parts
+            for row in raw.order_by('datetime', 'direction').values('datetime', 'direction', 'volume')
+        ]
+        if len(raw_parts) > 1:
+            rows.sort(key=lambda row: (row['datetime'], row['direction']))
+        return rows
+
+    parts += [
+        raw.annotate(bucket=trunc('datetime')).values('bucket', 'direction').annotate(
+            volume_sum=Sum('volume'), slots=Count('id'),
+        ).order_by()
+        for raw in raw_parts
+    ]
+    # 월 테이블 경계에 걸친 주 단위 버킷은 파티션별 합계를 다시 합친다
+    buckets = defaultdict(lambda: [0, 0])
+    for part in parts:
+        for row in part:
+            bucket = buckets[row['bucket'], row['direction']]
+            bucket[0] += row['volume_sum']
+            bucket[1] += row['slots']
+    return [
+        {'datetime': timezone.localtime(bucket), 'direction': direction, 'volume': volume, 'samples': slots}
+        for (bucket, direction), (volume, slots) in sorted(buckets.items())
+    ]
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: 모양을 가장 잘 유지하는 threshold개 점의 인덱스"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    selected = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        areas = np.abs(
+            (x[selected] - avg_x) * (y[lo:hi] - y[selected])
+            - (x[selected] - x[lo:hi]) * (avg_y - y[selected])
+        )
+        selected = lo + int(areas.argmax())
+        indices[i + 1] = selected
+    return indices
+
+
+def minmax_indices(y, threshold):
+    """구간마다 최소/최대 점을 남겨 피크를 보존 (최대 threshold개)"""
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    buckets = max(threshold // 2, 1)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    picked = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            segment = y[lo:hi]
+            picked += [lo + int(segment.argmin()), lo + int(segment.argmax())]
+    return np.unique(picked)
+
+
+def downsample_rows(rows, max_points, method='lttb', value_field='total_volume'):
+    """시간순 행 목록을 max_points개 이하로 줄임 (value_field 기준)"""
+    if max_points is None or len(rows) <= max_points:
+        return rows
+    y = np.fromiter((row[value_field] or 0 for row in rows), dtype=np.float64, count=len(rows))
+    if method == 'minmax':
+        indices = minmax_indices(y, max_points)
+    else:
+        x = np.fromiter((row['datetime'].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+        indices = lttb_indices(x, y, max_points)
+    return [rows[i] for i in indices.tolist()]
@@ -0,0 +1,155 @@
+"""시계열 범위 컬럼형 내보내기 (gzip CSV / Arrow IPC / Parquet)
+
+모델 인스턴스를 만들지 않고 values_list 커서에서 바로 컬럼 배치를 구성해
+배치 단위로 인코딩한 바이트를 흘려보낸다. Arrow/Parquet은 pyarrow가 설치된 경우에만 사용 가능.
+"""
+import csv
+import io
+import zlib
+
+from traffic.models import TotalTrafficVolume, TrafficVolume
+from traffic.utils.bulk import chunked
+from traffic.utils.partitions import merge_sorted, partition_querysets
+from traffic.utils.query_params import filter_time_window
+
+# source 이름 → (모델, 내보낼 컬럼)
+EXPORT_SOURCES = {
+    'total': (TotalTrafficVolume, ['intersection_id', 'datetime', 'total_volume', 'average_speed']),
+    'volume': (TrafficVolume, ['intersection_id', 'datetime', 'direction', 'volume', 'is_simulated']),
+}
+EXPORT_FORMATS = {
+    'csv': ('application/gzip', 'csv.gz'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def export_querysets(source, intersection_ids=None, start_time=None, end_time=None, directions=None):
+    """내보내기 대상 values_list queryset 목록 (월 파티션별, 각각 (intersection, datetime) 순 정렬)"""
+    model, fields = EXPORT_SOURCES[source]
+    querysets = []
+    for qs in partition_querysets(model, start_time, end_time):
+        qs = filter_time_window(qs, start_time, end_time)
+        if intersection_ids:
+            qs = qs.filter(intersection_id__in=intersection_ids)
+        if directions and source == 'volume':
+            qs = qs.filter(direction__in=directions)
+        querysets.append(qs.order_by('intersection_id', 'datetime').values_list(*fields))
+    return querysets, fields
+
+
+def iter_column_batches(querysets, fields, batch_size=50000):
+    """파티션별 values_list 커서를 (intersection, datetime) 순으로 병합해 {컬럼: 값 리스트} 배치로 변환"""
+    rows = merge_sorted(querysets, chunk_size=min(batch_size, 10000))
+    for batch in chunked(rows, batch_size):
+        columns = list(zip(*batch))
+        yield {field: list(column) for field, column in zip(fields, columns)}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError('Arrow/Parquet 내보내기에는 pyarrow 패키지가 필요합니다.')
+    return pyarrow
+
+
+def _arrow_schema(pa, fields):
+    types = {
+        'intersection_id': pa.int64(),
+        'datetime': pa.timestamp('us', tz='UTC'),
+        'total_volume': pa.int32(),
+        'average_speed': pa.float64(),
+        'direction': pa.string(),
+        'volume': pa.int32(),
+        'is_simulated': pa.bool_(),
+    }
+    return pa.schema([(field, types[field]) for field in fields])
+
+
+class _ChunkSink:
+    """pyarrow writer가 쓰는 바이트를 모아 두었다가 배치마다 꺼내가는 파일 객체"""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.buffer.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def iter_csv_gz(batches, fields):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip 컨테이너
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(fields)
+    for batch in batches:
+        writer.writerows(zip(*(batch[field] for field in fields)))
+        chunk = compressor.compress(text.getvalue().encode('utf-8'))
+        text.seek(0)
+        text.truncate()
+        if chunk:
+            yield chunk
+    chunk = compressor.compress(text.getvalue().encode('utf-8'))
+    yield chunk + compressor.flush()
+
+
+def _iter_pyarrow(batches, fields, open_writer):
+    pa = _require_pyarrow()
+    schema = _arrow_schema(pa, fields)
+    sink = _ChunkSink()
+    writer = open_writer(sink, schema)
+    for batch in batches:
+        writer.write_batch(pa.record_batch([pa.array(batch[f], type=schema.field(f).type) for f in fields], schema=schema))
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def iter_arrow_ipc(batches, fields):
+    pa = _require_pyarrow()
+    return _iter_pyarrow(batches, fields, lambda sink, schema: pa.ipc.new_stream(sink, schema))
+
+
+def iter_parquet(batches, fields):
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+    return _iter_pyarrow(batches, fields, lambda sink, schema: pq.ParquetWriter(sink, schema, compression='zstd'))
+
+
+ENCODERS = {
+    'csv': iter_csv_gz,
+    'arrow': iter_arrow_ipc,
+    'parquet': iter_parquet,
+}
+
+
+def iter_export(fmt, source, intersection_ids=None, start_time=None, end_time=None, directions=None, batch_size=50000):
+    """형식에 맞게 인코딩된 바이트 청크 이터레이터 반환 (pyarrow 미설치 시 ValueError)"""
+    if fmt not in ENCODERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} (csv, arrow, parquet)")
+    if source not in EXPORT_SOURCES:
+        raise ValueError(f"지원하지 않는 source입니다: {source} (total, volume)")
+    querysets, fields = export_querysets(source, intersection_ids, start_time, end_time, directions)
+    return ENCODERS[fmt](iter_column_batches(querysets, fields, batch_size), fields)
@@ -0,0 +1,275 @@
+"""교차로×방향별 단기(15분 슬롯) 교통량 예측
+
+모든 시계열을 (시계열 수, 슬롯 수) 행렬로 만들어 한 번에 예측한다 (비어 있는 슬롯은 NaN).
+- seasonal_naive: 1주 전(이력이 1주 미만이면 1일 전) 같은 슬롯 값
+- ewm: 최근 몇 주(일)의 같은 슬롯을 지수 가중 평균한 계절 패턴 × 최근 4슬롯 수준 보정(horizon에 따라 감쇠)
+- regression: [1주 전, 1일 전, 마지막 값, 최근 4슬롯 평균, 1] 특징으로 horizon마다 전 시계열 공통
+  선형 회귀(ridge)를 이력 안의 과거 시점들로 학습 (정규방정식을 horizon 묶음으로 한 번에 풂)
+예측은 is_simulated=True TrafficVolume으로 저장하며, 실제 관측값(is_simulated=False)은 덮어쓰지 않는다.
+"""
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+
+from traffic.models import TrafficVolume
+from traffic.utils.aggregation import SLOT, floor_to_slot
+from traffic.utils.bulk import chunked
+
+DIRECTIONS = [code for code, _ in TrafficVolume.DIRECTION_CHOICES]
+DAY_SLOTS = timedelta(days=1) // SLOT
+WEEK_SLOTS = 7 * DAY_SLOTS
+DEFAULT_HORIZON = 8
+MAX_HORIZON = DAY_SLOTS
+DEFAULT_HISTORY_DAYS = 21
+EWM_ALPHA = 0.5
+LEVEL_SLOTS = 4
+LEVEL_DAMPING = 0.9
+RIDGE_LAMBDA = 1.0
+TRAINING_ORIGINS = 12
+
+
+def latest_observation(intersection_ids=None):
+    """실제 관측(is_simulated=False) TrafficVolume의 마지막 슬롯 시작 시각"""
+    queryset = TrafficVolume.objects.filter(is_simulated=False)
+    if intersection_ids is not None:
+        queryset = queryset.filter(intersection_id__in=intersection_ids)
+    latest = queryset.aggregate(latest=Max('datetime'))['latest']
+    return floor_to_slot(latest) if latest is not None else None
+
+
+def load_history(intersection_ids, origin, days=DEFAULT_HISTORY_DAYS):
+    """origin 슬롯까지 days일의 실제 관측을 시계열 행렬로 변환
+
+    반환: (keys [(intersection_id, direction)], 행렬 (시계열 수, days × 96), 마지막 열이 origin 슬롯)
+    """
+    slots = days * DAY_SLOTS
+    start = origin - SLOT * (slots - 1)
+    rows = TrafficVolume.objects.filter(
+        intersection_id__in=intersection_ids, is_simulated=False,
+        datetime__gte=start, datetime__lt=origin + SLOT,
+    ).values_list('intersection_id', 'direction', 'datetime', 'volume')
+    rows = list(rows.order_by())
+    if not rows:
+        return [], np.empty((0, slots))
+
+    direction_index = {code: i for i, code in enumerate(DIRECTIONS)}
+    codes = np.fromiter(
+        (row[0] * len(DIRECTIONS) + direction_index[row[1]] for row in rows), dtype=np.int64, count=len(rows),
+    )
+    offsets = np.fromiter((row[2].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+    columns = ((offsets - start.timestamp()) // SLOT.total_seconds()).astype(np.int64)
+    volumes = np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows))
+
+    series, inverse = np.unique(codes, return_inverse=True)
+    # 슬롯 경계가 아닌 원본 행은 같은 슬롯으로 합산, 관측이 없는 슬롯은 NaN
+    sums = np.zeros((len(series), slots))
+    np.add.at(sums, (inverse, columns), volumes)
+    seen = np.zeros((len(series), slots), dtype=bool)
+    seen[inverse, columns] = True
+    matrix = np.where(seen, sums, np.nan)
+    keys = [(int(code // len(DIRECTIONS)), DIRECTIONS[code % len(DIRECTIONS)]) for code in series.tolist()]
+    return keys, matrix
+
+
+def seasonal_lag(history, horizon, season, cycles=1):
+    """horizon 1..H 각 목표 슬롯의 cycles번째 이전 계절(season 슬롯 주기) 같은 위치 값, (n, H)"""
+    length = history.shape[1]
+    steps = np.arange(1, horizon + 1)
+    index = length - 1 + steps - season * (np.ceil(steps / season).astype(np.int64) + cycles - 1)
+    values = np.full((history.shape[0], horizon), np.nan)
+    valid = index >= 0
+    values[:, valid] = history[:, index[valid]]
+    return values
+
+
+def _fill(values, *fallbacks):
+    """NaN을 fallbacks 순서대로 채움 (각 fallback은 (n, H) 또는 (n, 1))"""
+    for fallback in fallbacks:
+        values = np.where(np.isnan(values), fallback, values)
+    return np.nan_to_num(values)
+
+
+def _recent_mean(history, slots=DAY_SLOTS):
+    with np.errstate(invalid='ignore'):
+        counts = (~np.isnan(history[:, -slots:])).sum(axis=1, keepdims=True)
+        return np.where(counts > 0, np.nansum(history[:, -slots:], axis=1, keepdims=True) / np.maximum(counts, 1), np.nan)
+
+
+def seasonal_naive(history, horizon):
+    day = seasonal_lag(history, horizon, DAY_SLOTS)
+    if history.shape[1] < WEEK_SLOTS:
+        return _fill(day, _recent_mean(history))
+    return _fill(seasonal_lag(history, horizon, WEEK_SLOTS), day, _recent_mean(history))
+
+
+def _seasonal_ewm(history, horizon, alpha=EWM_ALPHA):
+    """같은 슬롯의 과거 계절값 지수 가중 평균 (NaN은 가중치에서 제외)"""
+    season = WEEK_SLOTS if history.shape[1] >= 2 * WEEK_SLOTS else DAY_SLOTS
+    total = np.zeros((history.shape[0], horizon))
+    weights = np.zeros_like(total)
+    for cycle in range(1, history.shape[1] // season + 1):
+        values = seasonal_lag(history, horizon, season, cycle)
+        weight = alpha * (1 - alpha) ** (cycle - 1)
+        present = ~np.isnan(values)
+        total += np.where(present, values, 0.0) * weight
+        weights += present * weight
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / weights
+
+
+def ewm(history, horizon):
+    pattern = _fill(_seasonal_ewm(history, horizon), seasonal_naive(history, horizon))
+    if history.shape[1] <= LEVEL_SLOTS + DAY_SLOTS:
+        return pattern
+    # 최근 LEVEL_SLOTS 슬롯 관측 / 같은 슬롯의 계절 패턴 → 수준 보정 비율
+    expected = _seasonal_ewm(history[:, :-LEVEL_SLOTS], LEVEL_SLOTS)
+    recent = history[:, -LEVEL_SLOTS:]
+    both = ~np.isnan(recent) & ~np.isnan(expected)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.where(both, recent, 0.0).sum(axis=1) / np.where(both, expected, 0.0).sum(axis=1)
+    ratio = np.clip(np.nan_to_num(ratio, nan=1.0, posinf=1.0), 0.5, 2.0)[:, None]
+    damping = LEVEL_DAMPING ** np.arange(1, horizon + 1)
+    return np.maximum(pattern * (1 + (ratio - 1) * damping), 0.0)
+
+
+def regression_features(history, horizon):
+    """(n, H, 5): 1주 전, 1일 전, 마지막 값, 최근 4슬롯 평균, 상수항"""
+    recent = _recent_mean(history, LEVEL_SLOTS)
+    day_mean = _recent_mean(history)
+    day = _fill(seasonal_lag(history, horizon, DAY_SLOTS), day_mean)
+    week = _fill(seasonal_lag(history, horizon, WEEK_SLOTS), day) if history.shape[1] >= WEEK_SLOTS else day
+    last = np.broadcast_to(_fill(history[:, -1:], recent, day_mean), day.shape)
+    level = np.broadcast_to(_fill(recent, day_mean), day.shape)
+    return np.stack([week, day, last, level, np.ones_like(day)], axis=2)
+
+
+def regression(history, horizon, origins=TRAINING_ORIGINS, ridge=RIDGE_LAMBDA):
+    """horizon별 공통 선형 회귀, 학습할 과거 시점이 없으면 seasonal_naive"""
+    length = history.shape[1]
+    step = max(1, DAY_SLOTS // 4)
+    training = [
+        origin for origin in range(length - horizon, DAY_SLOTS + LEVEL_SLOTS - 1, -step)
+    ][:origins]
+    if not training:
+        return seasonal_naive(history, horizon)
+
+    features = np.concatenate([regression_features(history[:, :origin], horizon) for origin in training])
+    targets = np.concatenate([history[:, origin:origin + horizon] for origin in training])
+    present = ~np.isnan(targets)
+    features = np.where(present[:, :, None], features, 0.0)
+    targets = np.where(present, targets, 0.0)
+    # horizon마다 (X^T X + λI) w = X^T y, 5×5 정규방정식을 한 번에 풂
+    gram = np.einsum('mhp,mhq->hpq', features, features) + ridge * np.eye(features.shape[2])
+    moment = np.einsum('mhp,mh->hp', features, targets)
+    weights = np.linalg.solve(gram, moment[:, :, None])[:, :, 0]
+    return np.maximum(np.einsum('nhp,hp->nh', regression_features(history, horizon), weights), 0.0)
+
+
+METHODS = {
+    'seasonal_naive': seasonal_naive,
+    'ewm': ewm,
+    'regression': regression,
+}
+DEFAULT_METHOD = 'ewm'
+
+
+def parse_method(value):
+    value = value or DEFAULT_METHOD
+    if value not in METHODS:
+        raise ValueError(f"method는 {', '.join(METHODS)} 중 하나여야 합니다.")
+    return value
+
+
+def predict(history, horizon, method=DEFAULT_METHOD):
+    """(n, T) 이력 행렬 → (n, horizon) 예측 (0 이상 정수로 반올림)"""
+    if not len(history):
+        return np.empty((0, horizon))
+    return np.rint(np.maximum(METHODS[method](history, horizon), 0.0))
+
+
+def forecast_intersection(intersection_id, horizon=DEFAULT_HORIZON, method=DEFAULT_METHOD, days=DEFAULT_HISTORY_DAYS):
+    """교차로 하나를 저장하지 않고 예측: (origin, [{'direction', 'datetime', 'volume'}])"""
+    origin = latest_observation([intersection_id])
+    if origin is None:
+        return None, []
+    keys, history = load_history([intersection_id], origin, days)
+    predictions = predict(history, horizon, method)
+    return origin, [
+        {'direction': direction, 'datetime': origin + SLOT * (step + 1), 'volume': int(predictions[i, step])}
+        for step in range(horizon)
+        for i, (_, direction) in enumerate(keys)
+    ]
+
+
+def write_forecasts(horizon=DEFAULT_HORIZON, method=DEFAULT_METHOD, days=DEFAULT_HISTORY_DAYS,
+                    intersection_ids=None, chunk_intersections=200, batch_size=5000):
+    """마지막 관측 슬롯 다음 horizon개 슬롯을 모든 교차로×방향에 대해 예측해 저장
+
+    교차로 묶음마다 이력 쿼리 1회, 예측은 묶음 전체 행렬 연산 1회. 예측 대상 교차로의 기존
+    예측(is_simulated=True)은 지우고 새로 넣으며, 같은 슬롯에 실제 관측이 있으면 그대로 둔다.
+    반환: {'origin', 'series', 'rows', 'deleted'}
+    """
+    stats = {'origin': latest_observation(intersection_ids), 'series': 0, 'rows': 0, 'deleted': 0}
+    origin = stats['origin']
+    if origin is None:
+        return stats
+    start = origin - timedelta(days=days)
+    if intersection_ids is None:
+        intersection_ids = TrafficVolume.objects.filter(
+            is_simulated=False, datetime__gt=start, datetime__lt=origin + SLOT,
+        ).values_list('intersection_id', flat=True).distinct().order_by()
+    targets = [origin + SLOT * (step + 1) for step in range(horizon)]
+
+    with transaction.atomic():
+        for chunk in chunked(sorted(set(intersection_ids)), chunk_intersections):
+            keys, history = load_history(chunk, origin, days)
+            predictions = predict(history, horizon, method).astype(np.int64).tolist()
+            stats['deleted'] += TrafficVolume.objects.filter(intersection_id__in=chunk, is_simulated=True).delete()[0]
+            objs = (
+                TrafficVolume(
+                    intersection_id=intersection_id, direction=direction, datetime=slot,
+                    volume=values[step], is_simulated=True,
+                )
+                for (intersection_id, direction), values in zip(keys, predictions)
+                for step, slot in enumerate(targets)
+            )
+            for batch in chunked(objs, batch_size):
+                TrafficVolume.objects.bulk_create(batch, ignore_conflicts=True)
+                stats['rows'] += len(batch)
+            stats['series'] += len(keys)
+    return stats
+
+
+def backtest(history, horizon, methods=None, origins=7, step=DAY_SLOTS):
+    """이력 행렬 안의 과거 시점 origins개에서 예측해 실제값과 비교
+
+    반환: {method: {'mae', 'rmse', 'wape', 'series_per_second'}} (wape = Σ|오차| / Σ실제값)
+    """
+    length = history.shape[1]
+    cutoffs = [length - horizon - i * step for i in range(origins)]
+    cutoffs = [cutoff for cutoff in cutoffs if cutoff >= DAY_SLOTS + LEVEL_SLOTS]
+    results = {}
+    for method in methods or METHODS:
+        errors, actual_sum, elapsed, series = [], 0.0, 0.0, 0
+        for cutoff in cutoffs:
+            actual = history[:, cutoff:cutoff + horizon]
+            started = time.perf_counter()
+            predicted = predict(history[:, :cutoff], horizon, method)
+            elapsed += time.perf_counter() - started
+            series += len(history)
+            present = ~np.isnan(actual)
+            errors.append((predicted - actual)[present])
+            actual_sum += actual[present].sum()
+        errors = np.concatenate(errors) if errors else np.empty(0)
+        results[method] = {
+            'origins': len(cutoffs),
+            'points': len(errors),
+            'mae': round(float(np.abs(errors).mean()), 2) if len(errors) else None,
+            'rmse': round(float(np.sqrt((errors ** 2).mean())), 2) if len(errors) else None,
+            'wape': round(float(np.abs(errors).sum() / actual_sum), 4) if actual_sum else None,
+            'series_per_second': round(series / elapsed) if elapsed else None,
+        }
+    return results
@@ -0,0 +1,234 @@
+"""사고 영향(IncidentImpact)과 교차로 건강 점수(IntersectionHealth) 계산 엔진
+
+- 영향 구간: floor_to_slot(registered_at) ~ 처리 완료면 last_status_update, 미처리면 현재
+  (최소 1슬롯, 최대 MAX_WINDOW)
+- 사고마다 쿼리하지 않는다. 교차로 묶음마다 필요한 범위의 TotalTrafficVolume을 (교차로, 시각) 순으로
+  한 번 읽고, 교차로별로 정렬된 슬롯과 사고 구간을 np.searchsorted로 병합 조인해 누적합 차이로
+  구간 합계를 구한다.
+- 기준선: 같은 구간을 1~BASELINE_WEEKS주 전으로 옮긴 구간들의 슬롯당 평균 교통량/속도
+- 증분: 구간이 바뀐(신규/상태 변경/교차로 변경) 사고와, watermark 이후 원본이 바뀐 구간
+  (기준선으로 참조하는 뒤쪽 BASELINE_WEEKS주 포함)에 걸친 사고만 다시 계산한다.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+from django.db import transaction
+
+from traffic.models import Incident, IncidentImpact, IntersectionHealth, TotalTrafficVolume
+from traffic.utils.aggregation import SLOT, floor_to_slot, touched_windows, window_q
+from traffic.utils.bulk import bulk_upsert, chunked
+from traffic.utils.incident_stats import RESOLVED_STATUS_PREFIX
+
+IMPACT_CHECKPOINT = 'incident_impact'
+# 신호가 꺼지거나 점멸해 교차로 통제가 사라지는 사고 유형
+OUTAGE_DETAIL_TYPES = ('CRUCE APAGADO', 'SEMAFORO INTERMITENTE')
+BASELINE_WEEKS = 4
+WEEK = timedelta(days=7)
+MIN_WINDOW = SLOT
+MAX_WINDOW = timedelta(hours=24)
+HEALTH_PERIOD = timedelta(days=90)
+
+IMPACT_UPDATE_FIELDS = [
+    'intersection', 'window_start', 'window_end', 'is_outage', 'slots', 'observed_volume',
+    'baseline_volume', 'observed_speed', 'baseline_speed', 'updated_at',
+]
+HEALTH_UPDATE_FIELDS = [
+    'score', 'incidents', 'outages', 'impacted_hours', 'lost_volume', 'volume_loss_ratio',
+    'speed_loss_ratio', 'period_start', 'period_end', 'updated_at',
+]
+
+
+def impact_window(registered_at, last_status_update, status, now):
+    start = floor_to_slot(registered_at)
+    end = last_status_update if status.startswith(RESOLVED_STATUS_PREFIX) else now
+    return start, min(max(end, start + MIN_WINDOW), start + MAX_WINDOW)
+
+
+def plan_impacts(now, watermark=None, full=False):
+    """다시 계산할 사고 [(incident_id, intersection_id, start, end, is_outage)]와 지울 영향 id 목록"""
+    existing = {
+        pk: (intersection_id, start, end)
+        for pk, intersection_id, start, end in IncidentImpact.objects.values_list(
+            'incident_id', 'intersection_id', 'window_start', 'window_end',
+        )
+    }
+    touched = defaultdict(list)
+    if watermark is not None and not full:
+        for intersection_id, first, last in touched_windows(watermark, until=now):
+            touched[intersection_id].append((first, last))
+
+    lookback = BASELINE_WEEKS * WEEK
+    dirty, current = [], set()
+    incidents = Incident.objects.filter(intersection__isnull=False).values_list(
+        'id', 'intersection_id', 'registered_at', 'last_status_update', 'status', 'incident_detail_type',
+    )
+    for pk, intersection_id, registered_at, last_update, status, detail_type in incidents.iterator(chunk_size=5000):
+        current.add(pk)
+        start, end = impact_window(registered_at, last_update, status, now)
+        changed = full or existing.get(pk) != (intersection_id, start, end) or any(
+            first < end and last >= start - lookback for first, last in touched.get(intersection_id, ())
+        )
+        if changed:
+            dirty.append((pk, intersection_id, start, end, detail_type in OUTAGE_DETAIL_TYPES))
+    return dirty, [pk for pk in existing if pk not in current]
+
+
+def interval_sums(times, volumes, speeds, starts, ends):
+    """정렬된 슬롯 시각 times와 구간 [starts, ends)의 병합 조인: 구간별 (슬롯 수, 교통량 합, 속도 합)"""
+    cum_volume = np.concatenate(([0.0], np.cumsum(volumes)))
+    cum_speed = np.concatenate(([0.0], np.cumsum(speeds)))
+    lo = np.searchsorted(times, starts, side='left')
+    hi = np.searchsorted(times, ends, side='left')
+    return hi - lo, cum_volume[hi] - cum_volume[lo], cum_speed[hi] - cum_speed[lo]
+
+
+def _intersection_impacts(rows, slots):
+    """한 교차로의 사고들(rows)과 슬롯 [(datetime, total_volume, average_speed)]로 IncidentImpact 생성"""
+    times = np.fromiter((slot[0].timestamp() for slot in slots), dtype=np.float64, count=len(slots))
+    volumes = np.fromiter((slot[1] for slot in slots), dtype=np.float64, count=len(slots))
+    speeds = np.fromiter((slot[2] for slot in slots), dtype=np.float64, count=len(slots))
+    starts = np.array([row[2].timestamp() for row in rows])
+    ends = np.array([row[3].timestamp() for row in rows])
+
+    counts, volume_sums, speed_sums = interval_sums(times, volumes, speeds, starts, ends)
+    base_counts = np.zeros(len(rows))
+    base_volumes = np.zeros(len(rows))
+    base_speeds = np.zeros(len(rows))
+    for weeks in range(1, BASELINE_WEEKS + 1):
+        shift = (weeks * WEEK).total_seconds()
+        c, v, s = interval_sums(times, volumes, speeds, starts - shift, ends - shift)
+        base_counts += c
+        base_volumes += v
+        base_speeds += s
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        base_volume_per_slot = base_volumes / base_counts
+        base_speed = base_speeds / base_counts
+        observed_speed = speed_sums / counts
+
+    for i, (pk, intersection_id, start, end, is_outage) in enumerate(rows):
+        has_baseline = base_counts[i] > 0
+        yield IncidentImpact(
+            incident_id=pk,
+            intersection_id=intersection_id,
+            window_start=start,
+            window_end=end,
+            is_outage=is_outage,
+            slots=int(counts[i]),
+            observed_volume=int(volume_sums[i]),
+            baseline_volume=round(float(base_volume_per_slot[i] * counts[i]), 1) if has_baseline and counts[i] else None,
+            observed_speed=round(float(observed_speed[i]), 2) if counts[i] else None,
+            baseline_speed=round(float(base_speed[i]), 2) if has_baseline else None,
+        )
+
+
+def iter_impacts(rows, chunk_intersections=200):
+    """plan_impacts의 사고 목록으로 IncidentImpact 객체 생성 (교차로 묶음마다 슬롯 쿼리 1회)"""
+    by_intersection = defaultdict(list)
+    for row in rows:
+        by_intersection[row[1]].append(row)
+    lookback = BASELINE_WEEKS * WEEK
+
+    for chunk in chunked(sorted(by_intersection), chunk_intersections):
+        windows = [
+            (
+                intersection_id,
+                min(row[2] for row in by_intersection[intersection_id]) - lookback,
+                max(row[3] for row in by_intersection[intersection_id]),
+            )
+            for intersection_id in chunk
+        ]
+        slots = TotalTrafficVolume.objects.filter(window_q(windows)).order_by('intersection_id', 'datetime').values_list(
+            'intersection_id', 'datetime', 'total_volume', 'average_speed',
+        )
+        slots_by_intersection = {
+            intersection_id: [row[1:] for row in group]
+            for intersection_id, group in groupby(slots.iterator(chunk_size=10000), key=itemgetter(0))
+        }
+        for intersection_id in chunk:
+            yield from _intersection_impacts(by_intersection[intersection_id], slots_by_intersection.get(intersection_id, []))
+
+
+def health_score(incidents, weighted_hours, volume_loss_ratio, speed_loss_ratio):
+    """100점에서 감점: 사고 수(10건 이상 25점), 영향 시간(정전은 2배, 48시간 이상 25점),
+    교통량 손실률 × 30, 속도 손실률 × 20 (손실률 감점은 영향 시간이 24시간 미만이면 비례해서 줄임)"""
+    coverage = min(weighted_hours / 24, 1.0)
+    penalty = (
+        25 * min(incidents / 10, 1.0)
+        + 25 * min(weighted_hours / 48, 1.0)
+        + coverage * (30 * (volume_loss_ratio or 0.0) + 20 * (speed_loss_ratio or 0.0))
+    )
+    return round(max(0.0, 100.0 - penalty), 1)
+
+
+def refresh_health(period_end, period=HEALTH_PERIOD, batch_size=1000):
+    """period_end 이전 period 동안 시작한 사고 영향을 교차로별로 합쳐 IntersectionHealth를 다시 씀"""
+    period_start = period_end - period
+    impacts = IncidentImpact.objects.filter(window_start__gte=period_start, window_start__lt=period_end).values_list(
+        'intersection_id', 'window_start', 'window_end', 'is_outage', 'slots', 'observed_volume',
+        'baseline_volume', 'observed_speed', 'baseline_speed',
+    ).order_by('intersection_id')
+
+    objs = []
+    for intersection_id, group in groupby(impacts.iterator(chunk_size=5000), key=itemgetter(0)):
+        incidents = outages = 0
+        hours = weighted_hours = lost = baseline_total = speed_lost = speed_total = 0.0
+        for _, start, end, is_outage, slots, observed, baseline, observed_speed, baseline_speed in group:
+            incidents += 1
+            duration = (end - start).total_seconds() / 3600
+            hours += duration
+            weighted_hours += duration * (2 if is_outage else 1)
+            outages += is_outage
+            if baseline is not None:
+                lost += max(baseline - observed, 0.0)
+                baseline_total += baseline
+            if observed_speed is not None and baseline_speed:
+                speed_lost += max(baseline_speed - observed_speed, 0.0) * slots
+                speed_total += baseline_speed * slots
+        volume_loss_ratio = round(lost / baseline_total, 4) if baseline_total else None
+        speed_loss_ratio = round(speed_lost / speed_total, 4) if speed_total else None
+        objs.append(IntersectionHealth(
+            intersection_id=intersection_id,
+            score=health_score(incidents, weighted_hours, volume_loss_ratio, speed_loss_ratio),
+            incidents=incidents,
+            outages=outages,
+            impacted_hours=round(hours, 2),
+            lost_volume=round(lost, 1),
+            volume_loss_ratio=volume_loss_ratio,
+            speed_loss_ratio=speed_loss_ratio,
+            period_start=period_start,
+            period_end=period_end,
+        ))
+
+    with transaction.atomic():
+        count = bulk_upsert(
+            IntersectionHealth, objs,
+            unique_fields=['intersection'],
+            update_fields=HEALTH_UPDATE_FIELDS,
+            batch_size=batch_size,
+        )
+        # 기간 안에 사고가 없어진 교차로는 순위에서 뺀다
+        stale = IntersectionHealth.objects.exclude(period_end=period_end).values_list('pk', flat=True)
+        deleted = 0
+        for pks in chunked(list(stale), batch_size):
+            deleted += IntersectionHealth.objects.filter(pk__in=pks).delete()[0]
+    return {'intersections': count, 'deleted': deleted}
+
+
+def compute_incident_impacts(now, watermark=None, full=False, batch_size=2000):
+    """영향이 바뀔 수 있는 사고만 다시 계산해 upsert, 반환: {'planned', 'upserted', 'deleted'}"""
+    rows, stale = plan_impacts(now, watermark, full)
+    with transaction.atomic():
+        upserted = bulk_upsert(
+            IncidentImpact, iter_impacts(rows),
+            unique_fields=['incident'],
+            update_fields=IMPACT_UPDATE_FIELDS,
+            batch_size=batch_size,
+        )
+        deleted = 0
+        for pks in chunked(stale, batch_size):
+            deleted += IncidentImpact.objects.filter(pk__in=pks).delete()[0]
+    return {'planned': len(rows), 'upserted': upserted, 'deleted': deleted}
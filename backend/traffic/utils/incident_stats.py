@@ -0,0 +1,148 @@
+"""사고(Incident) 필터와 DB 집계 (구/유형/요일·시간/교차로별 건수, 처리 시간 백분위)
+
+집계는 모두 SQL GROUP BY와 윈도 함수로 계산하며, 결과는 query_cache의 INCIDENT_SCOPE로
+캐시한다 (import_incidents/저장 시 등록 시각이 걸친 월만 무효화).
+"""
+import math
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, FloatField, Value, Window
+from django.db.models.functions import Ceil, ExtractHour, ExtractIsoWeekDay, RowNumber
+
+from traffic.models import Incident
+from traffic.utils.query_params import filter_bbox, filter_time_window, parse_bbox, parse_datetime_param, parse_id_list
+
+# query_cache scope (교차로 scope와 겹치지 않는 이름)
+INCIDENT_SCOPE = 'incidents'
+# 처리 완료로 보는 상태 (예: 'RESUELTO - FINALIZADO')
+RESOLVED_STATUS_PREFIX = 'RESUELTO'
+
+# group_by 이름 → Incident 필드 (hour_of_week는 등록 시각의 ISO 요일(1=월)×시간)
+GROUP_FIELDS = {
+    'district': 'district',
+    'type': 'incident_type',
+    'status': 'status',
+    'intersection': 'intersection_id',
+}
+COUNT_GROUPS = (*GROUP_FIELDS, 'hour_of_week')
+DEFAULT_PERCENTILES = (50, 90, 95)
+
+
+def _split(value):
+    return tuple(sorted({v.strip() for v in value.split(',') if v.strip()})) if value else ()
+
+
+def parse_incident_filters(params):
+    """쿼리 파라미터 → 정규화된 필터 dict (캐시 키로도 쓴다)
+
+    district/status/type: 쉼표 구분 목록, intersection: id 목록,
+    start_time/end_time: 등록 시각 범위, bbox: 교차로 좌표 범위
+    """
+    return {
+        'district': _split(params.get('district')),
+        'status': _split(params.get('status')),
+        'type': _split(params.get('type')),
+        'intersection': tuple(sorted(set(parse_id_list(params.get('intersection'), 'intersection')))),
+        'start_time': parse_datetime_param(params.get('start_time'), 'start_time'),
+        'end_time': parse_datetime_param(params.get('end_time'), 'end_time'),
+        'bbox': parse_bbox(params.get('bbox')),
+    }
+
+
+def filter_incidents(queryset, filters):
+    for name, field in (('district', 'district'), ('status', 'status'), ('type', 'incident_type')):
+        if filters[name]:
+            queryset = queryset.filter(**{f'{field}__in': filters[name]})
+    if filters['intersection']:
+        queryset = queryset.filter(intersection_id__in=filters['intersection'])
+    queryset = filter_time_window(queryset, filters['start_time'], filters['end_time'], field='registered_at')
+    return filter_bbox(queryset, filters['bbox'], prefix='intersection__')
+
+
+def filter_key(filters):
+    """캐시 키용: 윈도우(start/end)는 cached_window가 따로 넣으므로 제외"""
+    return tuple((name, value) for name, value in sorted(filters.items()) if name not in ('start_time', 'end_time'))
+
+
+def parse_group_by(value, choices, default=None):
+    value = value or default
+    if value is not None and value not in choices:
+        raise ValueError(f"group_by는 {', '.join(choices)} 중 하나여야 합니다.")
+    return value
+
+
+def parse_percentiles(value):
+    if not value:
+        return DEFAULT_PERCENTILES
+    try:
+        percentiles = tuple(sorted({float(v) for v in value.split(',') if v.strip()}))
+    except ValueError:
+        raise ValueError("percentiles는 쉼표로 구분된 숫자 목록이어야 합니다.")
+    if not percentiles or not all(0 < p <= 100 for p in percentiles):
+        raise ValueError("percentiles는 0 초과 100 이하여야 합니다.")
+    return percentiles
+
+
+def incident_counts(filters, group_by):
+    """group_by별 사고 건수 (건수 내림차순, hour_of_week는 요일/시간 순)"""
+    queryset = filter_incidents(Incident.objects.all(), filters)
+    if group_by == 'hour_of_week':
+        rows = queryset.annotate(
+            weekday=ExtractIsoWeekDay('registered_at'), hour=ExtractHour('registered_at'),
+        ).values('weekday', 'hour').annotate(count=Count('id')).order_by('weekday', 'hour')
+        return [{'weekday': row['weekday'], 'hour': row['hour'], 'count': row['count']} for row in rows]
+
+    field = GROUP_FIELDS[group_by]
+    if group_by == 'intersection':
+        rows = queryset.values(field, 'intersection__name').annotate(count=Count('id')).order_by('-count', field)
+        return [
+            {'key': row[field], 'name': row['intersection__name'], 'count': row['count']}
+            for row in rows
+        ]
+    rows = queryset.values(field).annotate(count=Count('id')).order_by('-count', field)
+    return [{'key': row[field], 'count': row['count']} for row in rows]
+
+
+def resolution_percentiles(filters, group_by=None, percentiles=DEFAULT_PERCENTILES):
+    """처리 완료 사고의 등록→최종 상태 변경 시간 백분위 (nearest-rank, 초 단위)
+
+    그룹마다 처리 시간 순 ROW_NUMBER와 그룹 크기를 윈도 함수로 구하고, 백분위 위치
+    ceil(p/100 × n)의 행만 백분위마다 하나씩 UNION으로 읽는다.
+    반환: [{'key', 'count', 'mean_seconds', 'p50_seconds', ...}] (건수 내림차순)
+    """
+    field = GROUP_FIELDS.get(group_by)
+    partition = [F(field)] if field else []
+    queryset = filter_incidents(
+        Incident.objects.filter(
+            status__startswith=RESOLVED_STATUS_PREFIX, last_status_update__gte=F('registered_at'),
+        ),
+        filters,
+    ).annotate(
+        duration=ExpressionWrapper(F('last_status_update') - F('registered_at'), output_field=DurationField()),
+    ).annotate(
+        position=Window(RowNumber(), partition_by=partition, order_by=[F('duration').asc(), F('id').asc()]),
+        group_size=Window(Count('id'), partition_by=partition),
+        # MySQL/SQLite에서 duration 식은 마이크로초 정수이므로 평균은 실수(마이크로초)로 받는다
+        group_mean=Window(Avg('duration', output_field=FloatField()), partition_by=partition),
+    )
+
+    fields = ('group_key', 'position', 'group_size', 'group_mean', 'duration')
+    parts = [
+        queryset.annotate(group_key=F(field) if field else Value('all')).filter(
+            position=Ceil(Value(p) * F('group_size') / Value(100.0)),
+        ).values_list(*fields)
+        for p in percentiles
+    ]
+    rows = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+
+    results = {}
+    for key, position, size, mean, duration in rows:
+        entry = results.setdefault(key, {
+            'key': key if field else None,
+            'count': size,
+            'mean_seconds': round(mean / 1e6, 1),
+        })
+        for p in percentiles:
+            # 같은 위치에 여러 백분위가 걸릴 수 있으므로 위치로 다시 대응시킨다
+            if max(1, math.ceil(p * size / 100.0)) == position:
+                entry[f'p{p:g}_seconds'] = round(duration.total_seconds(), 1)
+    return sorted(results.values(), key=lambda entry: (-entry['count'], str(entry['key'])))
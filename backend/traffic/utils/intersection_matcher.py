@@ -0,0 +1,177 @@
+"""교차로 이름 매칭 공용 모듈 (incident / 교통량 엑셀 import 공용)
+
+교차로 이름을 도로 단위로 정규화해 '도로 토큰 → 교차로 id' 역색인을 한 번 만들고,
+"도로 A - 도로 B" 위치는 두 도로의 posting list 교집합으로 찾는다.
+오타는 토큰 단위 유사도(difflib)로 보정한다. 색인은 파일로 캐시되어
+교차로 테이블이 바뀌지 않는 한 명령어 실행 간에 재사용된다.
+"""
+import difflib
+import os
+import pickle
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.conf import settings
+
+from traffic.models import Intersection
+from traffic.utils.spatial import intersection_fingerprint
+
+# 엑셀 시트명 → 교차로 이름
+SHEET_TO_INTERSECTION = {
+    'Córdova': 'AV. BOLIVAR - AV. GRAL. CORDOVA',
+    'Sucre': 'AV. BOLIVAR - AV. ANTONIO JOSE DE SUCRE',
+    'Paseo de los Andes': 'AV. BOLIVAR - AV. PASEO DE LOS ANDES',
+    'Del Río': 'AV. BOLIVAR - AV. DEL RIO',
+    'Brasil': 'AV. BRASIL - AV. BOLIVAR',
+    'Garzón': 'AV. GRAL. GARZON - JR. HUSARES DE JUNIN',
+}
+
+ROAD_PREFIXES = ('AV', 'JR', 'CA', 'CL', 'ALAMEDA', 'PJE', 'PSJE', 'OV', 'PROL')
+STOPWORDS = {'DE', 'DEL', 'LA', 'LAS', 'LOS', 'EL', 'Y'}
+METADATA_RE = re.compile(r'(Distrito\s*:|C[oó]digo de Red\s*:|Red\s*:|Año|Instalado\s*:).*', re.IGNORECASE | re.DOTALL)
+PREFIX_RE = re.compile(r'^(?:%s)\b\.?\s*' % '|'.join(ROAD_PREFIXES))
+INDEX_VERSION = 1
+
+
+def strip_accents(text):
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def normalize_road(name):
+    """도로명 정규화: 부가정보/악센트/접두사(AV., JR. 등) 제거, 대문자, 공백 정리"""
+    if not name:
+        return ''
+    name = strip_accents(METADATA_RE.sub('', str(name))).upper()
+    name = re.sub(r'\s+', ' ', name).strip(' -')
+    return PREFIX_RE.sub('', name).strip()
+
+
+def split_roads(location):
+    """'ROAD A - ROAD B' 형식의 위치 문자열을 정규화된 도로명 목록으로 분리"""
+    if not location:
+        return []
+    location = METADATA_RE.sub('', str(location))
+    return [road for road in (normalize_road(part) for part in re.split(r'[-/]', location)) if road]
+
+
+def road_tokens(road):
+    return frozenset(t for t in re.findall(r'[A-Z0-9]+', road) if t not in STOPWORDS) or frozenset(road.split())
+
+
+class IntersectionIndex:
+    def __init__(self, rows, fingerprint=None, similarity_cutoff=0.8):
+        self.fingerprint = fingerprint
+        self.similarity_cutoff = similarity_cutoff
+        self.postings = {}        # 토큰 → 교차로 id 집합
+        self.token_counts = {}    # 교차로 id → 전체 토큰 수 (후보 중 가장 구체적인 것 선택용)
+        self.by_name = {}         # 정규화된 이름 키 → 교차로 id
+        for pk, name in rows:
+            roads = split_roads(name)
+            tokens = set()
+            for road in roads:
+                tokens |= road_tokens(road)
+            for token in tokens:
+                self.postings.setdefault(token, set()).add(pk)
+            self.token_counts[pk] = len(tokens)
+            self.by_name.setdefault(' - '.join(sorted(roads)), pk)
+        self.vocabulary = sorted(self.postings)
+
+    def __len__(self):
+        return len(self.token_counts)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_similar', None)
+        return state
+
+    def similar_token(self, token):
+        """색인에 없는 토큰을 가장 비슷한 색인 토큰으로 보정 (없으면 None)"""
+        cache = self.__dict__.setdefault('_similar', {})
+        if token not in cache:
+            matches = difflib.get_close_matches(token, self.vocabulary, n=1, cutoff=self.similarity_cutoff)
+            cache[token] = matches[0] if matches else None
+        return cache[token]
+
+    def road_candidates(self, road, fuzzy=True):
+        """도로명의 모든 토큰을 포함하는 교차로 id 집합 (posting list 교집합)"""
+        postings = []
+        for token in road_tokens(road):
+            posting = self.postings.get(token)
+            if posting is None and fuzzy:
+                similar = self.similar_token(token)
+                posting = self.postings.get(similar) if similar else None
+            if posting is None:
+                return set()
+            postings.append(posting)
+        if not postings:
+            return set()
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def match(self, location, fuzzy=True):
+        """'ROAD A - ROAD B' 위치에 해당하는 교차로 id (없으면 None)"""
+        roads = split_roads(location)
+        if len(roads) < 2:
+            return None
+        exact = self.by_name.get(' - '.join(sorted(roads)))
+        if exact is not None:
+            return exact
+
+        candidates = None
+        for road in roads:
+            road_ids = self.road_candidates(road, fuzzy=fuzzy)
+            candidates = road_ids if candidates is None else candidates & road_ids
+            if not candidates:
+                return None
+        return min(candidates, key=lambda pk: (self.token_counts[pk], pk))
+
+
+def _fingerprint():
+    count, max_id, updated = intersection_fingerprint()
+    return (INDEX_VERSION, count, max_id, updated.isoformat() if updated else None)
+
+
+def _cache_path():
+    default = os.path.join(settings.BASE_DIR, 'data', 'cache', 'intersection_index.pickle')
+    return getattr(settings, 'TRAFFIC_MATCHER_CACHE_PATH', default)
+
+
+@lru_cache(maxsize=1)
+def _load_cached(path, fingerprint):
+    try:
+        with open(path, 'rb') as f:
+            index = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    return index if getattr(index, 'fingerprint', None) == fingerprint else None
+
+
+def get_intersection_index(use_cache=True):
+    """현재 Intersection 테이블의 매칭 색인 (테이블이 바뀌지 않았으면 캐시 파일 재사용)
+
+    교차로 삭제 후 같은 수만큼 추가되는 경우까지 잡기 위해 (개수, 최대 id, 최근 수정 시각)을 지문으로 쓴다.
+    """
+    fingerprint = _fingerprint()
+    path = _cache_path()
+    if use_cache:
+        index = _load_cached(path, fingerprint)
+        if index is not None:
+            return index
+
+    index = IntersectionIndex(Intersection.objects.values_list('id', 'name').iterator(), fingerprint=fingerprint)
+    if use_cache:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            _load_cached.cache_clear()
+        except OSError:
+            pass
+    return index
@@ -0,0 +1,173 @@
+"""교차로 이름 정규화 엔진 (cleanup_intersections / fix_intersection_names 공용)
+
+이름 규칙(rule)은 원래 이름을 받아 새 이름(삭제 대상이면 None)을 돌려주는 함수다.
+전체 (id, name)을 한 번에 읽어 바뀌는 행만 골라내고, 적용은 bulk_update와
+일괄 삭제로 한 트랜잭션 안에서 처리한다. 정규화 후 이름이 같아지는 교차로는
+선택적으로 가장 오래된(id가 가장 작은) 교차로 하나로 병합한다.
+"""
+import re
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Exists, Max, Min, OuterRef
+from django.utils import timezone
+
+from traffic.models import (
+    DailyTrafficVolume, HourlyTrafficVolume, Incident, Intersection, TotalTrafficVolume, TrafficVolume,
+)
+from traffic.utils.aggregation import recompute_total_volumes
+from traffic.utils.bulk import chunked
+from traffic.utils.retention import refresh_rollups
+from traffic.utils.snapshot import refresh_latest_snapshots
+
+METADATA_RE = re.compile(r'(Distrito:.*|Codigo de Red:.*|Red:.*|Año.*|Instalado:.*)')
+ROAD_SPLIT_RE = re.compile(r'[-/]')
+
+# 병합 시 교차로 FK를 옮길 모델: (모델, 교차로 안에서의 고유 키, 충돌 시 합산할 필드)
+# 합산 필드가 없으면 충돌한 행은 남는 교차로의 값을 유지하고 나머지는 버린다.
+MERGE_MODELS = [
+    (TrafficVolume, ['datetime', 'direction'], []),
+    (HourlyTrafficVolume, ['datetime', 'direction'], ['volume', 'samples']),
+    (DailyTrafficVolume, ['datetime', 'direction'], ['volume', 'samples']),
+    (TotalTrafficVolume, ['datetime'], []),
+]
+
+
+def two_road_name(name):
+    """부가정보를 지우고 'A - B' 형태로 정리, 도로가 2개가 아니면 None (삭제 대상)"""
+    name = METADATA_RE.sub('', name).strip(' -')
+    roads = [road.strip() for road in ROAD_SPLIT_RE.split(' '.join(name.split())) if road.strip()]
+    if len(roads) != 2:
+        return None
+    return f'{roads[0]} - {roads[1]}'
+
+
+def strip_after_colon(name):
+    """':' 앞부분만 남김"""
+    return name.split(':')[0].strip() if ':' in name else name
+
+
+def merge_key(name):
+    return ' '.join(name.split()).upper()
+
+
+def plan_name_changes(rule, rows):
+    """(id, name) 목록에 규칙을 적용해 바뀌는 행만 반환
+
+    반환: (renames [(id, 기존, 새 이름)], deletes [(id, 기존)], final_names {id: 최종 이름})
+    """
+    renames, deletes, final_names = [], [], {}
+    for pk, name in rows:
+        new_name = rule(name)
+        if new_name is None:
+            deletes.append((pk, name))
+            continue
+        new_name = new_name[:100]
+        if new_name != name:
+            renames.append((pk, name, new_name))
+        final_names[pk] = new_name
+    return renames, deletes, final_names
+
+
+def plan_merges(final_names):
+    """정규화 후 이름이 같은 교차로 묶음 [(남길 id, [병합될 id...], 이름)]"""
+    groups = defaultdict(list)
+    for pk, name in final_names.items():
+        groups[merge_key(name)].append(pk)
+    merges = []
+    for pks in groups.values():
+        if len(pks) > 1:
+            survivor, *losers = sorted(pks)
+            merges.append((survivor, losers, final_names[survivor]))
+    return sorted(merges)
+
+
+def _move_rows(model, key_fields, sum_fields, loser_id, survivor_id, batch_size):
+    """loser 교차로의 행을 survivor로 옮기고 (충돌 수, 이동 수) 반환
+
+    MySQL은 같은 테이블을 참조하는 서브쿼리로 UPDATE/DELETE를 할 수 없으므로
+    충돌 행은 먼저 조회한 뒤 pk로 처리한다.
+    """
+    survivor_rows = model.objects.filter(intersection_id=survivor_id, **{f: OuterRef(f) for f in key_fields})
+    colliding = list(
+        model.objects.filter(intersection_id=loser_id).filter(Exists(survivor_rows)).values('pk', *key_fields, *sum_fields)
+    )
+
+    if sum_fields and colliding:
+        by_key = {tuple(row[f] for f in key_fields): row for row in colliding}
+        targets = []
+        for chunk in chunked(sorted({row['datetime'] for row in colliding}), batch_size):
+            for obj in model.objects.filter(intersection_id=survivor_id, datetime__in=chunk):
+                row = by_key.get(tuple(getattr(obj, f) for f in key_fields))
+                if row is not None:
+                    for f in sum_fields:
+                        setattr(obj, f, getattr(obj, f) + row[f])
+                    targets.append(obj)
+        model.objects.bulk_update(targets, sum_fields, batch_size=batch_size)
+
+    for chunk in chunked([row['pk'] for row in colliding], batch_size):
+        model.objects.filter(pk__in=chunk).delete()
+
+    changes = {'intersection_id': survivor_id}
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        # 증분 집계(updated_at 워터마크)가 옮겨진 원본을 다시 보도록 갱신
+        changes['updated_at'] = timezone.now()
+    moved = model.objects.filter(intersection_id=loser_id).update(**changes)
+    return len(colliding), moved
+
+
+def merge_intersections(merges, batch_size=5000):
+    """병합 묶음마다 FK를 남는 교차로로 옮기고, 파생 테이블을 다시 계산한 뒤 병합된 교차로를 삭제"""
+    stats = {'merged': 0, 'moved': defaultdict(int), 'dropped': defaultdict(int), 'incidents': 0}
+    survivors, losers = [], []
+    with transaction.atomic():
+        for survivor, group_losers, _ in merges:
+            survivors.append(survivor)
+            losers += group_losers
+            for loser in group_losers:
+                for model, key_fields, sum_fields in MERGE_MODELS:
+                    dropped, moved = _move_rows(model, key_fields, sum_fields, loser, survivor, batch_size)
+                    stats['dropped'][model.__name__] += dropped
+                    stats['moved'][model.__name__] += moved
+                stats['incidents'] += Incident.objects.filter(intersection_id=loser).update(intersection_id=survivor)
+
+        # 원본이 남아 있는 구간만 재계산 (보존 기간이 지난 구간의 롤업/합계는 그대로 둔다)
+        windows = [
+            (row['intersection_id'], row['first'], row['last'])
+            for row in TrafficVolume.objects.filter(intersection_id__in=survivors).values('intersection_id').annotate(
+                first=Min('datetime'), last=Max('datetime'),
+            ).order_by()
+        ]
+        if windows:
+            refresh_rollups(windows, batch_size=batch_size)
+            recompute_total_volumes(windows, batch_size=batch_size)
+
+        for chunk in chunked(losers, batch_size):
+            Intersection.objects.filter(pk__in=chunk).delete()
+        if survivors:
+            refresh_latest_snapshots(survivors)
+        stats['merged'] = len(losers)
+    return stats
+
+
+def normalize_intersection_names(rule, dry_run=False, merge_duplicates=False, batch_size=1000):
+    """규칙으로 교차로 이름을 정규화 (dry_run이면 계획만 계산)
+
+    반환: {'renames', 'deletes', 'merges', 'merge_stats'}
+    """
+    rows = Intersection.objects.order_by('id').values_list('id', 'name')
+    renames, deletes, final_names = plan_name_changes(rule, rows)
+    merges = plan_merges(final_names) if merge_duplicates else []
+    result = {'renames': renames, 'deletes': deletes, 'merges': merges, 'merge_stats': None}
+    if dry_run:
+        return result
+
+    with transaction.atomic():
+        now = timezone.now()
+        objs = [Intersection(pk=pk, name=new_name, updated_at=now) for pk, _, new_name in renames]
+        Intersection.objects.bulk_update(objs, ['name', 'updated_at'], batch_size=batch_size)
+        for chunk in chunked([pk for pk, _ in deletes], batch_size):
+            Intersection.objects.filter(pk__in=chunk).delete()
+        if merges:
+            result['merge_stats'] = merge_intersections(merges, batch_size=batch_size)
+    return result
@@ -1,52 +1,97 @@
-from lxml import etree
-from bs4 import BeautifulSoup
+"""신호등 네트워크 KML → 교차로 좌표 파서
+
+iterparse로 Placemark 단위로 읽고 처리한 요소는 바로 비워서, 파일 크기와 무관하게
+메모리 사용량이 일정하다. description의 HTML은 파싱하지 않고 정규식으로
+"RED SEMAFORICA" 값만 뽑는다.
+"""
+import html
+import logging
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def parse_kml_to_intersections(kml_path):
-    with open(kml_path, 'rb') as f:
-        tree = etree.parse(f)
+from lxml import etree
 
-    ns = {'kml': 'http://www.opengis.net/kml/2.2'}
-    placemarks = tree.findall('.//kml:Placemark', namespaces=ns)
+logger = logging.getLogger(__name__)
 
-    intersections = []
+RED_SEMAFORICA_RE = re.compile(r'RED SEMAFORICA:\s*(.*?)\s*(?:<br\s*/?>|\n|$)', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+NAME_MAX_LENGTH = 100
 
-    for placemark in placemarks:
-        name_el = placemark.find('kml:name', namespaces=ns)
-        description_el = placemark.find('kml:description', namespaces=ns)
-        coord_el = placemark.find('.//kml:coordinates', namespaces=ns)
 
-        if coord_el is None or coord_el.text is None:
-            continue
+def _road_name(name_text, description):
+    if description:
+        match = RED_SEMAFORICA_RE.search(description)
+        if match:
+            name = html.unescape(TAG_RE.sub('', match.group(1))).strip()
+            if name:
+                return name
+    return name_text.strip() if name_text and name_text.strip() else "Unnamed"
 
+
+def iter_placemarks(kml_path):
+    """Placemark마다 {'name', 'latitude', 'longitude'} dict를 yield"""
+    for _, placemark in etree.iterparse(kml_path, events=('end',), tag='{*}Placemark', huge_tree=True):
+        coordinates = placemark.findtext('.//{*}coordinates')
+        name_text = placemark.findtext('{*}name')
+        description = placemark.findtext('{*}description')
+
+        # 처리한 Placemark와 앞선 형제 요소를 비워 트리가 커지지 않게 한다
+        placemark.clear()
+        parent = placemark.getparent()
+        while placemark.getprevious() is not None:
+            del parent[0]
+
+        if not coordinates:
+            continue
         try:
-            coord_text = coord_el.text.strip()
-            lon, lat, *_ = map(float, coord_text.split(','))
-        except:
+            lon, lat, *_ = map(float, coordinates.strip().split(','))
+        except ValueError:
             continue
 
-        # ⛳ 안전하게 name 파싱
-        if name_el is not None and name_el.text:
-            road_name = name_el.text.strip()
-        else:
-            road_name = "Unnamed"
-
-        # ⛳ RED SEMAFORICA가 있으면 교체
-        if description_el is not None and description_el.text:
-            soup = BeautifulSoup(description_el.text, 'html.parser')
-            desc = soup.get_text()
-            match = re.search(r"RED SEMAFORICA: (.+)", desc)
-            if match:
-                road_name = match.group(1).strip()
-
-        # 도로 이름이 100자를 초과하지 않도록 제한
-        road_name = road_name[:100]
-
-        intersections.append({
-            "name": road_name,
+        yield {
+            "name": _road_name(name_text, description)[:NAME_MAX_LENGTH],
             "latitude": lat,
             "longitude": lon,
-        })
+        }
+
 
-    print(f"✅ 총 {len(intersections)}개 교차로 파싱 완료")
+def iter_intersection_batches(kml_path, batch_size=1000):
+    """iter_placemarks 결과를 batch_size개씩 묶어 yield"""
+    batch = []
+    for item in iter_placemarks(kml_path):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_kml_file(kml_path):
+    """프로세스 풀 작업 단위: 파일 하나를 끝까지 파싱해 리스트로 반환"""
+    return list(iter_placemarks(kml_path))
+
+
+def iter_kml_files(paths, workers=1, batch_size=1000):
+    """여러 KML 파일을 (path, batch) 단위로 yield
+
+    workers가 2 이상이면 파일별로 프로세스 풀에서 파싱하고, 끝난 파일부터 내보낸다.
+    """
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            for batch in iter_intersection_batches(path, batch_size):
+                yield path, batch
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        futures = {executor.submit(parse_kml_file, path): path for path in paths}
+        for future in as_completed(futures):
+            rows = future.result()
+            for start in range(0, len(rows), batch_size):
+                yield futures[future], rows[start:start + batch_size]
+
+
+def parse_kml_to_intersections(kml_path):
+    intersections = list(iter_placemarks(kml_path))
+    logger.info("총 %s개 교차로 파싱 완료", len(intersections))
     return intersections
@@ -0,0 +1,219 @@
+"""요청 처리 경로용 로깅: 백그라운드 기록, JSON 레코드, 샘플링/속도 제한, 페이로드 요약
+
+- BackgroundHandler: 레코드를 제한된 크기의 큐에 넣기만 하고, 실제 파일/콘솔 기록은
+  QueueListener 스레드가 한다. 큐가 가득 차면 요청을 막지 않고 버린 뒤 개수를 센다.
+- SamplingFilter / RateLimitFilter: 큐에 넣기 전에 logger별 비율 샘플링과
+  (logger, 메시지 템플릿)별 초당 건수 제한을 적용한다. WARNING 이상은 샘플링하지 않는다.
+  메시지 템플릿이 키이므로 값은 f-string이 아니라 %s 인자나 extra로 넘긴다.
+- JsonFormatter: 한 줄 JSON 레코드, logger.info(..., extra={...})의 필드를 함께 기록한다.
+- summarize: 응답/페이로드 전체 대신 크기와 건수만 남긴다.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone as dt_timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# LogRecord 기본 속성 (이 외의 속성은 extra로 넘어온 구조화 필드로 본다)
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_stats = {'dropped': 0, 'sampled_out': 0, 'rate_limited': 0}
+
+
+def log_stats():
+    """큐 초과로 버린 수, 샘플링/속도 제한으로 거른 수"""
+    return dict(_stats)
+
+
+def _level(level):
+    """'WARNING' 같은 레벨 이름 또는 숫자 → 숫자 레벨"""
+    if isinstance(level, int):
+        return level
+    levelno = logging.getLevelName(str(level).upper())
+    if not isinstance(levelno, int):
+        raise ValueError(f"알 수 없는 로그 레벨입니다: {level}")
+    return levelno
+
+
+def summarize(value):
+    """페이로드 요약: 목록/사전은 건수, 문자열/바이트는 크기"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f'bytes[{len(value)}]'
+    if isinstance(value, str):
+        return f'str[{len(value)}]'
+    if isinstance(value, dict):
+        return f'dict[{len(value)}]'
+    if isinstance(value, (list, tuple, set)):
+        return f'{type(value).__name__}[{len(value)}]'
+    return type(value).__name__
+
+
+class JsonFormatter(logging.Formatter):
+    """ts, level, logger, message (+ exc, extra 필드)를 한 줄 JSON으로 출력"""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, dt_timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """logger 이름(접두사)별 비율만 통과, rates 예: {'traffic.views': 0.1}
+
+    가장 긴 접두사 규칙을 쓰고, 규칙이 없으면 default 비율을 쓴다. level 이상은 항상 통과.
+    """
+
+    def __init__(self, rates=None, default=1.0, level='WARNING'):
+        super().__init__()
+        self.rates = sorted((rates or {}).items(), key=lambda item: -len(item[0]))
+        self.default = default
+        self.level = _level(level)
+        self._cache = {}
+
+    def _rate(self, name):
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = next(
+                (r for prefix, r in self.rates if name == prefix or name.startswith(prefix + '.')),
+                self.default,
+            )
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= self.level:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        _stats['sampled_out'] += 1
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """(logger, 메시지 템플릿)별 토큰 버킷: 초당 rate건, 최대 burst건까지 허용
+
+    제한으로 걸러진 건수는 다음에 통과하는 같은 종류 레코드의 suppressed 필드로 남긴다.
+    버킷은 최근에 쓴 max_keys개만 두고 가장 오래 안 쓴 것부터 버린다 (버려진 키는 다시 burst부터 시작).
+    """
+
+    def __init__(self, rate=10.0, burst=50, level='CRITICAL', max_keys=1000):
+        super().__init__()
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.level = _level(level)
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= self.level:
+            return True
+        key = (record.name, record.msg if isinstance(record.msg, str) else type(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, suppressed = self._buckets.get(key, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1.0:
+                self._set(key, (tokens, now, suppressed + 1))
+                _stats['rate_limited'] += 1
+                return False
+            self._set(key, (tokens - 1.0, now, 0))
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+    def _set(self, key, bucket):
+        self._buckets[key] = bucket
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+
+class BackgroundHandler(QueueHandler):
+    """target_logger에 붙은 핸들러로의 기록을 QueueListener 스레드에 맡기는 핸들러
+
+    대상 핸들러는 첫 기록 때 target_logger(LOGGING의 loggers에 정의, 직접 로깅하지 않는 logger)에서
+    가져오므로 LOGGING의 구성 순서와 무관하다.
+    리스너는 첫 기록 때 시작하며, fork된 워커(gunicorn 등)에서는 자기 리스너를 새로 띄운다.
+    프로세스 종료 시 큐에 남은 레코드를 모두 기록한다.
+    """
+
+    def __init__(self, target_logger, queue_size=10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.target_logger = target_logger
+        self.targets = None
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self.targets is None:
+                targets = list(logging.getLogger(self.target_logger).handlers)
+                if not targets:
+                    raise ValueError(f"대상 logger {self.target_logger!r}에 핸들러가 없습니다.")
+                self.targets = targets
+            if self._pid is not None:
+                # fork 전 부모의 큐/스레드는 쓸 수 없으므로 새로 만든다
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+            self.listener = QueueListener(self.queue, *self.targets, respect_handler_level=True)
+            self.listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """큐에 남은 레코드를 기록하고 리스너 종료"""
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+            self._pid = None
+
+    def prepare(self, record):
+        # 포맷은 대상 핸들러가 하도록 메시지 인자와 예외만 고정한다 (QueueHandler 기본 구현은 여기서 포맷함)
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _stats['dropped'] += 1
+
+    def emit(self, record):
+        try:
+            self._ensure_listener()
+        except Exception:
+            self.handleError(record)
+            return
+        super().emit(record)
+
+    def close(self):
+        self.stop()
+        super().close()
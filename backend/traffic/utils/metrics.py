@@ -0,0 +1,177 @@
+"""요청 단위 계측: 엔드포인트별 지연시간 히스토그램, SQL 쿼리 수/시간, 직렬화/렌더링 시간, 응답 크기
+
+값은 프로세스 메모리에 누적되며 /metrics에서 Prometheus 텍스트 형식으로 노출한다.
+(워커가 여러 개면 워커마다 따로 수집되므로 Prometheus에서 instance별로 합산한다)
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+# 현재 요청의 계측 값 (미들웨어가 설정, 없으면 계측하지 않음)
+current_request = ContextVar('traffic_request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_seconds', 'serialize_seconds', 'render_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.render_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper용: 쿼리 수/시간 누적"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.latency = {}
+        self.queries = {}
+        self.totals = {}
+
+    def record(self, labels, seconds, metrics, response_bytes):
+        with self._lock:
+            if labels not in self.latency:
+                self.latency[labels] = Histogram(LATENCY_BUCKETS)
+                self.queries[labels] = Histogram(QUERY_BUCKETS)
+                self.totals[labels] = {
+                    'db_seconds': 0.0, 'serialize_seconds': 0.0, 'render_seconds': 0.0, 'response_bytes': 0,
+                }
+            self.latency[labels].observe(seconds)
+            self.queries[labels].observe(metrics.queries)
+            totals = self.totals[labels]
+            totals['db_seconds'] += metrics.db_seconds
+            totals['serialize_seconds'] += metrics.serialize_seconds
+            totals['render_seconds'] += metrics.render_seconds
+            totals['response_bytes'] += response_bytes
+
+    def snapshot(self):
+        with self._lock:
+            return (
+                {k: (list(h.counts), h.sum, h.count) for k, h in self.latency.items()},
+                {k: (list(h.counts), h.sum, h.count) for k, h in self.queries.items()},
+                {k: dict(v) for k, v in self.totals.items()},
+            )
+
+
+registry = MetricsRegistry()
+
+
+class TimedSerializerMixin:
+    """serializer.data(모델 → 기본 타입 변환) 시간을 현재 요청 계측에 더하는 mixin
+
+    many=True로 쓰는 serializer는 Meta.list_serializer_class = TimedListSerializer도 지정한다.
+    """
+
+    @property
+    def data(self):
+        metrics = current_request.get()
+        if metrics is None:
+            return super().data
+        started = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            metrics.serialize_seconds += time.perf_counter() - started
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """응답 데이터를 JSON 바이트로 렌더링하는 시간을 현재 요청 계측에 더하는 렌더러"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        metrics = current_request.get()
+        if metrics is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            metrics.render_seconds += time.perf_counter() - started
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _histogram_lines(name, help_text, buckets, data, label_names):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for labels, (counts, total, count) in sorted(data.items()):
+        cumulative = 0
+        for bound, bucket_count in zip(buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{_labels(label_names, labels, [("le", bound)])} {cumulative}')
+        lines.append(f'{name}_bucket{_labels(label_names, labels, [("le", "+Inf")])} {count}')
+        lines.append(f'{name}_sum{_labels(label_names, labels)} {total}')
+        lines.append(f'{name}_count{_labels(label_names, labels)} {count}')
+    return lines
+
+
+LABEL_NAMES = ('view', 'method', 'status')
+
+
+def render_prometheus(extra=None):
+    """누적된 값을 Prometheus 텍스트 노출 형식(0.0.4)으로 변환
+
+    extra: 함께 노출할 단일 값 {이름: (counter|gauge, 설명, 값)}
+    """
+    latency, queries, totals = registry.snapshot()
+    lines = _histogram_lines(
+        'traffic_http_request_duration_seconds', '엔드포인트별 요청 처리 시간', LATENCY_BUCKETS, latency, LABEL_NAMES,
+    )
+    lines += _histogram_lines(
+        'traffic_http_db_queries', '요청당 SQL 쿼리 수', QUERY_BUCKETS, queries, LABEL_NAMES,
+    )
+    for field, help_text in (
+        ('db_seconds', '요청 처리 중 SQL 실행 시간 합계'),
+        ('serialize_seconds', 'serializer.data 직렬화 시간 합계'),
+        ('render_seconds', '응답 JSON 렌더링(인코딩) 시간 합계'),
+        ('response_bytes', '응답 본문 크기 합계 (스트리밍 제외)'),
+    ):
+        name = f'traffic_http_{field}_total'
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        lines += [f'{name}{_labels(LABEL_NAMES, labels)} {values[field]}' for labels, values in sorted(totals.items())]
+    for name, (metric_type, help_text, value) in (extra or {}).items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}', f'{name} {value}']
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,181 @@
+"""TrafficVolume/TotalTrafficVolume 월 단위 파티션 테이블 라우터
+
+기본 테이블(traffic_trafficvolume, total_traffic_volume)은 현재 파티션 역할을 하고,
+닫힌 달은 manage_traffic_partitions detach가 같은 스키마의 월 테이블(<기본 테이블>_YYYYMM)로 옮긴다.
+파티션 목록은 TrafficPartition에 기록되며, 시간 범위 조회는 partition_querysets로
+기본 테이블과 범위에 겹치는 월 테이블만 읽는다. 오래된 달은 테이블 단위로 아카이브 후 DROP 한다.
+
+월 테이블로 옮긴 달은 읽기 전용이다. 집계(recompute_total_volumes)와 API/엑셀 적재는
+기본 테이블만 쓰므로 ensure_writable로 분리된 달에 대한 쓰기를 막는다.
+"""
+import hashlib
+import heapq
+from datetime import datetime, time, timedelta
+
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from traffic.models import TotalTrafficVolume, TrafficPartition, TrafficVolume
+from traffic.utils.bulk import bulk_upsert
+
+# 기본 테이블 이름 → 파티션 대상 모델
+PARTITIONED_MODELS = {model._meta.db_table: model for model in (TrafficVolume, TotalTrafficVolume)}
+
+_partition_models = {}
+
+
+def month_start(dt):
+    """dt가 속한 달의 1일 00:00 (현지 시간)"""
+    return timezone.localtime(dt).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(start):
+    return (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def month_bounds(month):
+    """달(date, 1일) → [시작, 다음 달 시작) 현지 시간 구간"""
+    return (
+        timezone.make_aware(datetime.combine(month, time.min)),
+        timezone.make_aware(datetime.combine(next_month(month), time.min)),
+    )
+
+
+def partition_table(model, month):
+    return f"{model._meta.db_table}_{month:%Y%m}"
+
+
+def _clone_field(field):
+    """월 테이블용 필드 복제: FK 제약/역참조 없이 컬럼만, auto_now 값은 원본 그대로 보존"""
+    name, path, args, kwargs = field.deconstruct()
+    kwargs.pop('auto_now', None)
+    kwargs.pop('auto_now_add', None)
+    if field.is_relation:
+        kwargs.update(on_delete=models.DO_NOTHING, related_name='+', db_constraint=False)
+    return type(field)(*args, **kwargs)
+
+
+def partition_model(model, month):
+    """month 파티션 테이블에 매핑된 모델 클래스 (프로세스 안에서 캐시)
+
+    managed=False라 마이그레이션 대상이 아니며, 테이블은 create_partition이 만든다.
+    """
+    table = partition_table(model, month)
+    if table not in _partition_models:
+        # 인덱스/제약 이름은 DB 전체에서 유일해야 하므로 테이블 이름 해시로 만든다
+        digest = hashlib.md5(table.encode()).hexdigest()[:10]
+        meta = type('Meta', (), {
+            'app_label': model._meta.app_label,
+            'db_table': table,
+            'managed': False,
+            'indexes': [
+                models.Index(fields=index.fields, name=f'p{digest}_i{i}')
+                for i, index in enumerate(model._meta.indexes)
+            ],
+            'constraints': [
+                models.UniqueConstraint(fields=constraint.fields, name=f'p{digest}_u{i}')
+                for i, constraint in enumerate(model._meta.constraints)
+            ],
+        })
+        attrs = {'__module__': __name__, 'Meta': meta}
+        for field in model._meta.local_fields:
+            attrs[field.name] = _clone_field(field)
+        _partition_models[table] = type(f'{model.__name__}{month:%Y%m}', (models.Model,), attrs)
+    return _partition_models[table]
+
+
+def partitions(model, start=None, end=None, detached_only=False):
+    """[start, end]와 겹치는 model의 TrafficPartition 목록 (월 순)"""
+    queryset = TrafficPartition.objects.filter(base_table=model._meta.db_table)
+    if start is not None:
+        queryset = queryset.filter(month__gte=month_start(start).date())
+    if end is not None:
+        queryset = queryset.filter(month__lte=timezone.localtime(end).date())
+    if detached_only:
+        queryset = queryset.filter(detached_at__isnull=False)
+    return list(queryset.order_by('month'))
+
+
+def partition_querysets(model, start=None, end=None):
+    """[start, end] 범위를 읽는 데 필요한 queryset 목록: 기본 테이블 + 범위와 겹치는 분리된 월 테이블
+
+    호출 측은 각 queryset에 같은 필터를 걸고 결과를 합친다 (분리된 달은 기본 테이블에 행이 없다).
+    """
+    querysets = [model.objects.all()]
+    for partition in partitions(model, start, end, detached_only=True):
+        querysets.append(partition_model(model, partition.month).objects.all())
+    return querysets
+
+
+def merge_sorted(querysets, chunk_size=10000):
+    """같은 정렬 키로 정렬된 values_list queryset들을 한 스트림으로 병합"""
+    if len(querysets) == 1:
+        return querysets[0].iterator(chunk_size=chunk_size)
+    return heapq.merge(*(queryset.iterator(chunk_size=chunk_size) for queryset in querysets))
+
+
+def ensure_writable(start, end):
+    """[start, end]가 월 테이블로 분리된 달에 걸치면 ValueError (분리된 달은 읽기 전용)"""
+    detached = [p for model in PARTITIONED_MODELS.values() for p in partitions(model, start, end, detached_only=True)]
+    if detached:
+        raise ValueError(
+            f"{detached[0].month:%Y-%m}은(는) 월 파티션으로 분리되어 읽기 전용입니다. "
+            f"(분리된 파티션: {', '.join(p.db_table for p in detached)})"
+        )
+
+
+def create_partition(model, month):
+    """month 파티션 테이블과 TrafficPartition 행을 만든다 (이미 있으면 그대로 반환)
+
+    MySQL에서 DDL은 암묵적으로 커밋되므로 트랜잭션 안에서 호출하지 않는다.
+    """
+    partition, created = TrafficPartition.objects.get_or_create(
+        base_table=model._meta.db_table, month=month,
+        defaults={'db_table': partition_table(model, month)},
+    )
+    if partition.db_table not in connection.introspection.table_names():
+        with connection.schema_editor() as editor:
+            editor.create_model(partition_model(model, month))
+    return partition, created
+
+
+def detach_partition(model, month, batch_size=10000):
+    """기본 테이블의 month 행을 월 테이블로 옮기고 옮긴 건수 반환
+
+    배치마다 같은 트랜잭션에서 upsert와 삭제를 하므로 각 행은 항상 한쪽 테이블에만 있다.
+    분리 후 기본 테이블에 다시 들어온 같은 달의 행도 다시 실행하면 옮겨진다.
+    """
+    partition, _ = create_partition(model, month)
+    if partition.detached_at is None:
+        partition.detached_at = timezone.now()
+        partition.save(update_fields=['detached_at'])
+
+    target = partition_model(model, month)
+    constraint = model._meta.constraints[0]
+    unique_fields = list(constraint.fields)
+    fields = [f.attname for f in model._meta.concrete_fields if not f.primary_key]
+    update_fields = [f.name for f in model._meta.concrete_fields if not f.primary_key and f.name not in unique_fields]
+    start, end = month_bounds(month)
+    source = model.objects.filter(datetime__gte=start, datetime__lt=end)
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(source.order_by('id').values_list('id', *fields)[:batch_size])
+            if not rows:
+                return moved
+            bulk_upsert(
+                target, (target(**dict(zip(fields, row[1:]))) for row in rows),
+                unique_fields=unique_fields, update_fields=update_fields, batch_size=batch_size,
+            )
+            model.objects.filter(id__in=[row[0] for row in rows]).delete()
+        moved += len(rows)
+
+
+def drop_partition(partition):
+    """월 테이블을 DROP 하고 TrafficPartition 행 삭제 (아카이브는 호출 측에서 먼저)"""
+    model = PARTITIONED_MODELS[partition.base_table]
+    if partition.db_table in connection.introspection.table_names():
+        with connection.schema_editor() as editor:
+            editor.delete_model(partition_model(model, partition.month))
+    partition.delete()
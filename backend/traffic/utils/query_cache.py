@@ -0,0 +1,194 @@
+"""시간 범위 조회 결과 read-through 캐시
+
+값은 (namespace, scope, 윈도우, 추가 키)로 저장한다. scope는 데이터 소유 단위(예: 교차로 id)다.
+- 프로세스 내부 LRU(TRAFFIC_QUERY_CACHE_LOCAL_SIZE개) 뒤에 공유 캐시(TRAFFIC_QUERY_CACHE_ALIAS)를 둔다.
+- 이미 끝난 윈도우는 바뀌지 않는 값으로 보고 오래 보관하고, 현재 열린 슬롯을 포함하는
+  윈도우는 TRAFFIC_QUERY_CACHE_OPEN_TIMEOUT초만 보관한다.
+- 무효화는 키를 지우지 않고 (scope, 월) 단위 세대(generation) 값을 바꾼다. 캐시 키에 윈도우가 걸친
+  월들의 세대가 들어가므로, 쓰기 작업은 자기가 건드린 월에 걸친 윈도우만 무효화한다.
+- 세대 값은 TRAFFIC_QUERY_CACHE_ALIAS 캐시에 있다. Redis/Memcached처럼 프로세스 간에 공유되는
+  캐시여야 관리 명령(calculate_total_traffic, recompute_speeds, import_*) 같은 다른 프로세스의
+  쓰기가 다음 조회부터 반영된다. LocMemCache처럼 프로세스 로컬이면 다른 프로세스의 무효화가
+  보이지 않으므로 끝난 윈도우도 열린 윈도우와 같은 시간만 보관한다 (traffic.W001 경고).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+from traffic.utils.aggregation import floor_to_slot
+
+GENERATION_PREFIX = 'traffic:qc:gen'
+VALUE_PREFIX = 'traffic:qc:val'
+# 도시 전체(모든 교차로) 결과의 scope, 어느 교차로가 바뀌어도 함께 무효화된다
+ALL_INTERSECTIONS = '*'
+# 이보다 많은 월에 걸친 윈도우/무효화는 월 단위 대신 scope 전체 세대를 쓴다
+MAX_MONTH_SPAN = 24
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _shared_cache():
+    return caches[_setting('TRAFFIC_QUERY_CACHE_ALIAS', 'default')]
+
+
+def shared_cache_is_process_local():
+    """세대 값을 둔 캐시가 다른 프로세스와 공유되지 않는지 (LocMemCache)"""
+    return isinstance(_shared_cache(), LocMemCache)
+
+
+def _months(start, end):
+    """start~end가 걸친 (연, 월) 목록, 범위가 없거나 너무 길면 None"""
+    if start is None or end is None:
+        return None
+    start, end = timezone.localtime(start), timezone.localtime(end)
+    first, last = start.year * 12 + start.month - 1, end.year * 12 + end.month - 1
+    if last < first or last - first >= MAX_MONTH_SPAN:
+        return None
+    return [divmod(m, 12) for m in range(first, last + 1)]
+
+
+def _generation_keys(scope, months):
+    # epoch: 범위를 모르는 무효화용, all: 월 단위로 나타낼 수 없는 윈도우용
+    keys = [f'{GENERATION_PREFIX}:{scope}:epoch']
+    if months is None:
+        keys.append(f'{GENERATION_PREFIX}:{scope}:all')
+    else:
+        keys += [f'{GENERATION_PREFIX}:{scope}:{year}{month + 1:02d}' for year, month in months]
+    return keys
+
+
+def _scope_generation_keys(scope, months):
+    """scope가 list/tuple이면 여러 scope에 걸친 값 (어느 하나라도 무효화되면 무효)"""
+    if isinstance(scope, (list, tuple)):
+        return [key for item in scope for key in _generation_keys(item, months)]
+    return _generation_keys(scope, months)
+
+
+def _new_generation():
+    # 캐시에서 세대 키가 밀려나도 이전 값과 겹치지 않도록 증가값 대신 시각을 쓴다
+    return time.time_ns()
+
+
+def is_open_window(end):
+    """end가 없거나 현재 진행 중인 15분 슬롯 이후면 아직 값이 바뀔 수 있는 윈도우"""
+    return end is None or end >= floor_to_slot(timezone.now())
+
+
+def window_timeout(end):
+    """윈도우 보관 시간(초): 열린 윈도우는 짧게, 끝난 윈도우는 공유 캐시일 때만 길게"""
+    open_timeout = _setting('TRAFFIC_QUERY_CACHE_OPEN_TIMEOUT', 15)
+    if is_open_window(end) or shared_cache_is_process_local():
+        return open_timeout
+    return _setting('TRAFFIC_QUERY_CACHE_CLOSED_TIMEOUT', 86400)
+
+
+class LocalLRU:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, value, timeout):
+        if self.max_size <= 0:
+            return
+        expires = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local = LocalLRU(_setting('TRAFFIC_QUERY_CACHE_LOCAL_SIZE', 512))
+_stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+
+def _current_generations(keys):
+    cache = _shared_cache()
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, _new_generation(), None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def cached_window(namespace, scope, start, end, compute, key=()):
+    """(namespace, scope, start~end, key)의 결과를 캐시에서 찾고 없으면 compute()로 계산
+
+    scope에 목록을 주면 그 중 하나라도 무효화될 때 함께 무효화된다.
+    compute가 None을 반환하면(예: 대상 없음) 캐시하지 않는다.
+    반환된 값은 캐시와 공유되므로 호출 측에서 수정하지 않는다.
+    """
+    generations = _current_generations(_scope_generation_keys(scope, _months(start, end)))
+    raw = repr((namespace, scope, start and start.isoformat(), end and end.isoformat(), key, generations))
+    cache_key = f'{VALUE_PREFIX}:{namespace}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+    entry = _local.get(cache_key)
+    if entry is not None:
+        _stats['local_hits'] += 1
+        return entry[1]
+
+    timeout = window_timeout(end)
+    cache = _shared_cache()
+    value = cache.get(cache_key)
+    if value is not None:
+        _stats['shared_hits'] += 1
+    else:
+        _stats['misses'] += 1
+        value = compute()
+        if value is None:
+            return None
+        cache.set(cache_key, value, timeout)
+    _local.set(cache_key, value, timeout)
+    return value
+
+
+def invalidate_windows(scopes, start=None, end=None):
+    """scope들의 start~end에 걸친 캐시 윈도우 무효화 (범위가 없으면 scope 전체)"""
+    months = _months(start, end)
+    values = {}
+    for scope in scopes:
+        if months is None:
+            values[f'{GENERATION_PREFIX}:{scope}:epoch'] = _new_generation()
+        else:
+            for key in _generation_keys(scope, months)[1:]:
+                values[key] = _new_generation()
+            values[f'{GENERATION_PREFIX}:{scope}:all'] = _new_generation()
+    if values:
+        _shared_cache().set_many(values, None)
+
+
+def cache_stats():
+    return dict(_stats, local_entries=len(_local))
+
+
+def clear_local_cache():
+    _local.clear()
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from django.utils import timezone
+
+
+def parse_datetime_param(value, name='time'):
+    """ISO 8601 문자열을 aware datetime으로 변환 (없으면 None)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError as e:
+        raise ValueError(f"{name} 시간 형식이 잘못되었습니다: {str(e)}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_bbox(value):
+    """'min_lon,min_lat,max_lon,max_lat' 형식의 bbox 파라미터 파싱 (없으면 None)"""
+    if not value:
+        return None
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in value.split(','))
+    except ValueError:
+        raise ValueError("bbox는 'min_lon,min_lat,max_lon,max_lat' 형식이어야 합니다.")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox의 최소값이 최대값보다 큽니다.")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def filter_bbox(queryset, bbox, prefix=''):
+    """위경도 bbox로 queryset 필터링 (prefix로 관계 필드 지정, 예: 'intersection__')"""
+    if bbox is None:
+        return queryset
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return queryset.filter(**{
+        f'{prefix}latitude__range': (min_lat, max_lat),
+        f'{prefix}longitude__range': (min_lon, max_lon),
+    })
+
+
+def filter_time_window(queryset, start_time, end_time, field='datetime'):
+    """시작/종료 시간(포함)으로 queryset 필터링, 한쪽만 주어져도 동작"""
+    if start_time and end_time:
+        return queryset.filter(**{f'{field}__range': (start_time, end_time)})
+    if start_time:
+        return queryset.filter(**{f'{field}__gte': start_time})
+    if end_time:
+        return queryset.filter(**{f'{field}__lte': end_time})
+    return queryset
+
+
+def parse_id_list(value, name='ids'):
+    """'1,2,3' 형식의 정수 id 목록 파싱 (없으면 빈 리스트)"""
+    if not value:
+        return []
+    try:
+        return [int(v) for v in value.split(',') if v.strip()]
+    except ValueError:
+        raise ValueError(f"{name}는 쉼표로 구분된 정수 목록이어야 합니다.")
+
+
+def parse_float_param(value, name, default=None, min_value=None, max_value=None):
+    """실수 파라미터 파싱 (없으면 default), 범위를 벗어나면 ValueError"""
+    if value in (None, ''):
+        return default
+    try:
+        parsed = float(value)
+    except ValueError:
+        raise ValueError(f"{name}는 숫자여야 합니다.")
+    if (min_value is not None and parsed < min_value) or (max_value is not None and parsed > max_value):
+        raise ValueError(f"{name}는 {min_value}~{max_value} 범위여야 합니다.")
+    return parsed
+
+
+def parse_point(lat, lon):
+    """lat/lon 파라미터 쌍 파싱, 둘 다 필요"""
+    if lat in (None, '') or lon in (None, ''):
+        raise ValueError("lat와 lon 파라미터가 필요합니다.")
+    return parse_float_param(lat, 'lat', min_value=-90, max_value=90), parse_float_param(lon, 'lon', min_value=-180, max_value=180)
@@ -0,0 +1,177 @@
+"""TotalTrafficVolume 슬롯/Incident 변경을 브로커 이벤트로 변환해 발행"""
+import asyncio
+import logging
+import threading
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from traffic.models import Incident, LatestTrafficSnapshot
+from traffic.utils.broker import InProcessBroker, get_broker
+from traffic.utils.bulk import chunked
+
+logger = logging.getLogger(__name__)
+_encoder = JSONEncoder(ensure_ascii=False)
+
+# 폴링 시 다시 확인하는 범위: 늦게 커밋된 스냅샷(updated_at)과 사고(id)를 놓치지 않기 위함 (중복은 걸러낸다)
+POLL_OVERLAP = timedelta(seconds=30)
+INCIDENT_ID_OVERLAP = 100
+
+
+def slot_events(snapshots):
+    """LatestTrafficSnapshot queryset → 'slots' 이벤트 목록"""
+    rows = snapshots.values(
+        'intersection_id', 'intersection__name', 'intersection__latitude', 'intersection__longitude',
+        'datetime', 'total_volume', 'average_speed',
+    )
+    return [{
+        'intersection_id': row['intersection_id'],
+        'name': row['intersection__name'],
+        'latitude': row['intersection__latitude'],
+        'longitude': row['intersection__longitude'],
+        'datetime': timezone.localtime(row['datetime']),
+        'total_volume': row['total_volume'],
+        'average_speed': row['average_speed'],
+    } for row in rows]
+
+
+def incident_events(incidents):
+    """Incident queryset → 'incidents' 이벤트 목록 (교차로 좌표 포함)"""
+    rows = incidents.values(
+        'id', 'ticket_number', 'incident_type', 'location_name', 'district', 'status', 'registered_at',
+        'intersection_id', 'intersection__latitude', 'intersection__longitude',
+    )
+    return [{
+        'id': row['id'],
+        'ticket_number': row['ticket_number'],
+        'incident_type': row['incident_type'],
+        'location_name': row['location_name'],
+        'district': row['district'],
+        'status': row['status'],
+        'registered_at': timezone.localtime(row['registered_at']),
+        'intersection_id': row['intersection_id'],
+        'latitude': row['intersection__latitude'],
+        'longitude': row['intersection__longitude'],
+    } for row in rows]
+
+
+def publish_slot_events(intersection_ids, batch_size=1000):
+    """갱신된 교차로의 최신 슬롯을 'slots' 채널로 발행"""
+    broker = get_broker()
+    if not broker.subscriber_count():
+        return 0
+    delivered = 0
+    for id_chunk in chunked(sorted(intersection_ids), batch_size):
+        events = slot_events(LatestTrafficSnapshot.objects.filter(intersection_id__in=id_chunk))
+        delivered += broker.publish('slots', events)
+    return delivered
+
+
+def publish_incident_events(incident_ids, batch_size=1000):
+    """새 Incident를 'incidents' 채널로 발행"""
+    broker = get_broker()
+    if not broker.subscriber_count():
+        return 0
+    delivered = 0
+    for id_chunk in chunked(incident_ids, batch_size):
+        delivered += broker.publish('incidents', incident_events(Incident.objects.filter(pk__in=id_chunk)))
+    return delivered
+
+
+class DatabasePollingBroker(InProcessBroker):
+    """다른 프로세스의 변경을 DB 폴링으로 받아 이 워커의 구독자에게 전달하는 브로커
+
+    calculate_total_traffic/recompute_speeds/import_incidents 같은 관리 명령은 별도
+    프로세스라 구독자가 없어 발행하지 않는다. 구독자가 있는 동안 ASGI 워커의 이벤트
+    루프에서 TRAFFIC_STREAM_POLL_INTERVAL초마다 LatestTrafficSnapshot.updated_at과
+    Incident.id를 확인해 새 슬롯/사고를 발행하고, 같은 프로세스 signal 발행과 겹친
+    이벤트는 한 번만 보낸다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.interval = getattr(settings, 'TRAFFIC_STREAM_POLL_INTERVAL', 2)
+        self._task = None
+        self._state_lock = threading.Lock()
+        self._since = None
+        self._last_incident_id = None
+        self._sent_slots = {}  # intersection_id → 마지막으로 보낸 (datetime, total_volume, average_speed)
+        self._sent_incidents = set()
+
+    def subscribe(self, **filters):
+        subscription = super().subscribe(**filters)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._poll_loop())
+        return subscription
+
+    async def _poll_loop(self):
+        poll = sync_to_async(self.poll)
+        while True:
+            # DB 장애 등으로 한 번 실패해도 구독자가 있는 동안은 다음 주기에 다시 폴링한다
+            try:
+                await poll()
+            except Exception:
+                logger.exception('실시간 이벤트 DB 폴링 실패')
+            if not self.subscriber_count():
+                break
+            await asyncio.sleep(self.interval)
+        # 구독자가 없는 동안의 변경은 보내지 않는다 (다음 구독 때 현재 시점부터 다시 시작)
+        self._since = None
+
+    def poll(self):
+        """마지막 확인 이후 바뀐 스냅샷과 새 사고를 발행 (첫 호출은 기준 시점만 기록), 전달 건수 반환"""
+        now = timezone.now()
+        if self._since is None:
+            # 구독 전의 변경은 보내지 않도록 겹침 범위 안의 현재 상태를 보낸 것으로 기록
+            self._since = now
+            self._last_incident_id = Incident.objects.aggregate(last=Max('id'))['last'] or 0
+            recent = LatestTrafficSnapshot.objects.filter(updated_at__gt=now - POLL_OVERLAP)
+            with self._state_lock:
+                self._sent_slots.update(
+                    (row[0], tuple(row[1:])) for row in
+                    recent.values_list('intersection_id', 'datetime', 'total_volume', 'average_speed')
+                )
+                self._sent_incidents = set(Incident.objects.filter(
+                    id__gt=self._last_incident_id - INCIDENT_ID_OVERLAP,
+                ).values_list('id', flat=True))
+            return 0
+        since, self._since = self._since, now
+        delivered = 0
+        snapshots = LatestTrafficSnapshot.objects.filter(updated_at__gt=since - POLL_OVERLAP).order_by('intersection_id')
+        for events in chunked(slot_events(snapshots), 1000):
+            delivered += self.publish('slots', events)
+
+        floor = self._last_incident_id - INCIDENT_ID_OVERLAP
+        events = incident_events(Incident.objects.filter(id__gt=floor).order_by('id'))
+        if events:
+            self._last_incident_id = max(self._last_incident_id, events[-1]['id'])
+        with self._state_lock:
+            self._sent_incidents = {pk for pk in self._sent_incidents if pk > floor}
+        delivered += self.publish('incidents', events)
+        return delivered
+
+    def _is_new(self, channel, event):
+        if channel == 'slots':
+            key = (event.get('datetime'), event.get('total_volume'), event.get('average_speed'))
+            if self._sent_slots.get(event.get('intersection_id'), ()) == key:
+                return False
+            self._sent_slots[event.get('intersection_id')] = key
+        elif channel == 'incidents':
+            if event.get('id') in self._sent_incidents:
+                return False
+            self._sent_incidents.add(event.get('id'))
+        return True
+
+    def publish(self, channel, events):
+        with self._state_lock:
+            events = [event for event in events if self._is_new(channel, event)]
+        return super().publish(channel, events) if events else 0
+
+
+def format_sse(channel, event):
+    return f"event: {channel}\ndata: {_encoder.encode(event)}\n\n"
@@ -0,0 +1,184 @@
+"""TrafficVolume 보존 정책: 시간/일 단위 롤업 생성과 만료된 원본(기본 테이블 행, 월 파티션)의 아카이브/삭제"""
+import csv
+import gzip
+import os
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from traffic.models import DailyTrafficVolume, HourlyTrafficVolume, TrafficVolume
+from traffic.utils.bulk import bulk_upsert
+from traffic.utils.partitions import drop_partition, month_bounds, partition_model, partitions
+
+# (롤업 모델, DB truncate 함수, 버킷 경계 내림 함수, 버킷 길이)
+ROLLUP_TIERS = [
+    (HourlyTrafficVolume, TruncHour, lambda dt: dt.replace(minute=0, second=0, microsecond=0), timedelta(hours=1)),
+    (DailyTrafficVolume, TruncDay, lambda dt: dt.replace(hour=0, minute=0, second=0, microsecond=0), timedelta(days=1)),
+]
+
+# manage_traffic_retention의 진행 상태 (ProcessingCheckpoint.name)
+ROLLUP_CHECKPOINT = 'traffic_rollups'
+RETENTION_CHECKPOINT = 'traffic_retention'
+
+ARCHIVE_FIELDS = ['id', 'intersection_id', 'datetime', 'direction', 'volume', 'is_simulated', 'created_at', 'updated_at']
+
+
+def start_of_day(dt):
+    return timezone.localtime(dt).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def month_ranges(start, end):
+    """[start, end) 구간을 현지 시간 기준 월 단위 구간으로 분할"""
+    current = timezone.localtime(start)
+    end = timezone.localtime(end)
+    while current < end:
+        if current.month == 12:
+            next_month = current.replace(year=current.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        else:
+            next_month = current.replace(month=current.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        yield current, min(next_month, end)
+        current = next_month
+
+
+def _bucket_q(windows, floor, length, floor_limit=None):
+    """(intersection_id, start, end) 윈도우를 버킷 경계로 넓힌 Q 조건
+
+    floor_limit 이전 구간은 원본이 이미 만료되어 부분 합계가 되므로 제외한다.
+    """
+    q = Q()
+    for intersection_id, start, end in windows:
+        cond = Q()
+        if intersection_id is not None:
+            cond &= Q(intersection_id=intersection_id)
+        if start is not None:
+            start = floor(timezone.localtime(start))
+        if floor_limit is not None and (start is None or start < floor_limit):
+            start = floor_limit
+        if start is not None:
+            cond &= Q(datetime__gte=start)
+        if end is not None:
+            cond &= Q(datetime__lt=floor(timezone.localtime(end)) + length)
+        if not cond:
+            return Q()
+        q |= cond
+    return q
+
+
+def refresh_rollups(windows, expired_before=None, batch_size=5000):
+    """윈도우에 걸친 시간/일 롤업 버킷을 원본 TrafficVolume에서 다시 집계해 upsert"""
+    counts = {}
+    with transaction.atomic():
+        for model, trunc, floor, length in ROLLUP_TIERS:
+            q = _bucket_q(windows, floor, length, expired_before)
+            rows = TrafficVolume.objects.filter(q, is_simulated=False).annotate(
+                bucket=trunc('datetime'),
+            ).values('intersection_id', 'bucket', 'direction').annotate(
+                volume_sum=Sum('volume'), samples=Count('id'),
+            ).order_by()
+
+            objs = (
+                model(
+                    intersection_id=row['intersection_id'],
+                    datetime=row['bucket'],
+                    direction=row['direction'],
+                    volume=row['volume_sum'],
+                    samples=row['samples'],
+                )
+                for row in rows.iterator(chunk_size=batch_size)
+            )
+            counts[model.__name__] = bulk_upsert(
+                model, objs,
+                unique_fields=['intersection', 'datetime', 'direction'],
+                update_fields=['volume', 'samples'],
+                batch_size=batch_size,
+            )
+    return counts
+
+
+def archive_rows(queryset, path, fields=ARCHIVE_FIELDS):
+    """queryset 행을 gzip CSV로 저장하고 저장 건수 반환"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    count = 0
+    with gzip.open(path, 'wt', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for row in queryset.values_list(*fields).order_by('id').iterator(chunk_size=10000):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def delete_in_batches(queryset, batch_size=10000):
+    """큰 범위 삭제를 batch_size 단위 트랜잭션으로 나눠 잠금 시간을 제한"""
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('id', flat=True).order_by('id')[:batch_size])
+        if not ids:
+            return deleted
+        deleted += queryset.model.objects.filter(id__in=ids).delete()[0]
+
+
+def expire_raw_volumes(before, oldest=None, archive_dir=None, batch_size=10000, dry_run=False):
+    """before 이전의 기본 테이블 원본 TrafficVolume을 월 단위로 롤업 → (선택) 아카이브 → 삭제
+
+    월 파티션으로 분리되지 않은 달의 행을 대상으로 하며 배치 DELETE로 지운다.
+    분리된 달은 expire_partitions가 테이블째 지운다.
+    반환값: [(월 시작, 롤업 건수, 아카이브 건수, 삭제 건수), ...]
+    """
+    if oldest is None:
+        first = TrafficVolume.objects.filter(datetime__lt=before).order_by('datetime').values_list('datetime', flat=True).first()
+        if first is None:
+            return []
+        oldest = start_of_day(first).replace(day=1)
+
+    results = []
+    for month_start, month_end in month_ranges(oldest, before):
+        month_qs = TrafficVolume.objects.filter(datetime__gte=month_start, datetime__lt=month_end)
+        if not month_qs.exists():
+            continue
+        if dry_run:
+            results.append((month_start, 0, 0, month_qs.count()))
+            continue
+
+        rolled = refresh_rollups([(None, month_start, month_end - timedelta(microseconds=1))], batch_size=batch_size)
+        archived = 0
+        if archive_dir:
+            last_day = month_end - timedelta(microseconds=1)
+            path = os.path.join(archive_dir, f"traffic_volume_{month_start:%Y%m%d}-{last_day:%Y%m%d}.csv.gz")
+            archived = archive_rows(month_qs, path)
+
+        deleted = delete_in_batches(month_qs, batch_size)
+        results.append((month_start, sum(rolled.values()), archived, deleted))
+    return results
+
+
+def expire_partitions(model, before, archive_dir=None, dry_run=False):
+    """before 이전에 끝나는 model의 월 파티션을 (선택) 아카이브 후 테이블째 DROP
+
+    행 단위 DELETE 없이 월 테이블을 지우므로 기본 테이블 잠금과 undo 로그가 생기지 않는다.
+    반환값: [(TrafficPartition, 아카이브 건수, 행 수), ...]
+    """
+    results = []
+    for partition in partitions(model, end=before):
+        if month_bounds(partition.month)[1] > before:
+            continue
+        rows = partition_model(model, partition.month).objects.all()
+        count = rows.count()
+        if dry_run:
+            results.append((partition, 0, count))
+            continue
+        archived = 0
+        if archive_dir:
+            fields = [f.attname for f in model._meta.concrete_fields]
+            archived = archive_rows(rows, os.path.join(archive_dir, f"{partition.db_table}.csv.gz"), fields)
+        drop_partition(partition)
+        results.append((partition, archived, count))
+    return results
+
+
+def expire_rollups(model, before, batch_size=10000):
+    """before 이전 롤업 행 삭제"""
+    return delete_in_batches(model.objects.filter(datetime__lt=before), batch_size)
@@ -0,0 +1,113 @@
+"""latest_volume API용 최신 슬롯 스냅샷 (테이블 + 직렬화 결과 캐시)"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from traffic.models import LatestTrafficSnapshot, TotalTrafficVolume
+from traffic.utils.bulk import bulk_upsert, chunked
+
+CACHE_KEY = 'traffic:latest_snapshot'
+
+# 버전이 같으면 같은 프로세스 안에서는 캐시 백엔드 왕복(역직렬화)도 생략
+_local = {'version': None, 'payload': None}
+
+
+def refresh_latest_snapshots(intersection_ids=None, batch_size=1000):
+    """지정한 교차로(None이면 전체)의 최신 TotalTrafficVolume 슬롯으로 스냅샷 갱신 후 캐시 무효화"""
+    latest = TotalTrafficVolume.objects.filter(
+        intersection_id=OuterRef('intersection_id')
+    ).order_by('-datetime').values('datetime')[:1]
+
+    id_chunks = [None] if intersection_ids is None else chunked(sorted(intersection_ids), batch_size)
+    with transaction.atomic():
+        for id_chunk in id_chunks:
+            totals = TotalTrafficVolume.objects.filter(datetime=Subquery(latest))
+            snapshots = LatestTrafficSnapshot.objects.all()
+            if id_chunk is not None:
+                totals = totals.filter(intersection_id__in=id_chunk)
+                snapshots = snapshots.filter(intersection_id__in=id_chunk)
+
+            rows = list(totals.values('intersection_id', 'datetime', 'total_volume', 'average_speed'))
+            bulk_upsert(
+                LatestTrafficSnapshot,
+                [LatestTrafficSnapshot(**row) for row in rows],
+                unique_fields=['intersection'],
+                update_fields=['datetime', 'total_volume', 'average_speed', 'updated_at'],
+                batch_size=batch_size,
+            )
+            # 더 이상 슬롯이 없는 교차로의 스냅샷 제거
+            snapshots.exclude(intersection_id__in=[row['intersection_id'] for row in rows]).delete()
+
+    invalidate_snapshot_cache()
+
+
+def invalidate_snapshot_cache():
+    cache.delete(CACHE_KEY)
+    _local['version'] = None
+
+
+def snapshot_version():
+    """스냅샷 테이블의 현재 상태 (마지막 갱신 시각, 행 수)
+
+    다른 프로세스(집계 명령)의 갱신/삭제도 반영된다. 한 쿼리로 합치면 MAX가 인덱스 끝만 읽는
+    최적화가 꺼져 전체를 스캔하므로 updated_at 인덱스 MAX와 COUNT를 따로 조회한다.
+    """
+    updated = LatestTrafficSnapshot.objects.aggregate(updated=Max('updated_at'))['updated']
+    return updated, LatestTrafficSnapshot.objects.count()
+
+
+def build_snapshot_payload(version=None):
+    """스냅샷 테이블 전체를 JSON 바이트로 직렬화하고 ETag/Last-Modified 계산
+
+    version은 직렬화 전에 읽은 snapshot_version() (그 사이 갱신되면 다음 요청에서 다시 만든다)
+    """
+    rows = LatestTrafficSnapshot.objects.order_by('intersection_id').values_list(
+        'intersection_id', 'intersection__name', 'intersection__latitude', 'intersection__longitude',
+        'total_volume', 'average_speed', 'datetime', 'updated_at',
+    )
+    data = []
+    last_modified = None
+    for pk, name, lat, lon, total_volume, average_speed, dt, updated_at in rows:
+        data.append({
+            "id": pk,
+            "name": name,
+            "latitude": lat,
+            "longitude": lon,
+            "total_volume": total_volume,
+            "average_speed": average_speed,
+            "datetime": timezone.localtime(dt),
+        })
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+
+    body = JSONEncoder(ensure_ascii=False).encode(data).encode('utf-8')
+    return {
+        'version': version,
+        'body': body,
+        'etag': '"%s"' % hashlib.md5(body).hexdigest(),
+        'last_modified': (last_modified or timezone.now()).timestamp(),
+    }
+
+
+def get_snapshot_payload():
+    """캐시된 스냅샷 응답 반환 (프로세스 로컬 → 공유 캐시 → DB 순서)
+
+    요청마다 snapshot_version()을 확인해 캐시된 응답의 버전과 다르면 버리고 다시 만든다.
+    작성자가 다른 프로세스이거나 캐시가 프로세스 로컬(LocMemCache)이어도 갱신 즉시 반영된다.
+    """
+    version = snapshot_version()
+    if _local['version'] == version:
+        return _local['payload']
+
+    payload = cache.get(CACHE_KEY)
+    if payload is None or payload['version'] != version:
+        payload = build_snapshot_payload(version)
+        cache.set(CACHE_KEY, payload, getattr(settings, 'TRAFFIC_SNAPSHOT_CACHE_TIMEOUT', 300))
+
+    _local.update(version=version, payload=payload)
+    return payload
@@ -0,0 +1,139 @@
+"""교차로 좌표 격자 색인 (반경/bbox/최근접 조회)
+
+좌표를 cell_size 도(degree) 격자로 나눠 셀별 점 목록을 두고, 조회 시 겹치는 셀의
+후보만 NumPy로 정확히 거리 계산한다. 색인은 프로세스마다 메모리에 한 번 만들고
+Intersection 저장/삭제 시그널과 주기적 지문(fingerprint) 확인으로 갱신한다.
+"""
+import math
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+
+from traffic.models import Intersection
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = 111320.0
+
+
+def haversine_m(lat, lon, lats, lons):
+    """한 점과 여러 점 사이의 대원 거리(m)"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class GridIndex:
+    def __init__(self, ids, lats, lons, cell_size=0.01, fingerprint=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_size = cell_size
+        self.fingerprint = fingerprint
+
+        rows = np.floor(self.lats / cell_size).astype(np.int64)
+        cols = np.floor(self.lons / cell_size).astype(np.int64)
+        order = np.lexsort((cols, rows))
+        self.cells = {}
+        if len(order):
+            keys = np.stack([rows[order], cols[order]], axis=1)
+            boundaries = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for chunk in np.split(order, boundaries):
+                self.cells[(int(rows[chunk[0]]), int(cols[chunk[0]]))] = chunk
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _candidates(self, min_lat, min_lon, max_lat, max_lon):
+        r0, r1 = math.floor(min_lat / self.cell_size), math.floor(max_lat / self.cell_size)
+        c0, c1 = math.floor(min_lon / self.cell_size), math.floor(max_lon / self.cell_size)
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self.cells):
+            # 셀을 하나씩 보는 것보다 점유된 셀만 훑는 편이 빠른 넓은 범위
+            chunks = [idx for (r, c), idx in self.cells.items() if r0 <= r <= r1 and c0 <= c <= c1]
+        else:
+            chunks = [
+                self.cells[(r, c)] for r in range(r0, r1 + 1) for c in range(c0, c1 + 1) if (r, c) in self.cells
+            ]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    def within(self, bbox):
+        """bbox(min_lon, min_lat, max_lon, max_lat) 안의 교차로 id 배열"""
+        min_lon, min_lat, max_lon, max_lat = bbox
+        idx = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        mask = (
+            (self.lats[idx] >= min_lat) & (self.lats[idx] <= max_lat)
+            & (self.lons[idx] >= min_lon) & (self.lons[idx] <= max_lon)
+        )
+        return self.ids[idx[mask]]
+
+    def nearby(self, lat, lon, radius_m, limit=None):
+        """반경 radius_m 안의 (교차로 id 배열, 거리 배열), 가까운 순"""
+        dlat = radius_m / METERS_PER_DEGREE
+        dlon = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        idx = self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+        distances = haversine_m(lat, lon, self.lats[idx], self.lons[idx])
+        mask = distances <= radius_m
+        idx, distances = idx[mask], distances[mask]
+        order = np.argsort(distances, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return self.ids[idx[order]], distances[order]
+
+    def nearest(self, lat, lon, max_radius_m=5000):
+        """가장 가까운 교차로 (id, 거리) 또는 None, 반경을 두 배씩 넓혀 가며 찾는다"""
+        radius = self.cell_size * METERS_PER_DEGREE / 2
+        while True:
+            ids, distances = self.nearby(lat, lon, min(radius, max_radius_m), limit=1)
+            if len(ids):
+                return int(ids[0]), float(distances[0])
+            if radius >= max_radius_m:
+                return None
+            radius *= 2
+
+
+_state = {'index': None, 'checked': 0.0}
+_lock = threading.Lock()
+
+
+def intersection_fingerprint():
+    stats = Intersection.objects.aggregate(count=Count('id'), max_id=Max('id'), updated=Max('updated_at'))
+    return stats['count'], stats['max_id'], stats['updated']
+
+
+def build_spatial_index(fingerprint=None):
+    rows = np.array(list(Intersection.objects.values_list('id', 'latitude', 'longitude')), dtype=np.float64).reshape(-1, 3)
+    return GridIndex(
+        rows[:, 0], rows[:, 1], rows[:, 2],
+        cell_size=getattr(settings, 'TRAFFIC_SPATIAL_CELL_SIZE', 0.01),
+        fingerprint=fingerprint,
+    )
+
+
+def get_spatial_index():
+    """프로세스 공유 격자 색인
+
+    같은 프로세스의 저장/삭제는 시그널로 즉시 무효화되고, 다른 프로세스나 bulk 작업의
+    변경은 TRAFFIC_SPATIAL_INDEX_CHECK_INTERVAL초마다 지문을 비교해 반영한다.
+    """
+    now = time.monotonic()
+    index = _state['index']
+    if index is not None and now - _state['checked'] < getattr(settings, 'TRAFFIC_SPATIAL_INDEX_CHECK_INTERVAL', 30):
+        return index
+
+    with _lock:
+        index = _state['index']
+        if index is not None and now - _state['checked'] < getattr(settings, 'TRAFFIC_SPATIAL_INDEX_CHECK_INTERVAL', 30):
+            return index
+        fingerprint = intersection_fingerprint()
+        if index is None or index.fingerprint != fingerprint:
+            index = build_spatial_index(fingerprint)
+            _state['index'] = index
+        _state['checked'] = now
+        return index
+
+
+def invalidate_spatial_index():
+    _state['index'] = None
@@ -2,139 +2,414 @@ from django.shortcuts import render
 from rest_framework import viewsets
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
-from django.db.models import Sum, Avg, OuterRef, Subquery
-from .models import Intersection, TrafficVolume, TotalTrafficVolume, Incident
-from .serializers import IntersectionSerializer, TotalTrafficVolumeSerializer, TrafficVolumeSerializer, IncidentSerializer
+from django.db.models import Sum, Max
+from .models import Intersection, TrafficVolume, TotalTrafficVolume, LatestTrafficSnapshot, Incident, IncidentImpact, IntersectionHealth
+from .models import TrafficBaseline
+from .serializers import IntersectionSerializer, TrafficVolumeSerializer, TrafficBucketSerializer, IncidentSerializer
+from .serializers import IntersectionHealthSerializer, IncidentImpactSerializer
+from .pagination import KeysetPagination
 import logging
-import sys
-from datetime import datetime, timedelta
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 from django.utils import timezone
-
-# 로깅 설정 수정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('django_log.txt', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)  # 콘솔에도 출력
-    ]
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.utils.encoders import JSONEncoder
+from collections import defaultdict
+from .utils.query_params import (
+    parse_bbox, parse_datetime_param, parse_id_list, parse_float_param, parse_point, filter_bbox, filter_time_window,
+)
+from .utils.export import EXPORT_FORMATS, iter_export
+from .utils.partitions import partition_querysets
+from .utils.snapshot import get_snapshot_payload
+from .utils.broker import CHANNELS, get_broker
+from .utils.realtime import format_sse
+from .utils.spatial import get_spatial_index
+from .utils.query_cache import ALL_INTERSECTIONS, cache_stats, cached_window
+from .utils.metrics import render_prometheus
+from .utils.log import log_stats, summarize
+from .utils.incident_stats import (
+    COUNT_GROUPS, INCIDENT_SCOPE, filter_incidents, filter_key, incident_counts, parse_group_by,
+    parse_incident_filters, parse_percentiles, resolution_percentiles,
+)
+from .utils.aggregation import SLOT, floor_to_slot, recompute_total_volumes
+from .utils.baselines import baseline_profile, find_anomalies, get_baseline_store
+from .utils.forecast import DEFAULT_HORIZON, MAX_HORIZON, forecast_intersection, latest_observation, parse_method
+from .utils.downsample import (
+    bucket_direction_volumes, bucket_totals, bucket_totals_by_intersection, downsample_rows, parse_downsample,
+    parse_granularity,
 )
+
+# 핸들러/포맷은 settings.LOGGING (traffic.utils.log.BackgroundHandler)에서 설정한다
 logger = logging.getLogger(__name__)
 
 # Create your views here.
 
+# TrafficVolumeViewSet ?stream= 값 (1과 ndjson은 같은 형식)
+STREAM_FORMATS = ('1', 'ndjson', 'json')
+
+
 class IntersectionViewSet(viewsets.ModelViewSet):
     queryset = Intersection.objects.all()
     serializer_class = IntersectionSerializer
 
     def list(self, request, *args, **kwargs):
-        logger.info("교차로 목록 요청 받음")
         queryset = self.get_queryset()
-        logger.info(f"조회된 교차로 수: {queryset.count()}")
         serializer = self.get_serializer(queryset, many=True)
-        #logger.info(f"직렬화된 데이터: {serializer.data}")
-        return Response(serializer.data)
+        data = serializer.data
+        logger.info("교차로 목록 조회", extra={'payload': summarize(data)})
+        return Response(data)
 
     @action(detail=False, methods=['get'])
     def map_data(self, request):
-        """지도 표시용 교차로 데이터"""
-        try:
-            intersections = Intersection.objects.all()
-            logger.info(f"Found {intersections.count()} intersections")
-            
-            data = []
-            for intersection in intersections:
-                traffic_volumes = TrafficVolume.objects.filter(
-                    intersection=intersection
-                ).values('direction').annotate(
+        """지도 표시용 교차로 데이터
+
+        bbox(min_lon,min_lat,max_lon,max_lat)와 start_time/end_time으로 범위를 제한할 수 있다.
+        교차로 조회 1회 + 교차로/방향별 GROUP BY 집계(월 파티션이 없으면 1회)로 처리한다.
+        """
+        try:
+            bbox = parse_bbox(request.query_params.get('bbox'))
+            start_time = parse_datetime_param(request.query_params.get('start_time'), 'start_time')
+            end_time = parse_datetime_param(request.query_params.get('end_time'), 'end_time')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        try:
+            intersections = filter_bbox(Intersection.objects.all(), bbox).values(
+                'id', 'name', 'latitude', 'longitude'
+            )
+
+            # 기본 테이블과 조회 범위에 겹치는 월 파티션마다 교차로/방향별 GROUP BY 1회
+            totals = defaultdict(int)
+            for queryset in partition_querysets(TrafficVolume, start_time, end_time):
+                volumes = filter_time_window(
+                    filter_bbox(queryset.filter(is_simulated=False), bbox, prefix='intersection__'),
+                    start_time, end_time,
+                ).values('intersection_id', 'direction').annotate(
                     total_volume=Sum('volume')
-                )
-                
-                intersection_data = {
-                    'id': intersection.id,
-                    'name': intersection.name,
-                    'latitude': float(intersection.latitude),
-                    'longitude': float(intersection.longitude),
-                    'traffic_volumes': list(traffic_volumes)
-                }
-                data.append(intersection_data)
-                logger.info(f"Processed intersection {intersection.id}")
-            
+                ).order_by()
+                for row in volumes:
+                    totals[row['intersection_id'], row['direction']] += row['total_volume']
+
+            volumes_by_intersection = defaultdict(list)
+            for (intersection_id, direction), total_volume in sorted(totals.items()):
+                volumes_by_intersection[intersection_id].append({
+                    'direction': direction,
+                    'total_volume': total_volume,
+                })
+
+            data = [{
+                'id': inter['id'],
+                'name': inter['name'],
+                'latitude': float(inter['latitude']),
+                'longitude': float(inter['longitude']),
+                'traffic_volumes': volumes_by_intersection.get(inter['id'], []),
+            } for inter in intersections]
+            logger.info("map_data 조회", extra={'intersections': len(data), 'volume_rows': len(totals)})
+
             return Response(data)
         except Exception as e:
-            logger.error(f"Error in map_data: {str(e)}")
+            logger.error("Error in map_data: %s", e)
             return Response({"error": str(e)}, status=500)
 
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """반경 내 교차로 (가까운 순, distance_m 포함)
+
+        ?lat=&lon=&radius=(m, 기본 500, 최대 50000)&limit=(기본 50, 최대 1000)
+        """
+        try:
+            lat, lon = parse_point(request.query_params.get('lat'), request.query_params.get('lon'))
+            radius = parse_float_param(request.query_params.get('radius'), 'radius', 500, 0, 50000)
+            limit = int(parse_float_param(request.query_params.get('limit'), 'limit', 50, 1, 1000))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        ids, distances = get_spatial_index().nearby(lat, lon, radius, limit)
+        rows = Intersection.objects.in_bulk(ids.tolist())
+        data = []
+        for intersection_id, distance in zip(ids.tolist(), distances.tolist()):
+            if intersection_id in rows:
+                item = IntersectionSerializer(rows[intersection_id]).data
+                item['distance_m'] = round(distance, 1)
+                data.append(item)
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def nearest(self, request):
+        """가장 가까운 교차로 1개 (사고 위치 등 좌표 → 교차로 매핑용)
+
+        ?lat=&lon=&max_radius=(m, 기본 5000)
+        """
+        try:
+            lat, lon = parse_point(request.query_params.get('lat'), request.query_params.get('lon'))
+            max_radius = parse_float_param(request.query_params.get('max_radius'), 'max_radius', 5000, 0, 50000)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        found = get_spatial_index().nearest(lat, lon, max_radius)
+        intersection = found and Intersection.objects.filter(pk=found[0]).first()
+        if not intersection:
+            return Response({'error': '반경 내 교차로가 없습니다.'}, status=404)
+        data = IntersectionSerializer(intersection).data
+        data['distance_m'] = round(found[1], 1)
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def within(self, request):
+        """bbox(min_lon,min_lat,max_lon,max_lat) 안의 교차로"""
+        try:
+            bbox = parse_bbox(request.query_params.get('bbox'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        if bbox is None:
+            return Response({'error': 'bbox 파라미터가 필요합니다.'}, status=400)
+
+        ids = get_spatial_index().within(bbox)
+        queryset = Intersection.objects.filter(pk__in=ids.tolist())
+        return Response(IntersectionSerializer(queryset, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def health(self, request):
+        """사고 영향 기반 건강 점수 순위 (compute_incident_impact가 갱신)
+
+        ?order=worst|best(기본 worst: 점수 낮은 순)&limit=(기본 50, 최대 1000)&bbox=
+        """
+        try:
+            order = request.query_params.get('order') or 'worst'
+            if order not in ('worst', 'best'):
+                raise ValueError("order는 worst, best 중 하나여야 합니다.")
+            limit = int(parse_float_param(request.query_params.get('limit'), 'limit', 50, 1, 1000))
+            bbox = parse_bbox(request.query_params.get('bbox'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        queryset = filter_bbox(IntersectionHealth.objects.select_related('intersection'), bbox, prefix='intersection__')
+        queryset = queryset.order_by('score' if order == 'worst' else '-score', 'intersection_id')[:limit]
+        return Response(IntersectionHealthSerializer(queryset, many=True).data)
+
     @action(detail=True, methods=['get'])
-    def traffic_volumes(self, request, pk=None):
-        """특정 교차로의 교통량 데이터"""
+    def incident_impacts(self, request, pk=None):
+        """교차로의 사고별 영향 구간 교통량/속도와 기준선 (최근 순, start_time/end_time 필터)"""
+        try:
+            start_time = parse_datetime_param(request.query_params.get('start_time'), 'start_time')
+            end_time = parse_datetime_param(request.query_params.get('end_time'), 'end_time')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         intersection = self.get_object()
-        traffic_volumes = TrafficVolume.objects.filter(intersection=intersection)
-        serializer = TrafficVolumeSerializer(traffic_volumes, many=True)
-        return Response(serializer.data)
-    
+        queryset = filter_time_window(
+            IncidentImpact.objects.filter(intersection=intersection).select_related('incident'),
+            start_time, end_time, field='window_start',
+        ).order_by('-window_start')
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(IncidentImpactSerializer(page, many=True).data)
+
     @action(detail=True, methods=['get'])
-    def total_volumes(self, request, pk=None):
-        """특정 교차로의 총 교통량 및 평균 속도 데이터"""
+    def baseline(self, request, pk=None):
+        """교차로의 요일×15분 슬롯 교통량 기준선 (update_traffic_baselines가 갱신)
+
+        ?weekday=1~7(1=월, 없으면 전체 요일), 슬롯마다 median/mad/samples 배열(96개)
+        """
+        try:
+            weekday = request.query_params.get('weekday')
+            weekday = int(parse_float_param(weekday, 'weekday', 1, 1, 7)) - 1 if weekday else None
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         intersection = self.get_object()
-        total_volumes = TotalTrafficVolume.objects.filter(intersection=intersection).order_by("datetime")
-        serializer = TotalTrafficVolumeSerializer(total_volumes, many=True)
-        return Response(serializer.data)
+        baseline = TrafficBaseline.objects.filter(intersection=intersection).first()
+        if baseline is None:
+            return Response({'error': "기준선이 아직 계산되지 않았습니다."}, status=404)
+        return Response({
+            'intersection_id': intersection.pk,
+            'weeks': baseline.weeks,
+            'updated_at': baseline.updated_at,
+            'slot_minutes': SLOT.seconds // 60,
+            'days': baseline_profile(baseline, weekday),
+        })
 
-    @action(detail=False, methods=['get'])
-    def latest_volume(self, request):
-        """통행량 데이터가 존재하는 교차로들의 최신 TotalTrafficVolume만 모아 반환"""
-        try:
-            # Subquery로 각 교차로의 최신 TotalTrafficVolume 1개 추출
-            latest_qs = TotalTrafficVolume.objects.filter(
-                intersection=OuterRef('pk')
-            ).order_by('-datetime')
-
-            # annotate로 최신 총량/속도/시간을 각 교차로에 붙임
-            intersections = Intersection.objects.annotate(
-                latest_volume=Subquery(latest_qs.values('total_volume')[:1]),
-                latest_speed=Subquery(latest_qs.values('average_speed')[:1]),
-                latest_time=Subquery(latest_qs.values('datetime')[:1])
-            ).filter(
-                latest_volume__isnull=False  # 통행량 데이터가 있는 교차로만 필터링
+    @action(detail=True, methods=['get'])
+    def forecast(self, request, pk=None):
+        """마지막 관측 슬롯 이후 방향별 15분 교통량 예측
+
+        기본: forecast_traffic이 저장한 예측(is_simulated=True), horizon으로 슬롯 수 제한
+        ?live=1&method=seasonal_naive|ewm|regression&horizon=(기본 8, 최대 96): 저장하지 않고 바로 예측
+        """
+        params = request.query_params
+        try:
+            live = params.get('live') in ('1', 'true')
+            method = parse_method(params.get('method'))
+            horizon = int(parse_float_param(params.get('horizon'), 'horizon', DEFAULT_HORIZON, 1, MAX_HORIZON))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        intersection = self.get_object()
+
+        if live:
+            origin, forecasts = forecast_intersection(intersection.pk, horizon, method)
+        else:
+            method = None
+            origin = latest_observation([intersection.pk])
+            forecasts = TrafficVolume.objects.filter(intersection=intersection, is_simulated=True)
+            if origin is not None:
+                forecasts = forecasts.filter(datetime__gt=origin, datetime__lte=origin + SLOT * horizon)
+            forecasts = list(forecasts.order_by('datetime', 'direction').values('direction', 'datetime', 'volume'))
+        return Response({
+            'intersection_id': intersection.pk,
+            'origin': origin and timezone.localtime(origin),
+            'method': method,
+            'live': live,
+            'forecasts': [dict(row, datetime=timezone.localtime(row['datetime'])) for row in forecasts],
+        })
+
+    @action(detail=True, methods=['get'])
+    def traffic_volumes(self, request, pk=None):
+        """특정 교차로의 교통량 데이터
+
+        granularity=15m|1h|1d|1w를 주면 방향별 버킷 합계(롤업 테이블 우선)를 반환하고,
+        start_time/end_time, max_points(방향별), downsample=lttb|minmax를 함께 쓸 수 있다.
+        """
+        params = request.query_params
+        if 'granularity' not in params:
+            intersection = self.get_object()
+            traffic_volumes = TrafficVolume.objects.filter(intersection=intersection)
+            serializer = TrafficVolumeSerializer(traffic_volumes, many=True)
+            return Response(serializer.data)
+
+        try:
+            granularity = parse_granularity(params.get('granularity'))
+            max_points, method = parse_downsample(params.get('max_points'), params.get('downsample'))
+            start_time = parse_datetime_param(params.get('start_time'), 'start_time')
+            end_time = parse_datetime_param(params.get('end_time'), 'end_time')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        def compute():
+            intersection = self.get_object()
+            rows = bucket_direction_volumes(intersection.pk, start_time, end_time, granularity)
+            by_direction = defaultdict(list)
+            for row in rows:
+                by_direction[row['direction']].append(row)
+            rows = sorted(
+                (row for direction_rows in by_direction.values()
+                 for row in downsample_rows(direction_rows, max_points, method, value_field='volume')),
+                key=lambda row: (row['datetime'], row['direction']),
             )
+            return [dict(row) for row in TrafficBucketSerializer(rows, many=True).data]
 
-            data = []
-            for inter in intersections:
-                data.append({
-                    "id": inter.id,
-                    "name": inter.name,
-                    "latitude": inter.latitude,
-                    "longitude": inter.longitude,
-                    "total_volume": inter.latest_volume,
-                    "average_speed": inter.latest_speed,
-                    "datetime": inter.latest_time,
-                })
+        key = ('direction', granularity, max_points, method)
+        return Response(cached_window('traffic_volumes', pk, start_time, end_time, compute, key=key))
 
-            return Response(data)
+    @action(detail=True, methods=['get'])
+    def total_volumes(self, request, pk=None):
+        """특정 교차로의 총 교통량 및 평균 속도 데이터 (조회 결과 캐시)
+
+        start_time/end_time, granularity=15m|1h|1d|1w, max_points, downsample=lttb|minmax 선택
+        """
+        params = request.query_params
+        try:
+            granularity = parse_granularity(params.get('granularity'))
+            max_points, method = parse_downsample(params.get('max_points'), params.get('downsample'))
+            start_time = parse_datetime_param(params.get('start_time'), 'start_time')
+            end_time = parse_datetime_param(params.get('end_time'), 'end_time')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        def compute():
+            intersection = self.get_object()
+            total_volumes = [
+                filter_time_window(queryset.filter(intersection_id=intersection.pk), start_time, end_time)
+                for queryset in partition_querysets(TotalTrafficVolume, start_time, end_time)
+            ]
+            rows = downsample_rows(bucket_totals(total_volumes, granularity), max_points, method)
+            return [dict(row) for row in TrafficBucketSerializer(rows, many=True).data]
+
+        key = (granularity, max_points, method)
+        return Response(cached_window('total_volumes', pk, start_time, end_time, compute, key=key))
+
+    @action(detail=False, methods=['get'])
+    def latest_volume(self, request):
+        """통행량 데이터가 존재하는 교차로들의 최신 TotalTrafficVolume만 모아 반환
+
+        집계 작업이 갱신하는 LatestTrafficSnapshot을 직렬화해 캐시해 두고,
+        ETag/Last-Modified가 같으면 304로 응답한다.
+        """
+        try:
+            payload = get_snapshot_payload()
+            not_modified = get_conditional_response(
+                request, etag=payload['etag'], last_modified=int(payload['last_modified'])
+            )
+            response = not_modified or HttpResponse(payload['body'], content_type='application/json')
+            response['ETag'] = payload['etag']
+            response['Last-Modified'] = http_date(payload['last_modified'])
+            response['Cache-Control'] = 'no-cache'
+            return response
 
         except Exception as e:
-            logger.error(f"latest_volume API 오류: {str(e)}", exc_info=True)
+            logger.error("latest_volume API 오류: %s", e, exc_info=True)
             return Response({"error": str(e)}, status=500)
-    
 
 
     
 class TrafficVolumeViewSet(viewsets.ModelViewSet):
     queryset = TrafficVolume.objects.all()
     serializer_class = TrafficVolumeSerializer
+    pagination_class = KeysetPagination
 
     def list(self, request, *args, **kwargs):
-        logger.info("교통량 데이터 요청 받음")
-        queryset = self.get_queryset()
-        logger.info(f"조회된 교통량 데이터 수: {queryset.count()}")
-        serializer = self.get_serializer(queryset, many=True)
-        logger.info(f"직렬화된 데이터: {serializer.data}")
-        return Response(serializer.data)
+        """교통량 목록: 기본은 키셋 커서 페이지, ?stream=1(ndjson) 또는 ?stream=json이면 전체를 스트리밍"""
+        stream = request.query_params.get('stream')
+        if stream is None:
+            return super().list(request, *args, **kwargs)
+        if stream not in STREAM_FORMATS:
+            return Response({'error': f"stream은 {', '.join(STREAM_FORMATS)} 중 하나여야 합니다."}, status=400)
+        return self.stream_list(request, stream)
+
+    def stream_list(self, request, stream):
+        """StreamingHttpResponse로 행 단위 직렬화 (메모리 사용량은 chunk_size에만 비례)"""
+        queryset = self.filter_queryset(self.get_queryset()).order_by('-datetime', '-id')
+        try:
+            chunk_size = max(1, min(int(request.query_params.get('chunk_size', 2000)), 10000))
+        except ValueError:
+            return Response({'error': 'chunk_size는 정수여야 합니다.'}, status=400)
+        serializer = self.get_serializer()
+        encoder = JSONEncoder(ensure_ascii=False)
+
+        def rows():
+            for obj in queryset.iterator(chunk_size=chunk_size):
+                yield encoder.encode(serializer.to_representation(obj))
+
+        if stream == 'json':
+            def body():
+                yield '['
+                for i, row in enumerate(rows()):
+                    yield row if i == 0 else ',' + row
+                yield ']'
+            content_type = 'application/json'
+        else:
+            def body():
+                for row in rows():
+                    yield row + '\n'
+            content_type = 'application/x-ndjson'
+
+        logger.info("교통량 스트리밍 요청", extra={'content_type': content_type, 'chunk_size': chunk_size})
+        return StreamingHttpResponse(body(), content_type=content_type)
+
+    def perform_update(self, serializer):
+        # 교차로/시각이 바뀌면 원래 슬롯은 updated_at 증분 집계에 잡히지 않으므로 바로 다시 집계
+        previous = (serializer.instance.intersection_id, serializer.instance.datetime)
+        super().perform_update(serializer)
+        if previous != (serializer.instance.intersection_id, serializer.instance.datetime):
+            recompute_total_volumes([(previous[0], previous[1], previous[1])])
+
+    def perform_destroy(self, instance):
+        # 삭제는 updated_at 증분 집계로 감지할 수 없으므로 해당 슬롯을 바로 다시 집계
+        window = (instance.intersection_id, instance.datetime, instance.datetime)
+        super().perform_destroy(instance)
+        recompute_total_volumes([window])
 
     def get_queryset(self):
-        queryset = TrafficVolume.objects.all()
+        queryset = TrafficVolume.objects.select_related('intersection')
         intersection_id = self.request.query_params.get('intersection', None)
         if intersection_id:
             queryset = queryset.filter(intersection_id=intersection_id)
@@ -142,100 +417,355 @@ class TrafficVolumeViewSet(viewsets.ModelViewSet):
 
 @api_view(['GET'])
 def get_intersection_traffic_data(request, intersection_id):
-    print(f"API 호출됨 - 교차로 ID: {intersection_id}")  # 콘솔에 즉시 출력
-    logger.info(f"교차로 교통 데이터 요청 받음 - 교차로 ID: {intersection_id}")
-    
+    """교차로의 start_time~end_time 합계/평균 속도 (조회 결과 캐시)
+
+    granularity=15m|1h|1d|1w로 버킷을 키우고, max_points와 downsample=lttb|minmax로 점 수를 제한한다.
+    """
     try:
-        # URL 파라미터에서 시작 시간과 종료 시간 가져오기
-        start_time = request.GET.get('start_time')
-        end_time = request.GET.get('end_time')
-        print(f"요청된 시간 범위 - 시작: {start_time}, 종료: {end_time}")  # 콘솔에 즉시 출력
-        logger.info(f"요청된 시간 범위 - 시작: {start_time}, 종료: {end_time}")
-
-        if not start_time or not end_time:
-            error_msg = "start_time과 end_time 파라미터가 필요합니다."
-            print(error_msg)  # 콘솔에 즉시 출력
-            logger.error(error_msg)
-            return Response({'error': error_msg}, status=400)
-
-        # 시간 형식 변환
-        try:
-            start_time = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-            end_time = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-            print(f"변환된 시간 범위 - 시작: {start_time}, 종료: {end_time}")  # 콘솔에 즉시 출력
-            logger.info(f"변환된 시간 범위 - 시작: {start_time}, 종료: {end_time}")
-        except ValueError as e:
-            error_msg = f"시간 형식이 잘못되었습니다: {str(e)}"
-            print(error_msg)  # 콘솔에 즉시 출력
-            logger.error(error_msg)
-            return Response({'error': error_msg}, status=400)
-
-        # 교차로 존재 여부 확인
-        intersection_exists = Intersection.objects.filter(id=intersection_id).exists()
-        print(f"교차로 존재 여부: {intersection_exists}")  # 콘솔에 즉시 출력
-        logger.info(f"교차로 존재 여부: {intersection_exists}")
-
-        if not intersection_exists:
-            error_msg = f"교차로 ID {intersection_id}가 존재하지 않습니다."
-            print(error_msg)  # 콘솔에 즉시 출력
-            logger.error(error_msg)
-            return Response({'error': error_msg}, status=404)
-
-        # 해당 교차로의 교통 데이터 조회
-        traffic_data = TotalTrafficVolume.objects.filter(
-            intersection_id=intersection_id,
-            datetime__range=(start_time, end_time)
-        ).order_by('datetime')
-        
-        print(f"조회된 데이터 수: {traffic_data.count()}")  # 콘솔에 즉시 출력
-        logger.info(f"조회된 데이터 수: {traffic_data.count()}")
-        
-        if traffic_data.count() == 0:
-            warning_msg = "해당 조건에 맞는 데이터가 없습니다."
-            print(warning_msg)  # 콘솔에 즉시 출력
-            logger.warning(warning_msg)
-
-        # 데이터 직렬화
-        data = [{
-            'intersection_id': item.intersection_id,
-            'datetime': item.datetime,
-            'total_volume': item.total_volume,
-            'average_speed': item.average_speed
-        } for item in traffic_data]
-
-        print(f"응답 데이터: {data}")  # 콘솔에 즉시 출력
-        logger.info(f"응답 데이터: {data}")
-        return Response(data)
+        start_time = parse_datetime_param(request.GET.get('start_time'), 'start_time')
+        end_time = parse_datetime_param(request.GET.get('end_time'), 'end_time')
+        granularity = parse_granularity(request.GET.get('granularity'))
+        max_points, method = parse_downsample(request.GET.get('max_points'), request.GET.get('downsample'))
+    except ValueError as e:
+        logger.error("잘못된 조회 파라미터: %s", e)
+        return Response({'error': str(e)}, status=400)
+
+    if not start_time or not end_time:
+        error_msg = "start_time과 end_time 파라미터가 필요합니다."
+        logger.error(error_msg)
+        return Response({'error': error_msg}, status=400)
+
+    def compute():
+        if not Intersection.objects.filter(id=intersection_id).exists():
+            return None
+        # 기본 테이블과 조회 범위에 겹치는 월 파티션만 읽는다
+        rows = bucket_totals([
+            queryset.filter(intersection_id=intersection_id, datetime__range=(start_time, end_time))
+            for queryset in partition_querysets(TotalTrafficVolume, start_time, end_time)
+        ], granularity)
+        return [dict(row, intersection_id=intersection_id) for row in downsample_rows(rows, max_points, method)]
+
+    try:
+        data = cached_window(
+            'intersection_traffic', intersection_id, start_time, end_time, compute,
+            key=(granularity, max_points, method),
+        )
     except Exception as e:
-        error_msg = f"에러 발생: {str(e)}"
-        print(error_msg)  # 콘솔에 즉시 출력
-        logger.error(error_msg, exc_info=True)
+        logger.error("에러 발생: %s", e, exc_info=True)
+        return Response({'error': str(e)}, status=400)
+
+    if data is None:
+        logger.error("교차로 ID %s가 존재하지 않습니다.", intersection_id)
+        return Response({'error': f"교차로 ID {intersection_id}가 존재하지 않습니다."}, status=404)
+    if not data:
+        logger.warning("해당 조건에 맞는 데이터가 없습니다.", extra={'intersection_id': intersection_id})
+    logger.info("교차로 교통 데이터 조회", extra={
+        'intersection_id': intersection_id, 'start_time': start_time, 'end_time': end_time,
+        'payload': summarize(data),
+    })
+    return Response(data)
+
+MAX_BATCH_INTERSECTIONS = 200
+
+
+@api_view(['GET'])
+def get_batch_traffic_data(request):
+    """여러 교차로의 시계열을 한 번에 조회 (코리도 화면용, 조회 결과 캐시)
+
+    intersections=1,2,3&start_time=&end_time=&granularity=15m|1h|1d|1w
+    응답은 컬럼형: 공통 timestamps 축과 교차로별 total_volume/average_speed 배열(값이 없으면 null)
+    """
+    params = request.query_params
+    try:
+        intersection_ids = parse_id_list(params.get('intersections'), 'intersections')
+        start_time = parse_datetime_param(params.get('start_time'), 'start_time')
+        end_time = parse_datetime_param(params.get('end_time'), 'end_time')
+        granularity = parse_granularity(params.get('granularity'))
+    except ValueError as e:
         return Response({'error': str(e)}, status=400)
 
+    if not intersection_ids or not start_time or not end_time:
+        return Response({'error': "intersections, start_time, end_time 파라미터가 필요합니다."}, status=400)
+    if len(intersection_ids) > MAX_BATCH_INTERSECTIONS:
+        return Response({'error': f"intersections는 최대 {MAX_BATCH_INTERSECTIONS}개까지 지정할 수 있습니다."}, status=400)
+    intersection_ids = sorted(set(intersection_ids))
+
+    def compute():
+        rows = list(bucket_totals_by_intersection(
+            [
+                queryset.filter(intersection_id__in=intersection_ids, datetime__range=(start_time, end_time))
+                for queryset in partition_querysets(TotalTrafficVolume, start_time, end_time)
+            ],
+            granularity,
+        ))
+        timestamps = sorted({row[1] for row in rows})
+        position = {ts: i for i, ts in enumerate(timestamps)}
+        series = {
+            intersection_id: {'total_volume': [None] * len(timestamps), 'average_speed': [None] * len(timestamps)}
+            for intersection_id in intersection_ids
+        }
+        for intersection_id, ts, total_volume, average_speed in rows:
+            i = position[ts]
+            series[intersection_id]['total_volume'][i] = total_volume
+            series[intersection_id]['average_speed'][i] = average_speed
+        return {
+            'granularity': granularity,
+            'timestamps': timestamps,
+            'intersections': [{'id': pk, **values} for pk, values in series.items()],
+        }
+
+    try:
+        data = cached_window('batch_traffic', intersection_ids, start_time, end_time, compute, key=granularity)
+    except Exception as e:
+        logger.error("batch 조회 오류: %s", e, exc_info=True)
+        return Response({'error': str(e)}, status=500)
+    return Response(data)
+
+MAX_SNAPSHOT_FRAMES = 96
+
+
 @api_view(['GET'])
 def get_all_intersections_traffic_data(request):
+    """도시 전체 교차로의 15분 슬롯 스냅샷 (재생용 연속 프레임 지원, 조회 결과 캐시)
+
+    time: 임의 시각 → 그 시각이 속한 슬롯으로 내림 (없으면 가장 최근 슬롯)
+    frames: time부터 이어지는 프레임 수 (기본 1, 최대 96), step: 프레임 간격(슬롯 수, 기본 1)
+    응답은 공통 intersection_ids 축과 프레임별 total_volume/average_speed 배열(값이 없으면 null)
+    """
+    params = request.query_params
     try:
-        # URL 파라미터에서 시간 가져오기
-        time = request.GET.get('time')
-        if not time:
-            time = timezone.now()
-
-        # 모든 교차로의 특정 시간대 교통 데이터 조회
-        traffic_data = TotalTrafficVolume.objects.filter(
-            timestamp=time
-        ).order_by('intersection_id')
-
-        # 데이터 직렬화
-        data = [{
-            'intersection_id': item.intersection_id,
-            'timestamp': item.timestamp,
-            'total_volume': item.total_volume
-        } for item in traffic_data]
+        time = parse_datetime_param(params.get('time'), 'time')
+        frames = int(parse_float_param(params.get('frames'), 'frames', 1, 1, MAX_SNAPSHOT_FRAMES))
+        step = int(parse_float_param(params.get('step'), 'step', 1, 1, 96 * 7))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
 
-        return Response(data)
+    if time is None:
+        time = LatestTrafficSnapshot.objects.aggregate(latest=Max('datetime'))['latest']
+        if time is None:
+            return Response({'intersection_ids': [], 'frames': []})
+    first_slot = floor_to_slot(timezone.localtime(time))
+    slots = [first_slot + SLOT * step * i for i in range(frames)]
+
+    def compute():
+        by_slot = defaultdict(dict)
+        for queryset in partition_querysets(TotalTrafficVolume, slots[0], slots[-1]):
+            rows = queryset.filter(datetime__in=slots).values_list(
+                'datetime', 'intersection_id', 'total_volume', 'average_speed',
+            )
+            for slot, intersection_id, total_volume, average_speed in rows:
+                by_slot[slot][intersection_id] = (total_volume, average_speed)
+        intersection_ids = sorted({pk for values in by_slot.values() for pk in values})
+        data_frames = []
+        for slot in slots:
+            values = by_slot.get(slot, {})
+            data_frames.append({
+                'datetime': slot,
+                'total_volume': [values[pk][0] if pk in values else None for pk in intersection_ids],
+                'average_speed': [values[pk][1] if pk in values else None for pk in intersection_ids],
+            })
+        return {'intersection_ids': intersection_ids, 'frames': data_frames}
+
+    try:
+        data = cached_window(
+            'city_snapshot', ALL_INTERSECTIONS, slots[0], slots[-1], compute, key=(frames, step),
+        )
     except Exception as e:
+        logger.error("도시 스냅샷 조회 오류: %s", e, exc_info=True)
+        return Response({'error': str(e)}, status=500)
+    return Response(data)
+
+MAX_ANOMALY_WINDOW = 96
+
+
+@api_view(['GET'])
+def get_traffic_anomalies(request):
+    """기준선(요일×슬롯 중앙값/MAD) 대비 이상 슬롯 (robust z 점수 |z| 내림차순)
+
+    time: 마지막 슬롯 (없으면 가장 최근 슬롯), window: time까지 거슬러 볼 슬롯 수 (기본 4, 최대 96)
+    threshold: |z| 기준 (기본 3.5), intersections: 교차로 id 목록, limit: 최대 건수 (기본 100, 최대 5000)
+    """
+    params = request.query_params
+    try:
+        time = parse_datetime_param(params.get('time'), 'time')
+        window = int(parse_float_param(params.get('window'), 'window', 4, 1, MAX_ANOMALY_WINDOW))
+        threshold = parse_float_param(params.get('threshold'), 'threshold', 3.5, 0, 100)
+        limit = int(parse_float_param(params.get('limit'), 'limit', 100, 1, 5000))
+        intersection_ids = parse_id_list(params.get('intersections'), 'intersections')
+    except ValueError as e:
         return Response({'error': str(e)}, status=400)
 
+    if time is None:
+        time = LatestTrafficSnapshot.objects.aggregate(latest=Max('datetime'))['latest']
+        if time is None:
+            return Response({'slots': [], 'scored': 0, 'anomalies': []})
+    last_slot = floor_to_slot(timezone.localtime(time))
+    slots = [last_slot - SLOT * i for i in reversed(range(window))]
+
+    try:
+        anomalies, scored = find_anomalies(slots, threshold, intersection_ids, store=get_baseline_store())
+    except Exception as e:
+        logger.error("이상 슬롯 조회 오류: %s", e, exc_info=True)
+        return Response({'error': str(e)}, status=500)
+    return Response({
+        'slots': slots,
+        'threshold': threshold,
+        'scored': scored,
+        'total': len(anomalies),
+        'anomalies': anomalies[:limit],
+    })
+
+@api_view(['GET'])
+def export_traffic_data(request):
+    """시계열 범위 컬럼형 내보내기
+
+    intersections=1,2&start_time=&end_time=&directions=NS,SN&source=total|volume&output=csv|arrow|parquet
+    (DRF가 format 파라미터를 렌더러 선택에 사용하므로 output을 쓴다)
+    """
+    params = request.query_params
+    fmt = params.get('output', 'csv')
+    source = params.get('source', 'total')
+    try:
+        intersection_ids = parse_id_list(params.get('intersections'), 'intersections')
+        start_time = parse_datetime_param(params.get('start_time'), 'start_time')
+        end_time = parse_datetime_param(params.get('end_time'), 'end_time')
+        directions = [d for d in params.get('directions', '').upper().split(',') if d]
+        chunks = iter_export(fmt, source, intersection_ids, start_time, end_time, directions)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+
+    content_type, extension = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="traffic_{source}.{extension}"'
+    logger.info("내보내기 요청", extra={'source': source, 'output': fmt, 'intersections': len(intersection_ids) or None})
+    return response
+
+def metrics(request):
+    """Prometheus 텍스트 형식 계측 값 (RequestMetricsMiddleware 수집분 + 조회 캐시/로그 통계)"""
+    if not getattr(settings, 'TRAFFIC_METRICS_ENABLED', True):
+        return HttpResponse(status=404)
+    stats = cache_stats()
+    extra = {
+        'traffic_query_cache_local_hits_total': ('counter', '조회 캐시 프로세스 LRU 적중 수', stats['local_hits']),
+        'traffic_query_cache_shared_hits_total': ('counter', '조회 캐시 공유 캐시 적중 수', stats['shared_hits']),
+        'traffic_query_cache_misses_total': ('counter', '조회 캐시 미스 수', stats['misses']),
+        'traffic_query_cache_local_entries': ('gauge', '조회 캐시 프로세스 LRU 항목 수', stats['local_entries']),
+        'traffic_stream_subscribers': ('gauge', '실시간 스트림 구독자 수', get_broker().subscriber_count()),
+    }
+    logs = log_stats()
+    extra.update({
+        'traffic_log_dropped_total': ('counter', '로그 큐가 가득 차 버린 레코드 수', logs['dropped']),
+        'traffic_log_sampled_out_total': ('counter', '샘플링으로 거른 로그 레코드 수', logs['sampled_out']),
+        'traffic_log_rate_limited_total': ('counter', '속도 제한으로 거른 로그 레코드 수', logs['rate_limited']),
+    })
+    return HttpResponse(render_prometheus(extra), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+async def traffic_stream(request):
+    """Server-Sent Events 실시간 스트림
+
+    channels=slots,incidents&intersections=1,2&bbox=min_lon,min_lat,max_lon,max_lat
+    ASGI 서버에서 실행해야 연결당 스레드를 점유하지 않는다.
+    """
+    try:
+        channels = [c for c in request.GET.get('channels', ','.join(CHANNELS)).split(',') if c]
+        if not set(channels) <= set(CHANNELS):
+            raise ValueError(f"channels는 {', '.join(CHANNELS)} 중에서 선택해야 합니다.")
+        intersection_ids = parse_id_list(request.GET.get('intersections'), 'intersections')
+        bbox = parse_bbox(request.GET.get('bbox'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    heartbeat = getattr(settings, 'TRAFFIC_STREAM_HEARTBEAT', 15)
+    broker = get_broker()
+
+    async def events():
+        subscription = broker.subscribe(channels=channels, intersection_ids=intersection_ids, bbox=bbox)
+        try:
+            yield f"retry: 3000\n: subscribed\n\n"
+            while not subscription.closed:
+                item = await subscription.get(timeout=heartbeat)
+                if item is None:
+                    yield ": ping\n\n"
+                    continue
+                yield format_sse(*item)
+            yield format_sse('overflow', {'dropped': subscription.dropped})
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 class IncidentViewSet(viewsets.ReadOnlyModelViewSet):  # 조회 전용
-    queryset = Incident.objects.select_related("intersection").all().order_by("-registered_at")
-    serializer_class = IncidentSerializer
\ No newline at end of file
+    """사고 목록과 DB 집계
+
+    공통 필터: district, status, type (쉼표 구분 목록), intersection (id 목록),
+    start_time/end_time (등록 시각), bbox, lat/lon/radius(m)
+    """
+    queryset = Incident.objects.select_related("intersection").all().order_by("-registered_at", "-id")
+    serializer_class = IncidentSerializer
+
+    def get_filters(self):
+        """필터 파라미터 파싱 (lat/lon/radius는 반경 안 교차로 id 목록으로 바꿔 intersection에 합친다)"""
+        params = self.request.query_params
+        try:
+            filters = parse_incident_filters(params)
+            if 'lat' in params or 'lon' in params:
+                lat, lon = parse_point(params.get('lat'), params.get('lon'))
+                radius = parse_float_param(params.get('radius'), 'radius', 500, 0, 50000)
+                ids, _ = get_spatial_index().nearby(lat, lon, radius)
+                nearby = set(ids.tolist())
+                if filters['intersection']:
+                    nearby &= set(filters['intersection'])
+                # 반경 안에 교차로가 없으면 어떤 id와도 맞지 않는 값으로 빈 결과를 만든다
+                filters['intersection'] = tuple(sorted(nearby)) or (0,)
+        except ValueError as e:
+            raise ParseError(str(e))
+        return filters
+
+    def get_queryset(self):
+        return filter_incidents(super().get_queryset(), self.get_filters())
+
+    def _cached_stats(self, name, filters, compute, key=()):
+        return cached_window(
+            f'incident_{name}', INCIDENT_SCOPE, filters['start_time'], filters['end_time'], compute,
+            key=(*key, filter_key(filters)),
+        )
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """group_by(district|type|status|intersection|hour_of_week)별 사고 건수
+
+        끝난 기간(end_time이 지난 윈도우)의 결과는 오래 캐시한다.
+        """
+        filters = self.get_filters()
+        try:
+            group_by = parse_group_by(request.query_params.get('group_by'), COUNT_GROUPS, default='district')
+        except ValueError as e:
+            raise ParseError(str(e))
+        results = self._cached_stats('counts', filters, lambda: incident_counts(filters, group_by), key=(group_by,))
+        return Response({
+            'group_by': group_by,
+            'total': sum(row['count'] for row in results),
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'])
+    def resolution_times(self, request):
+        """처리 완료 사고의 등록→최종 상태 변경 시간 평균/백분위(초)
+
+        group_by(district|type|intersection)가 없으면 전체 하나, percentiles 기본 50,90,95
+        """
+        filters = self.get_filters()
+        try:
+            group_by = parse_group_by(request.query_params.get('group_by'), ('district', 'type', 'intersection'))
+            percentiles = parse_percentiles(request.query_params.get('percentiles'))
+        except ValueError as e:
+            raise ParseError(str(e))
+        results = self._cached_stats(
+            'resolution', filters, lambda: resolution_percentiles(filters, group_by, percentiles),
+            key=(group_by, percentiles),
+        )
+        return Response({'group_by': group_by, 'percentiles': percentiles, 'results': results})